@@ -1,4 +1,4 @@
-import os
+import functools, os, threading
 from contextlib import asynccontextmanager
 
 from baseapp.config import setting
@@ -8,16 +8,26 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from baseapp.services.middleware import setup_middleware
+from baseapp.utils.response import ORJSONResponse
+from baseapp.utils.tracing import setup_tracing
 
 os.makedirs("log", exist_ok=True) # create log folder
 
-import logging.config
-logging.config.fileConfig('logging.conf')
+from baseapp.config.log import setup_logging
+setup_logging() # handler console/file berjalan di thread QueueListener
 from logging import getLogger
 logger = getLogger()
 
 from baseapp.config.mongodb import MongoConn
 from baseapp.config.postgresql import PostgreSQLConn
+from baseapp.services.publisher import close_publisher
+from baseapp.utils.utility import preload_enums
+from baseapp.utils.jwt import migrate_refresh_sessions
+from baseapp.config.redis import RedisConn
+from baseapp.services.database.crud import load_initdata
+from baseapp.services._dms.search_index import migrate_dms_search, migrate_dms_content
+from baseapp.services._rabbitmq_worker._dms_extract_worker import DMS_EXTRACT_QUEUE, EXTRACTORS
+from baseapp.services.publisher import publish_batch
 
 from baseapp.test_connection.api import router as testconn_router # test connection
 from baseapp.services.database.api import router as db_router # init database
@@ -36,6 +46,16 @@ from baseapp.services._feature.api import router as feature_router # feature and
 from baseapp.services._forgot_password.api import router as forgot_password_router # forgot password
 from baseapp.services.oauth_google.api import router as oauth_google_router # Oauth Google
 from baseapp.services._api_credentials.api import router as api_credential_router # API Credentials
+from baseapp.services._webhook.api import router as webhook_router # Webhook
+from baseapp.services.metrics.api import router as metrics_router # Prometheus metrics
+
+def _migrate_dms_search():
+    try:
+        with RedisConn() as redis_conn, MongoConn() as mongo:
+            migrate_dms_search(redis_conn, mongo.get_database())
+            migrate_dms_content(redis_conn, mongo.get_database(), functools.partial(publish_batch, DMS_EXTRACT_QUEUE), EXTRACTORS)
+    except Exception as e:
+        logger.warning(f"DMS search migration skipped: {e}")
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -54,6 +74,30 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Startup Failed: {e}")
         # Opsional: raise e # Uncomment jika ingin app crash kalau DB mati
+
+    try:
+        # Preload enum sistem ke cache
+        with MongoConn() as mongo:
+            logger.info(f"{preload_enums(mongo)} system enums preloaded.")
+    except Exception as e:
+        logger.warning(f"Enum preload skipped: {e}")
+
+    try:
+        # Migrasi sekali jalan refresh token lama ke index sesi per user
+        with RedisConn() as redis_conn:
+            migrate_refresh_sessions(redis_conn)
+    except Exception as e:
+        logger.warning(f"Refresh session migration skipped: {e}")
+
+    try:
+        # Index dari initdata.json yang ditambahkan setelah database dibuat (idempotent)
+        with MongoConn() as mongo:
+            logger.info(f"{mongo.ensure_indexes(load_initdata())} missing index(es) created.")
+    except Exception as e:
+        logger.warning(f"Index migration skipped: {e}")
+
+    # Backfill data lama berjalan di background agar startup tidak menunggu
+    threading.Thread(target=_migrate_dms_search, name="dms-search-migration", daemon=True).start()
     
     yield # <--- Titik tunggu (Aplikasi berjalan di sini)
 
@@ -63,6 +107,7 @@ async def lifespan(app: FastAPI):
     try:
         MongoConn.close_connection()
         PostgreSQLConn.close_pool()
+        close_publisher()
         
     except Exception as e:
         logger.error(f"Shutdown error: {e}")
@@ -73,7 +118,10 @@ app = FastAPI(
     title="baseapp",
     description="Gateway for baseapp implementation.",
     version="0.0.1",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
+setup_tracing(app=app) # OTEL_ENABLED: span request, CRUD, MongoDB, Redis dan MinIO
 
 allowed_origins = [
     "http://localhost:53464",
@@ -110,6 +158,9 @@ app.include_router(feature_router)
 app.include_router(forgot_password_router)
 app.include_router(oauth_google_router)
 app.include_router(api_credential_router)
+app.include_router(webhook_router)
+if config.metrics_enabled:
+    app.include_router(metrics_router)
 
 @app.get("/v1/test")
 def read_root():
@@ -1,25 +1,79 @@
 # Email Libs
 import os
+import re
+import base64
 import smtplib
 import logging
+from collections import OrderedDict
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.mime.base import MIMEBase
-from email import encoders
 
 from baseapp.config import setting
 
 config = setting.get_settings()
 logger = logging.getLogger(__name__)
 
+# Baris base64 standar MIME = 76 karakter = 57 byte sumber
+ATTACHMENT_CHUNK_SIZE = 57 * 1024
+
 class EmailSender:
-    def __init__(self, host=None, port=None, username=None, password=None, use_tls=True):        
+    def __init__(self, host=None, port=None, username=None, password=None, use_tls=True, attachment_cache_size=32):        
         self.smtp_server = host or config.smtp_host
         self.smtp_port = port or config.smtp_port
         self.email_user = username or config.smtp_username
         self.email_password = password or config.smtp_password
         self.use_tls = use_tls
-        
+        self.attachment_cache_size = attachment_cache_size
+        self._attachment_cache = OrderedDict()
+
+    def _encode_attachment(self, path):
+        """
+        Membaca file secara bertahap (per chunk) dan meng-encode base64 per baris MIME,
+        sehingga file besar tidak perlu dibaca utuh lalu di-encode ulang.
+        """
+        lines = []
+        with open(path, "rb") as attachment:
+            while True:
+                chunk = attachment.read(ATTACHMENT_CHUNK_SIZE)
+                if not chunk:
+                    break
+                lines.append(base64.encodebytes(chunk).decode("ascii"))
+        return "".join(lines)
+
+    def _encoded_attachment(self, path):
+        """
+        Mengembalikan payload attachment yang sudah di-encode base64.
+        Hanya payload (string ascii, immutable) yang disimpan di cache (key: path, mtime, size)
+        sehingga pengiriman berulang dengan attachment yang sama tidak membaca dan meng-encode file lagi.
+        """
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+        payload = self._attachment_cache.get(key)
+        if payload is not None:
+            self._attachment_cache.move_to_end(key)
+            return payload
+
+        payload = self._encode_attachment(path)
+        self._attachment_cache[key] = payload
+        if len(self._attachment_cache) > self.attachment_cache_size:
+            self._attachment_cache.popitem(last=False)
+        return payload
+
+    def attachment_part(self, path):
+        """
+        Membuat MIME part attachment baru untuk setiap pesan (part tidak dipakai bersama
+        antar pesan), dengan payload ter-encode yang diambil dari cache.
+        """
+        part = MIMEBase("application", "octet-stream")
+        part.set_payload(self._encoded_attachment(path))
+        part.add_header("Content-Transfer-Encoding", "base64")
+        part.add_header(
+            "Content-Disposition",
+            f"attachment; filename= {os.path.basename(path)}",
+        )
+        return part
+
     def body_msg(self, values):
         msg = MIMEMultipart("alternative")
         msg['From'] = self.email_user
@@ -67,22 +121,8 @@ class EmailSender:
         # Open the file to be sent
         if "attachment_path" in values and values["attachment_path"] != "":
             try:
-                with open(values["attachment_path"], "rb") as attachment:
-                    # Create a MIMEBase object
-                    part = MIMEBase("application", "octet-stream")
-                    part.set_payload(attachment.read())
-
-                    # Encode the payload using base64
-                    encoders.encode_base64(part)
-
-                    # Add header to the attachment
-                    part.add_header(
-                        "Content-Disposition",
-                        f"attachment; filename= {os.path.basename(values['attachment_path'])}",
-                    )
-
-                    # Attach the file to the message
-                    msg.attach(part)
+                # Attach the file to the message (payload encoded once, reused from cache)
+                msg.attach(self.attachment_part(values["attachment_path"]))
             except Exception as e:
                 logger.error(f"Failed to attach file: {e}")
                 raise
@@ -134,6 +174,77 @@ class EmailSender:
             raise ValueError("An SMTP error occurred")
 
 # Email template design
+PLACEHOLDER_PATTERN = re.compile(r"%z([A-Za-z0-9_]+)%")
+
+class EmailTemplate:
+    """
+    Template email yang sudah di-compile: teks dipecah sekali menjadi potongan literal
+    dan nama placeholder (%znama%), sehingga render cukup menggabungkan potongan.
+    """
+    def __init__(self, template_id, source):
+        self.template_id = template_id
+        subject = ""
+        tb = source.find('<title>')
+        if tb >= 0:
+            te = source.find('</title>', tb)
+            if te > 0:
+                subject = source[tb + 7:te]
+        self._subject_parts = self._compile(subject)
+        self._body_parts = self._compile(source)
+
+    @staticmethod
+    def _compile(text):
+        # re.split dengan group: index genap = literal, index ganjil = nama placeholder
+        return PLACEHOLDER_PATTERN.split(text)
+
+    @staticmethod
+    def _render(parts, variables):
+        rendered = list(parts)
+        for i in range(1, len(rendered), 2):
+            name = rendered[i]
+            if name not in variables:
+                raise ValueError(f"Missing email template variable: {name}")
+            rendered[i] = str(variables[name])
+        return "".join(rendered)
+
+    def render(self, variables):
+        variables = variables or {}
+        return self._render(self._subject_parts, variables), self._render(self._body_parts, variables)
+
+class EmailTemplateRegistry:
+    """
+    Registry template email. Semua file *.html di folder template di-compile SEKALI
+    saat worker start, lalu direferensikan lewat template id (nama file tanpa ekstensi).
+    """
+    def __init__(self, template_location=None):
+        self.template_location = template_location or config.email_template_location
+        self._templates = {}
+        self.load()
+
+    def load(self):
+        templates = {}
+        if not os.path.isdir(self.template_location):
+            logger.warning(f"Email template folder '{self.template_location}' not found.")
+        else:
+            for filename in sorted(os.listdir(self.template_location)):
+                template_id, ext = os.path.splitext(filename)
+                if ext.lower() != ".html":
+                    continue
+                with open(os.path.join(self.template_location, filename), "r", encoding="utf-8") as f:
+                    templates[template_id] = EmailTemplate(template_id, f.read())
+        self._templates = templates
+        logger.info(f"Email templates loaded: {list(templates.keys())}")
+
+    def get(self, template_id):
+        template = self._templates.get(template_id)
+        if template is None:
+            raise ValueError(f"Email template '{template_id}' not found")
+        return template
+
+    def render(self, template_id, variables=None):
+        """Return (subject, body) hasil render template."""
+        return self.get(template_id).render(variables)
+
 def _processPlaceHolder(template, placeHolders, replacements):
     length = len(placeHolders)
     for i in range(0, length):
@@ -184,6 +295,10 @@ if __name__ == "__main__":
     # (subject, message) = loadHtmlEmailTemplate("tplemail/emailVerifikasiOrg.html",cond,cond2)
     # msg_val["subject"] = subject
     # msg_val["body_mail"] = message
+
+    # when use template registry (compiled once, see data/templates/email/)
+    # registry = EmailTemplateRegistry()
+    # (subject, message) = registry.render("login_otp", {"otp": "123456"})
     
     body_mail, bcc_recipients = email_sender.body_msg(msg_val)
     mail_sending = email_sender.send_email(body_mail, bcc_recipients)
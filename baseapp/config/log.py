@@ -0,0 +1,92 @@
+import atexit, copy, logging, logging.config, logging.handlers, queue
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Optional
+
+import orjson
+
+from baseapp.config import setting
+
+# log_id request yang sedang berjalan, di-set oleh ProcessTimeLogMiddleware
+log_id_var: ContextVar[Optional[str]] = ContextVar("log_id", default=None)
+
+# Atribut bawaan LogRecord; atribut lain berasal dari `extra=` dan ikut ditulis sebagai field JSON
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "taskName", "log_id"}
+
+_listeners = []
+
+class LogIdFilter(logging.Filter):
+    """Menambahkan log_id dari context request ke setiap record."""
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, "log_id", None) is None:
+            record.log_id = log_id_var.get()
+        return True
+
+class JsonFormatter(logging.Formatter):
+    """Satu baris JSON per record: ts, level, logger, message, log_id, field dari `extra=`, dan traceback."""
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "log_id": getattr(record, "log_id", None),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_FIELDS:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        if record.stack_info:
+            entry["stack_info"] = self.formatStack(record.stack_info)
+        return orjson.dumps(entry, default=str).decode("utf-8")
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler yang hanya menginterpolasi pesan (dan traceback) di thread pemanggil;
+    formatting JSON dan I/O dikerjakan oleh QueueListener.
+    """
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+def setup_logging(config_file: str = "logging.conf"):
+    """
+    Muat `config_file`, lalu handler setiap logger dipindahkan ke belakang QueueListener,
+    sehingga logger di jalur request hanya melakukan queue.put. Level diambil dari setting LOG_LEVEL.
+    """
+    if _listeners:
+        return
+    logging.config.fileConfig(config_file, disable_existing_loggers=False)
+    level = setting.get_settings().log_level.upper()
+
+    log_filter = LogIdFilter()
+    loggers = [logging.getLogger()] + [
+        logger for logger in logging.Logger.manager.loggerDict.values()
+        if isinstance(logger, logging.Logger) and logger.handlers
+    ]
+    for logger in loggers:
+        logger.setLevel(level)
+        if not logger.handlers:
+            continue
+        log_queue = queue.SimpleQueue()
+        listener = logging.handlers.QueueListener(log_queue, *logger.handlers, respect_handler_level=True)
+        handler = _QueueHandler(log_queue)
+        handler.addFilter(log_filter)
+        logger.handlers = [handler]
+        listener.start()
+        _listeners.append(listener)
+    atexit.register(shutdown_logging)
+
+def shutdown_logging():
+    """Menghentikan listener dan menulis sisa record di antrian."""
+    while _listeners:
+        _listeners.pop().stop()
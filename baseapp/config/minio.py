@@ -1,7 +1,9 @@
-import logging
+import logging, tempfile
+from contextlib import contextmanager
 from minio import Minio
 from minio.error import S3Error, InvalidResponseError
 from baseapp.config import setting
+from baseapp.utils.metrics import InstrumentedClient
 
 config = setting.get_settings()
 logger = logging.getLogger(__name__)
@@ -20,13 +22,14 @@ class MinioConn:
     def __enter__(self):
         try:
             # Inisialisasi koneksi Minio
-            self._conn = Minio(
+            # Setiap pemanggilan method client diukur ke metric backend_call_duration_seconds
+            self._conn = InstrumentedClient(Minio(
                 endpoint=f"{self.host}:{self.port}",
                 access_key=self.access_key,
                 secret_key=self.secret_key,
                 secure=self.secure,
                 http_client=None if self.verify else False,
-            )
+            ), "minio")
             logger.info(f"Connected to MinIO at {self.host}:{self.port}")
             return self
         except S3Error as e:
@@ -78,6 +81,27 @@ class MinioConn:
             logger.exception(f"Unexpected error while creating bucket '{self.bucket}': {e}")
             raise
 
+    @contextmanager
+    def spool_object(self, bucket: str, object_name: str, max_memory: int = 8 * 1024 * 1024, chunk_size: int = 64 * 1024):
+        """
+        Stream object ke file sementara (di memori sampai `max_memory` byte, selebihnya di disk)
+        sehingga file besar tidak pernah dibaca utuh ke memori. File bisa di-seek dan ditutup otomatis.
+        """
+        response = self.get_minio_client().get_object(bucket, object_name)
+        try:
+            with tempfile.SpooledTemporaryFile(max_size=max_memory) as spool:
+                for chunk in response.stream(chunk_size):
+                    spool.write(chunk)
+                response.close()
+                response.release_conn()
+                response = None
+                spool.seek(0)
+                yield spool
+        finally:
+            if response is not None:
+                response.close()
+                response.release_conn()
+
     def close(self):
         """
         Close the MinIO connection (if needed).
@@ -1,10 +1,44 @@
-from pymongo import MongoClient,errors
+from pymongo import MongoClient,errors,monitoring
 import logging,uuid
 from baseapp.config import setting
+from baseapp.utils.metrics import BACKEND_CALL_DURATION, BACKEND_ERRORS, POOL_IN_USE, POOL_MAX_SIZE
+from baseapp.utils.mongo_indexes import index_specs, ensure_indexes
 
 config = setting.get_settings()
 logger = logging.getLogger()
 
+class CommandMetricsListener(monitoring.CommandListener):
+    """Latency dan error setiap command MongoDB (find, aggregate, insert, ...) ke metric backend."""
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        BACKEND_CALL_DURATION.labels("mongodb", event.command_name).observe(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        BACKEND_CALL_DURATION.labels("mongodb", event.command_name).observe(event.duration_micros / 1e6)
+        BACKEND_ERRORS.labels("mongodb", event.command_name).inc()
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """Utilisasi connection pool MongoDB: koneksi yang sedang di-checkout."""
+    def pool_created(self, event):
+        POOL_MAX_SIZE.labels("mongodb").set(event.options.get("maxPoolSize", config.mongodb_max_pool_size))
+
+    def connection_checked_out(self, event):
+        POOL_IN_USE.labels("mongodb").inc()
+
+    def connection_checked_in(self, event):
+        POOL_IN_USE.labels("mongodb").dec()
+
+    def pool_ready(self, event): pass
+    def pool_cleared(self, event): pass
+    def pool_closed(self, event): pass
+    def connection_created(self, event): pass
+    def connection_ready(self, event): pass
+    def connection_closed(self, event): pass
+    def connection_check_out_started(self, event): pass
+    def connection_check_out_failed(self, event): pass
+
 class MongoConn:
     _client = None
 
@@ -32,6 +66,7 @@ class MongoConn:
                     uri,
                     minPoolSize=config.mongodb_min_pool_size, 
                     maxPoolSize=config.mongodb_max_pool_size,
+                    event_listeners=[CommandMetricsListener(), PoolMetricsListener()],
                 )
                 
                 # Test koneksi ringan (opsional)
@@ -124,17 +159,10 @@ class MongoConn:
             collection = db_target[collection_name]
 
             # 1. Membuat Indeks
-            indexes = collection_config.get("index", [])
-            for idx in indexes:
+            for keys, options in index_specs(collection_config):
                 try:
-                    if isinstance(idx, str):  # Indeks sederhana
-                        collection.create_index(idx)
-                        logger.info(f"Created index on fields: {idx}")
-                    elif isinstance(idx, dict):  # Indeks kompleks
-                        for index_name, fields in idx.items():
-                            index_fields = [(field, 1) for field in fields]
-                            collection.create_index(index_fields, name=index_name)
-                            logger.info(f"Created compound index: {index_name} on fields: {fields}")
+                    collection.create_index(keys, **options)
+                    logger.info(f"Created index on fields: {keys}")
                 except errors.PyMongoError as e:
                     logger.error(f"Error creating index on collection '{collection_name}': {e}")
                     raise ValueError("Error creating index on collection")
@@ -163,6 +191,13 @@ class MongoConn:
 
         logger.info("Database creation completed.")
 
+    def ensure_indexes(self, config_json) -> int:
+        """
+        Membuat index dari initdata.json yang belum ada di database yang sudah berjalan.
+        Dipanggil saat startup; create_database hanya berjalan untuk database baru.
+        """
+        return ensure_indexes(self.get_database(), config_json)
+
     def check_database_exists(self):
         """
         Function to check if a database exists in MongoDB.
@@ -2,30 +2,59 @@ import pika,logging
 
 import pika.exceptions
 from baseapp.config import setting
+from baseapp.utils.metrics import InstrumentedClient, observe
 
 config = setting.get_settings()
 logger = logging.getLogger(__name__)
 
+# Header AMQP untuk melacak retry pesan
+RETRY_COUNT_HEADER = "x-retry-count"
+LAST_ERROR_HEADER = "x-last-error"
+ORIGINAL_QUEUE_HEADER = "x-original-queue"
+
+# Operasi channel yang diukur latency/error-nya (start_consuming dsb. sengaja tidak)
+INSTRUMENTED_OPERATIONS = ("basic_publish", "basic_get", "queue_declare")
+
+def delay_queue_name(queue_name: str, delay_ms: int) -> str:
+    return f"{queue_name}.delay.{delay_ms}"
+
+def dead_letter_queue_name(queue_name: str) -> str:
+    return f"{queue_name}.dead"
+
+def delay_queue_arguments(queue_name: str, delay_ms: int) -> dict:
+    """
+    Antrian delay tidak memiliki consumer: pesan menunggu selama x-message-ttl,
+    lalu broker me-dead-letter pesan tersebut kembali ke queue_name.
+    """
+    return {
+        "x-message-ttl": delay_ms,
+        "x-dead-letter-exchange": "",
+        "x-dead-letter-routing-key": queue_name,
+    }
+
 class RabbitMqConn:
-    def __init__(self, host=None, port=None, user=None, password=None):
+    def __init__(self, host=None, port=None, user=None, password=None, heartbeat=None):
         self.host = host or config.rabbitmq_host
         self.port = port or config.rabbitmq_port
         self.user = user or config.rabbitmq_user
         self.password = password or config.rabbitmq_pass
+        self.heartbeat = heartbeat or config.rabbitmq_heartbeat
         self.connection = None
         self.channel = None
     
     def __enter__(self):
         try:
             credentials = pika.PlainCredentials(self.user, self.password)
-            self.connection = pika.BlockingConnection(
-                pika.ConnectionParameters(
-                    host=self.host, 
-                    port=self.port,
-                    credentials=credentials,
+            with observe("rabbitmq", "connect"):
+                self.connection = pika.BlockingConnection(
+                    pika.ConnectionParameters(
+                        host=self.host, 
+                        port=self.port,
+                        credentials=credentials,
+                        heartbeat=self.heartbeat,
+                    )
                 )
-            )
-            self.channel = self.connection.channel()
+            self.channel = InstrumentedClient(self.connection.channel(), "rabbitmq", INSTRUMENTED_OPERATIONS)
             logger.info("RabbitMQ: Connection and channel established.")
             return self.channel  # Return channel for usage in 'with' block
         except pika.exceptions.AMQPConnectionError as e:
@@ -41,9 +70,15 @@ class RabbitMqConn:
     def get_connection(self):
         if not self.connection or self.connection.is_closed:
             try:
-                self.connection = pika.BlockingConnection(
-                    pika.ConnectionParameters(host=self.host, port=self.port)
-                )
+                with observe("rabbitmq", "connect"):
+                    self.connection = pika.BlockingConnection(
+                        pika.ConnectionParameters(
+                            host=self.host,
+                            port=self.port,
+                            credentials=pika.PlainCredentials(self.user, self.password),
+                            heartbeat=self.heartbeat,
+                        )
+                    )
                 logger.info("RabbitMQ connection established.")
             except pika.exceptions.AMQPConnectionError as e:
                 logger.error(f"Failed to connect to RabbitMQ: {e}")
@@ -57,7 +92,7 @@ class RabbitMqConn:
         if not self.channel or self.channel.is_closed:
             try:
                 conn = self.get_connection()
-                self.channel = conn.channel()
+                self.channel = InstrumentedClient(conn.channel(), "rabbitmq", INSTRUMENTED_OPERATIONS)
                 logger.info("RabbitMQ channel created.")
             except pika.exceptions.ChannelError as e:
                 logger.error(f"RabbitMQ: Channel error: {e}")
@@ -67,6 +102,23 @@ class RabbitMqConn:
                 raise  # Mengangkat kesalahan lainnya
         return self.channel
 
+    def declare_retry_queues(self, queue_name: str, retry_delays, channel=None):
+        """
+        Deklarasi topologi retry untuk queue_name:
+        satu antrian delay per tier (TTL tetap per antrian, sehingga pesan dengan delay pendek
+        tidak tertahan di belakang pesan dengan delay panjang) dan antrian akhir <queue>.dead.
+        Return: list nama antrian delay sesuai urutan retry_delays.
+        """
+        channel = channel or self.get_channel()
+        delay_queues = []
+        for delay_seconds in retry_delays:
+            delay_ms = int(delay_seconds * 1000)
+            name = delay_queue_name(queue_name, delay_ms)
+            channel.queue_declare(queue=name, durable=True, auto_delete=False, arguments=delay_queue_arguments(queue_name, delay_ms))
+            delay_queues.append(name)
+        channel.queue_declare(queue=dead_letter_queue_name(queue_name), durable=True, auto_delete=False)
+        return delay_queues
+
     def close(self):
         if self.channel and self.channel.is_open:
             self.channel.close()
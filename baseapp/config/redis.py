@@ -1,9 +1,35 @@
 import redis,logging
 from baseapp.config import setting
+from baseapp.utils.metrics import observe, POOL_IN_USE, POOL_MAX_SIZE
 
 config = setting.get_settings()
 logger = logging.getLogger(__name__)
 
+class InstrumentedConnectionPool(redis.ConnectionPool):
+    """ConnectionPool yang mencatat jumlah koneksi yang sedang dipakai ke metric connection_pool_in_use."""
+    def get_connection(self, *args, **kwargs):
+        connection = super().get_connection(*args, **kwargs)
+        POOL_IN_USE.labels("redis").inc()
+        return connection
+
+    def release(self, connection):
+        super().release(connection)
+        POOL_IN_USE.labels("redis").dec()
+
+class InstrumentedPipeline(redis.client.Pipeline):
+    def execute(self, raise_on_error=True):
+        with observe("redis", "PIPELINE"):
+            return super().execute(raise_on_error)
+
+class InstrumentedRedis(redis.Redis):
+    """Client redis yang mengukur latency dan error setiap command (dan setiap eksekusi pipeline)."""
+    def execute_command(self, *args, **options):
+        with observe("redis", str(args[0]).upper()):
+            return super().execute_command(*args, **options)
+
+    def pipeline(self, transaction=True, shard_hint=None):
+        return InstrumentedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
 class RedisConn:
     def __init__(self, host=None, port=None, max_connections=10, retry_on_timeout=True, socket_timeout=5):
         self.host = host or config.redis_host
@@ -16,7 +42,7 @@ class RedisConn:
 
     def __enter__(self):
         try:
-            self.pool = redis.ConnectionPool(
+            self.pool = InstrumentedConnectionPool(
                 host=self.host,
                 port=self.port,
                 max_connections=self.max_connections,
@@ -24,7 +50,8 @@ class RedisConn:
                 retry_on_timeout=self.retry_on_timeout,
                 socket_timeout=self.socket_timeout,
             )
-            self._conn = redis.Redis(connection_pool=self.pool)
+            POOL_MAX_SIZE.labels("redis").set(self.max_connections)
+            self._conn = InstrumentedRedis(connection_pool=self.pool)
             # Validate connection
             self._conn.ping()
             # logger.info("Redis Connection Pool established.")
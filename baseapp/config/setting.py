@@ -1,5 +1,5 @@
 import os
-from typing import ClassVar
+from typing import ClassVar, List
 from pydantic_settings import SettingsConfigDict, BaseSettings
 
 class Settings(BaseSettings):
@@ -8,12 +8,18 @@ class Settings(BaseSettings):
     host:str
     port:int
     domain:str
+    log_level: str = "INFO"
     
     # jwt
     jwt_secret_key:str
     jwt_algorithm:str
     jwt_access_expired_in:int
     jwt_refresh_expired_in:int
+    jwt_deny_list_capacity: int = 100000
+    jwt_deny_list_error_rate: float = 0.001
+    jwt_deny_list_sync_interval: float = 1.0
+    jwt_backend: str = "jose"
+    jwt_token_cache_size: int = 4096
 
     # api credential
     api_cipher_key:str
@@ -47,6 +53,57 @@ class Settings(BaseSettings):
     rabbitmq_port: int
     rabbitmq_user: str
     rabbitmq_pass: str
+    rabbitmq_publisher_pool_size: int = 4
+    rabbitmq_heartbeat: int = 60
+    rabbitmq_prefetch_count: int = 10
+    rabbitmq_consumer_workers: int = 4
+    rabbitmq_retry_delays: List[int] = [5, 30, 120, 600]
+
+    # webhook
+    webhook_timeout: float = 10.0
+    webhook_max_connections: int = 100
+    webhook_max_concurrency_per_endpoint: int = 5
+    webhook_retry_delays: List[int] = [10, 60, 300, 1800, 7200]
+    webhook_circuit_failure_threshold: int = 5
+    webhook_circuit_reset_seconds: int = 60
+    webhook_endpoint_cache_ttl: int = 60
+
+    # dms content extraction (worker dms_extract_tasks)
+    dms_extract_max_bytes: int = 52428800
+    dms_extract_max_chars: int = 100000
+
+    # dms thumbnail (worker dms_thumbnail_tasks)
+    dms_thumbnail_prefix: str = "thumbnails/"
+    dms_thumbnail_size: int = 256
+    dms_thumbnail_max_bytes: int = 52428800
+
+    # profile cache (in-process, per worker)
+    profile_cache_ttl: int = 30
+    profile_cache_size: int = 1024
+
+    # menu cache (in-process, per worker; invalidated across workers via redis generation key)
+    menu_cache_ttl: int = 300
+    menu_cache_size: int = 256
+
+    # response cache (redis, per route + org + roles, ETag/304); opt-in
+    response_cache_enabled: bool = False
+    response_cache_ttl: int = 300
+
+    # prometheus metrics
+    metrics_enabled: bool = True
+    metrics_redis_queues: List[str] = ["otp_tasks", "minio_delete_file_tasks"]
+    metrics_rabbitmq_queues: List[str] = ["webhook_tasks", "dms_extract_tasks", "dms_thumbnail_tasks"]
+    metrics_worker_port: int = 0
+
+    # opentelemetry tracing
+    otel_enabled: bool = False
+    otel_service_name: str = "baseapp"
+    otel_exporter_otlp_endpoint: str = "http://localhost:4317"
+
+    # enum cache (in-process, invalidated across workers via redis)
+    enum_cache_ttl: int = 3600
+    enum_cache_size: int = 512
+    enum_cache_check_interval: int = 5
 
     # Minio
     minio_host: str
@@ -62,6 +119,8 @@ class Settings(BaseSettings):
     smtp_port: int
     smtp_username: str
     smtp_password: str
+    email_template_location: str = "data/templates/email/"
+    email_attachment_location: str = "data/files/"
 
     file_location: str
 
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Query, Depends
 
 from baseapp.model.common import ApiResponse, CurrentUser, Status, UpdateStatus
 from baseapp.utils.jwt import get_current_user
+from baseapp.utils.response import ApiRoute
 
 from baseapp.config import setting
 config = setting.get_settings()
@@ -14,7 +15,7 @@ _crud = CRUD()
 from baseapp.services.permission_check_service import PermissionChecker
 permission_checker = PermissionChecker()
 
-router = APIRouter(prefix="/v1/api_credentials", tags=["API Credentials"])
+router = APIRouter(prefix="/v1/api_credentials", tags=["API Credentials"], route_class=ApiRoute)
 
 @router.post("/create", response_model=ApiResponse)
 async def create(
@@ -111,7 +112,7 @@ async def get_all_data(
         filters["status"] = status
 
     # Call CRUD function
-    response = _crud.get_all(
+    response = await _crud.aget_all(
         filters=filters,
         page=page,
         per_page=per_page,
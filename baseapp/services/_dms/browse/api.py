@@ -2,6 +2,7 @@ from fastapi import APIRouter, Query, Depends
 
 from baseapp.model.common import ApiResponse, CurrentUser, DMSOperationType
 from baseapp.utils.jwt import get_current_user
+from baseapp.utils.response import ApiRoute
 
 from baseapp.config import setting
 config = setting.get_settings()
@@ -14,7 +15,7 @@ _crud = CRUD()
 from baseapp.services.permission_check_service import PermissionChecker
 permission_checker = PermissionChecker()
 
-router = APIRouter(prefix="/v1/_dms/browse", tags=["DMS - Browse"])
+router = APIRouter(prefix="/v1/_dms/browse", tags=["DMS - Browse"], route_class=ApiRoute)
 
 @router.get("/key/{refkey_table}/{refkey_id}", response_model=ApiResponse)
 async def browse_by_key(
@@ -116,12 +117,8 @@ async def list_file_by_folder_id(
         if folder_id == "delete":
             filters["is_deleted"] = 1
         else:
+            # File di trash (is_deleted = 1) disaring oleh CRUD secara default
             filters["folder_id"] = folder_id
-            # Tambahkan filter untuk is_deleted = 0 atau tidak ada
-            filters["$or"] = [
-                {"is_deleted": 0},
-                {"is_deleted": {"$exists": False}}
-            ]
 
     # Call CRUD function
     response = _crud.list_file(
@@ -133,6 +130,32 @@ async def list_file_by_folder_id(
     )
     return ApiResponse(status=0, message="Data loaded", data=response["data"], pagination=response["pagination"])
 
+@router.get("/search", response_model=ApiResponse)
+async def search_file(
+        q: str = Query(..., min_length=2, max_length=200, description="Search text: original filename, doctype, metadata values, folder path or file content"),
+        page: int = Query(1, ge=1, description="Page number"),
+        per_page: int = Query(10, ge=1, le=100, description="Items per page"),
+        cu: CurrentUser = Depends(get_current_user)
+    ) -> ApiResponse:
+
+    if not permission_checker.has_permission(cu.roles, "_dmsbrowse", 1):  # 1 untuk izin baca
+        raise PermissionError("Access denied")
+
+    _crud.set_context(
+        user_id=cu.id,
+        org_id=cu.org_id,
+        ip_address=cu.ip_address,  # Jika ada
+        user_agent=cu.user_agent   # Jika ada
+    )
+
+    # Call CRUD function
+    response = _crud.search_file(
+        query=q.strip(),
+        page=page,
+        per_page=per_page,
+    )
+    return ApiResponse(status=0, message="Data loaded", data=response["data"], pagination=response["pagination"])
+
 @router.get("/storage", response_model=ApiResponse)
 async def storage(
         cu: CurrentUser = Depends(get_current_user)
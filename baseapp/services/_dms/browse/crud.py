@@ -6,36 +6,37 @@ from pymongo import ASCENDING, DESCENDING
 from datetime import datetime, timezone
 
 from baseapp.config import setting, mongodb, minio
-from baseapp.services.audit_trail_service import AuditTrailService
+from baseapp.services.crud_context import ContextAwareCRUD
 
 from baseapp.services._dms.upload.model import MoveToTrash
+from baseapp.services._dms.search_index import search_filter
+from baseapp.utils.filters import FilterCompiler
+from baseapp.utils.tracing import traced
 
 config = setting.get_settings()
 logger = logging.getLogger(__name__)
 
-class CRUD:
+# Field yang boleh difilter/di-sort, mengikuti index _dmsfile dan _dmsfolder di data/files/initdata.json
+_file_filters = FilterCompiler(indexed=("rec_date", "doctype", "folder_id", "refkey_id", "org_id"), residual=("refkey_table", "is_deleted"))
+_folder_filters = FilterCompiler(indexed=("rec_date", "folder_name", "level", "pid", "org_id"))
+
+@traced
+class CRUD(ContextAwareCRUD):
     def __init__(self):
         self.collection_file = "_dmsfile"
         self.collection_folder = "_dmsfolder"
         self.collection_organization = "_organization"
         self.minio_conn = minio.MinioConn()
 
-    def set_context(self, user_id: str, org_id: str, ip_address: Optional[str] = None, user_agent: Optional[str] = None):
+    @staticmethod
+    def _presign(minio_client, data: dict):
         """
-        Memperbarui konteks pengguna dan menginisialisasi AuditTrailService.
+        Presigned URL file asli (`url`) dan thumbnail-nya (`thumbnail_url`, None bila belum/tidak ada)
+        sehingga tampilan grid cukup mengunduh thumbnail.
         """
-        self.user_id = user_id
-        self.org_id = org_id
-        self.ip_address = ip_address
-        self.user_agent = user_agent
-
-        # Inisialisasi atau perbarui AuditTrailService dengan konteks terbaru
-        self.audit_trail = AuditTrailService(
-            user_id=self.user_id,
-            org_id=self.org_id,
-            ip_address=self.ip_address,
-            user_agent=self.user_agent
-        )
+        data['url'] = minio_client.presigned_get_object(config.minio_bucket, data['filename'])
+        thumbnail = data.pop('thumbnail', None)
+        data['thumbnail_url'] = minio_client.presigned_get_object(config.minio_bucket, thumbnail) if thumbnail else None
 
     def browse_by_key(self, filters: Optional[Dict[str, Any]] = None):
         """
@@ -46,15 +47,7 @@ class CRUD:
             with self.minio_conn as conn:
                 try:
                     # Apply filters
-                    query_filter = {}
-                    if filters:
-                        for key, value in filters.items():
-                            if isinstance(value, str) and value.startswith("regex:"):
-                                # Extract regex pattern from value
-                                regex_pattern = value.split("regex:", 1)[1]
-                                query_filter[key] = {"$regex": regex_pattern, "$options": "i"}  # Case-insensitive regex
-                            else:
-                                query_filter[key] = value
+                    query_filter = _file_filters.compile(filters)
 
                     # Selected fields
                     selected_fields = {
@@ -68,6 +61,7 @@ class CRUD:
                         "refkey_table": 1,
                         "refkey_name": 1,
                         "refkey_id": 1,
+                        "thumbnail": 1,
                         "_id": 0
                     }
 
@@ -91,11 +85,9 @@ class CRUD:
                         status="success"
                     )
 
-                    for i, data in enumerate(results):
-                        # presigned url
-                        minio_client = conn.get_minio_client()
-                        url = minio_client.presigned_get_object(config.minio_bucket, data['filename'])
-                        data['url'] = url
+                    minio_client = conn.get_minio_client()
+                    for data in results:
+                        self._presign(minio_client, data)
 
                     return {
                         "data": results
@@ -124,15 +116,7 @@ class CRUD:
             collection = mongo.get_database()[self.collection_folder]
             try:
                 # Apply filters
-                query_filter = {}
-                if filters:
-                    for key, value in filters.items():
-                        if isinstance(value, str) and value.startswith("regex:"):
-                            # Extract regex pattern from value
-                            regex_pattern = value.split("regex:", 1)[1]
-                            query_filter[key] = {"$regex": regex_pattern, "$options": "i"}  # Case-insensitive regex
-                        else:
-                            query_filter[key] = value
+                query_filter = _folder_filters.compile(filters)
 
                 # Selected fields
                 selected_fields = {
@@ -149,7 +133,7 @@ class CRUD:
                     {"$project": selected_fields}  # Project only selected fields
                 ]
 
-                logger.debug(f"Pipeline data: {pipeline}")
+                logger.debug("Pipeline data: %s", pipeline)
 
                 # Execute aggregation pipeline
                 cursor = collection.aggregate(pipeline)
@@ -207,20 +191,11 @@ class CRUD:
             with self.minio_conn as conn:
                 try:
                     # Apply filters
-                    query_filter = {}
-                    if filters:
-                        for key, value in filters.items():
-                            if key == "$or":
-                                # Handle special $or operator
-                                query_filter[key] = value
-                            elif isinstance(value, str) and value.startswith("regex:"):
-                                regex_pattern = value.split("regex:", 1)[1]
-                                query_filter[key] = {"$regex": regex_pattern, "$options": "i"}
-                            else:
-                                query_filter[key] = value
+                    query_filter = _file_filters.compile(filters)
+                    sort_field = _file_filters.sort_field(sort_field)
 
                     # Tambahkan default filter untuk is_deleted jika tidak ada dalam filters
-                    if "is_deleted" not in query_filter and "$or" not in query_filter:
+                    if "is_deleted" not in query_filter:
                         query_filter["$or"] = [
                             {"is_deleted": 0},
                             {"is_deleted": {"$exists": False}}
@@ -245,6 +220,7 @@ class CRUD:
                         "refkey_table": 1,
                         "refkey_name": 1,
                         "refkey_id": 1,
+                        "thumbnail": 1,
                         "_id": 0
                     }
 
@@ -274,11 +250,9 @@ class CRUD:
                         status="success"
                     )
 
-                    for i, data in enumerate(results):
-                        # presigned url
-                        minio_client = conn.get_minio_client()
-                        url = minio_client.presigned_get_object(config.minio_bucket, data['filename'])
-                        data['url'] = url
+                    minio_client = conn.get_minio_client()
+                    for data in results:
+                        self._presign(minio_client, data)
 
                     return {
                         "data": results,
@@ -305,6 +279,89 @@ class CRUD:
                     logger.exception(f"Unexpected error during deletion: {str(e)}")
                     raise
 
+    def search_file(self, query: str, page: int = 1, per_page: int = 10):
+        """
+        Full-text search file milik organisasi aktif (nama file asli, doctype + nilai metadata, folder path,
+        isi PDF/teks dari worker dms_extract_tasks) memakai text index `dms_text`, diurutkan berdasarkan relevansi.
+        """
+        if not self.org_id:
+            raise ValueError("Organization is required for search")
+
+        query_filter = search_filter(self.org_id, query)
+        skip = (page - 1) * per_page
+
+        # Aggregation pipeline
+        pipeline = [
+            {"$match": query_filter},  # Filter stage
+            {"$sort": {"score": {"$meta": "textScore"}, "_id": ASCENDING}},  # Relevansi, _id untuk urutan stabil antar halaman
+            {"$skip": skip},  # Pagination skip stage
+            {"$limit": per_page},  # Pagination limit stage
+            {"$project": {
+                "id": "$_id",
+                "filename": 1,
+                "filestat": 1,
+                "folder_id": 1,
+                "folder_path": 1,
+                "metadata": 1,
+                "doctype": 1,
+                "refkey_table": 1,
+                "refkey_name": 1,
+                "refkey_id": 1,
+                "thumbnail": 1,
+                "score": {"$meta": "textScore"},
+                "_id": 0
+            }}
+        ]
+
+        with mongodb.MongoConn() as mongo:
+            collection = mongo.get_database()[self.collection_file]
+            with self.minio_conn as conn:
+                try:
+                    results = list(collection.aggregate(pipeline))
+
+                    # Halaman yang tidak penuh adalah halaman terakhir, total bisa dihitung tanpa count_documents
+                    if 0 < len(results) < per_page or (skip == 0 and not results):
+                        total_count = skip + len(results)
+                    else:
+                        total_count = collection.count_documents(query_filter)
+
+                    # write audit trail for success
+                    self.audit_trail.log_audittrail(
+                        mongo,
+                        action="search",
+                        target=self.collection_file,
+                        target_id="agregate",
+                        details={"aggregate": pipeline},
+                        status="success"
+                    )
+
+                    minio_client = conn.get_minio_client()
+                    for data in results:
+                        self._presign(minio_client, data)
+
+                    return {
+                        "data": results,
+                        "pagination": {
+                            "current_page": page,
+                            "items_per_page": per_page,
+                            "total_items": total_count,
+                            "total_pages": (total_count + per_page - 1) // per_page,  # Ceiling division
+                        },
+                    }
+                except PyMongoError as pme:
+                    logger.error("Error searching files: %s", pme)
+                    # write audit trail for fail
+                    self.audit_trail.log_audittrail(
+                        mongo,
+                        action="search",
+                        target=self.collection_file,
+                        target_id="agregate",
+                        details={"aggregate": pipeline},
+                        status="failure",
+                        error_message=str(pme)
+                    )
+                    raise ValueError("Database error while search document") from pme
+
     def check_storage(self):
         """
         Retrieve a free space by org id (session).
@@ -433,8 +490,10 @@ class CRUD:
                         )
                         raise ValueError("File not found")
                     
-                    # remove file in minio
+                    # remove file (and its thumbnail) in minio
                     minio_client.remove_object(config.minio_bucket, obj['filename'])
+                    if obj.get('thumbnail'):
+                        minio_client.remove_object(config.minio_bucket, obj['thumbnail'])
 
                     # update space storage after deleted file
                     deleted_size = obj['filestat']['size']
@@ -497,7 +556,8 @@ class CRUD:
                             'id':file['_id'],
                             'filename':file['filename'],
                             'size':file['filestat']['size'],
-                            'folder_id':file['folder_id']
+                            'folder_id':file['folder_id'],
+                            'thumbnail':file.get('thumbnail')
                         })
                     folders = collection_folder.find({"pid": current})
                     for folder in folders:
@@ -543,6 +603,8 @@ class CRUD:
                     deleted_size = 0
                     for i in recursive_folder['files']:
                         minio_client.remove_object(config.minio_bucket, i['filename'])
+                        if i['thumbnail']:
+                            minio_client.remove_object(config.minio_bucket, i['thumbnail'])
                         deleted_size += i["size"]
                         fileID.append(i['id'])
                     del_file = collection_file.delete_many({"_id": {"$in": fileID}})
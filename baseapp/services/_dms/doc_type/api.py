@@ -2,6 +2,8 @@ from fastapi import APIRouter, Query, Depends
 
 from baseapp.model.common import ApiResponse, CurrentUser, Status, UpdateStatus
 from baseapp.utils.jwt import get_current_user
+from baseapp.utils.response import ApiRoute
+from baseapp.utils.filters import Prefix, FilterError
 
 from baseapp.config import setting
 config = setting.get_settings()
@@ -13,7 +15,7 @@ _crud = CRUD()
 from baseapp.services.permission_check_service import PermissionChecker
 permission_checker = PermissionChecker()
 
-router = APIRouter(prefix="/v1/_dms/doctype", tags=["DMS - Doctype"])
+router = APIRouter(prefix="/v1/_dms/doctype", tags=["DMS - Doctype"], route_class=ApiRoute)
 
 @router.post("/create", response_model=ApiResponse)
 async def create(req: DocType, cu: CurrentUser = Depends(get_current_user)) -> ApiResponse:
@@ -53,7 +55,8 @@ async def get_all_data(
         sort_order: str = Query("asc", regex="^(asc|desc)$", description="Sort order: 'asc' or 'desc'"),
         cu: CurrentUser = Depends(get_current_user),
         name: str = Query(None, description="Filter by name"),
-        name_contains: str = Query(None, description="Name contains (case insensitive)"),
+        name_starts_with: str = Query(None, description="Name starts with (case sensitive)"),
+        name_contains: str = Query(None, deprecated=True, description="No longer supported, use name_starts_with"),
         status: str = Query(None, description="Status doctype")
     ) -> ApiResponse:
 
@@ -77,14 +80,18 @@ async def get_all_data(
     if status:
         filters["status"] = status
 
+    # Pencarian substring tidak bisa memakai index, diganti prefix (name_starts_with)
+    if name_contains:
+        raise FilterError("name_contains is no longer supported, use name_starts_with.")
+
     # addtional when filter running
     if name:
         filters["name"] = name
-    elif name_contains:
-        filters["name"] = {"$regex": f".*{name_contains}.*", "$options": "i"}
+    elif name_starts_with:
+        filters["name"] = Prefix(name_starts_with)
 
     # Call CRUD function
-    response = _crud.get_all(
+    response = await _crud.aget_all(
         filters=filters,
         page=page,
         per_page=per_page,
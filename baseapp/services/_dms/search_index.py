@@ -0,0 +1,113 @@
+import logging, re
+from datetime import datetime, timezone
+from typing import Callable, Iterable, List
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+# Flag Redis: backfill hanya dijalankan satu proses, sekali per database
+DMS_SEARCH_MIGRATED_KEY = "migration:dms_search_text"
+DMS_CONTENT_MIGRATED_KEY = "migration:dms_content"
+
+def build_search_text(doctype_name: str, metadata: dict) -> str:
+    """
+    Teks yang diindeks text index `dms_text` (lihat data/files/initdata.json): nama doctype dan nilai metadata.
+    Text index MongoDB tidak bisa mengindeks nilai dict dengan key dinamis, jadi nilainya diratakan ke satu field.
+    """
+    values = [doctype_name or ""]
+    for value in (metadata or {}).values():
+        if isinstance(value, (list, tuple)):
+            values.extend(str(v) for v in value if v not in (None, ""))
+        elif value not in (None, ""):
+            values.append(str(value))
+    return " ".join(v for v in values if v)
+
+def search_filter(org_id: str, query: str) -> dict:
+    """
+    Query full-text search file satu organisasi. org_id adalah prefix equality text index `dms_text`,
+    sehingga pencarian hanya menyentuh entri organisasi tersebut.
+    """
+    return {
+        "org_id": org_id,
+        "$text": {"$search": query},
+        "is_deleted": {"$ne": 1}
+    }
+
+def backfill_search_text(db, batch_size: int = 500) -> int:
+    """Mengisi `search_text` file yang diupload sebelum field tersebut ada. Return jumlah file yang diisi."""
+    collection = db["_dmsfile"]
+    collection_doctype = db["_dmsdoctype"]
+    doctype_names = {}
+    updated = 0
+    batch = []
+    for obj in collection.find({"search_text": {"$exists": False}}, {"doctype": 1, "metadata": 1}):
+        doctype = obj.get("doctype")
+        if doctype not in doctype_names:
+            found = collection_doctype.find_one({"_id": doctype}, {"name": 1})
+            doctype_names[doctype] = found.get("name", "") if found else ""
+        search_text = build_search_text(doctype_names[doctype], obj.get("metadata"))
+        batch.append(UpdateOne({"_id": obj["_id"]}, {"$set": {"search_text": search_text}}))
+        if len(batch) >= batch_size:
+            collection.bulk_write(batch, ordered=False)
+            updated += len(batch)
+            batch = []
+    if batch:
+        collection.bulk_write(batch, ordered=False)
+        updated += len(batch)
+    return updated
+
+def queue_missing_extraction(db, publish_batch: Callable[[List[dict]], int], extensions: Iterable[str], batch_size: int = 500) -> int:
+    """
+    Mengirim task ekstraksi isi untuk file (ekstensi `extensions`) yang diupload sebelum ada worker
+    dms_extract_tasks, lalu menandainya content_status "pending". Return jumlah task yang dikirim.
+    """
+    collection = db["_dmsfile"]
+    pattern = "\\.(" + "|".join(re.escape(extension.lstrip(".")) for extension in extensions) + ")$"
+    query = {"content_status": {"$exists": False}, "filename": {"$regex": pattern, "$options": "i"}}
+    queued = 0
+    batch = []
+
+    def flush():
+        # Task dikirim dulu baru ditandai pending; bila terputus di tengah, file dikirim ulang (aman, idempotent)
+        sent = publish_batch([{"file_id": file_id} for file_id in batch])
+        if sent != len(batch):
+            raise RuntimeError(f"Only {sent}/{len(batch)} extraction task(s) could be queued")
+        collection.update_many({"_id": {"$in": batch}}, {"$set": {"content_status": "pending"}})
+        return sent
+
+    for obj in collection.find(query, {"_id": 1}):
+        batch.append(obj["_id"])
+        if len(batch) >= batch_size:
+            queued += flush()
+            batch = []
+    if batch:
+        queued += flush()
+    return queued
+
+def _run_once(redis_conn, key: str, migration: Callable[[], int]) -> int:
+    """
+    Menjalankan migrasi sekali per database. Dijaga flag di Redis agar hanya satu proses yang
+    menjalankannya; flag dihapus bila gagal sehingga dicoba lagi pada startup berikutnya.
+    """
+    if not redis_conn.set(key, datetime.now(timezone.utc).isoformat(), nx=True):
+        return 0
+    try:
+        return migration()
+    except Exception:
+        redis_conn.delete(key)
+        raise
+
+def migrate_dms_search(redis_conn, db) -> int:
+    """Sekali jalan: backfill search_text file lama."""
+    updated = _run_once(redis_conn, DMS_SEARCH_MIGRATED_KEY, lambda: backfill_search_text(db))
+    if updated:
+        logger.info(f"{updated} DMS file(s) backfilled with search_text.")
+    return updated
+
+def migrate_dms_content(redis_conn, db, publish_batch: Callable[[List[dict]], int], extensions: Iterable[str]) -> int:
+    """Sekali jalan: antrikan ekstraksi isi file lama yang belum pernah diproses."""
+    queued = _run_once(redis_conn, DMS_CONTENT_MIGRATED_KEY, lambda: queue_missing_extraction(db, publish_batch, extensions))
+    if queued:
+        logger.info(f"{queued} DMS file(s) queued for content extraction.")
+    return queued
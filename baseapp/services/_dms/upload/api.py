@@ -3,6 +3,7 @@ from fastapi import APIRouter, Depends, File, UploadFile, Form
 
 from baseapp.model.common import ApiResponse, CurrentUser
 from baseapp.utils.jwt import get_current_user
+from baseapp.utils.response import ApiRoute
 
 from baseapp.config import setting
 config = setting.get_settings()
@@ -29,7 +30,7 @@ async def parse_metadata(
     except json.JSONDecodeError:
         raise ValueError("Invalid JSON format in metadata")
     
-router = APIRouter(prefix="/v1/_dms", tags=["DMS - Upload"])
+router = APIRouter(prefix="/v1/_dms", tags=["DMS - Upload"], route_class=ApiRoute)
 
 @router.post("/upload", response_model=ApiResponse)
 async def create(file: UploadFile = File(...), payload: SetMetaData = Depends(parse_metadata), cu: CurrentUser = Depends(get_current_user)) -> ApiResponse:
@@ -1,7 +1,6 @@
-import logging,io,re
+import asyncio,logging,io,re
 
 from pymongo.errors import PyMongoError
-from typing import Optional
 from datetime import datetime, timezone
 from minio.error import S3Error
 from magic import from_buffer
@@ -11,12 +10,18 @@ from fastapi import UploadFile
 from baseapp.utils.utility import generate_uuid
 from baseapp.config import setting, mongodb, minio
 from baseapp.services._dms.upload.model import UploadFile, SetMetaData
-from baseapp.services.audit_trail_service import AuditTrailService
+from baseapp.services.crud_context import ContextAwareCRUD
+from baseapp.services._dms.search_index import build_search_text
+from baseapp.services.publisher import publish_message
+from baseapp.services._rabbitmq_worker._dms_extract_worker import DMS_EXTRACT_QUEUE, is_extractable
+from baseapp.services._rabbitmq_worker._dms_thumbnail_worker import DMS_THUMBNAIL_QUEUE, has_thumbnail_source
+from baseapp.utils.tracing import traced
 
 config = setting.get_settings()
 logger = logging.getLogger(__name__)
 
-class CRUD:
+@traced
+class CRUD(ContextAwareCRUD):
     def __init__(self):
         self.collection_file = "_dmsfile"
         self.collection_folder = "_dmsfolder"
@@ -24,23 +29,6 @@ class CRUD:
         self.collection_organization = "_organization"
         self.minio_conn = minio.MinioConn()
 
-    def set_context(self, user_id: str, org_id: str, ip_address: Optional[str] = None, user_agent: Optional[str] = None):
-        """
-        Memperbarui konteks pengguna dan menginisialisasi AuditTrailService.
-        """
-        self.user_id = user_id
-        self.org_id = org_id
-        self.ip_address = ip_address
-        self.user_agent = user_agent
-
-        # Inisialisasi atau perbarui AuditTrailService dengan konteks terbaru
-        self.audit_trail = AuditTrailService(
-            user_id=self.user_id,
-            org_id=self.org_id,
-            ip_address=self.ip_address,
-            user_agent=self.user_agent
-        )
-
     def get_file_extension(self, file: UploadFile) -> str:
         """
         Get the extension of the uploaded file.
@@ -124,11 +112,16 @@ class CRUD:
                 inserted_folder = collection_folder.insert_one(insertFolder)
                 pidFolder = inserted_folder.inserted_id
             else:
-                logger.debug(f"data folder: {getFolder}")
+                logger.debug("data folder: %s", getFolder)
                 pidFolder = getFolder[0]['_id']
 
-        return pidFolder,folderString
+        return pidFolder,folderString,doctypeList.get('name')
     
+    def _queue_post_processing(self, file_id: str, extract: bool, thumbnail: bool):
+        for queue_name, enabled in ((DMS_EXTRACT_QUEUE, extract), (DMS_THUMBNAIL_QUEUE, thumbnail)):
+            if enabled and not publish_message(queue_name, {"file_id": file_id}):
+                logger.warning(f"File {file_id} uploaded but its {queue_name} task could not be queued.")
+
     async def upload_file_to_minio(self, file: UploadFile, payload: SetMetaData):
         """
         Upload file.
@@ -159,7 +152,7 @@ class CRUD:
                     storage_minio = self.get_storage_org(collection_org)
 
                     # generate folder
-                    pid_folder, folderString = self.create_folders(mongo, payload)
+                    pid_folder, folderString, doctype_name = self.create_folders(mongo, payload)
                     
                     object_name = f"{UUID}{file_extension}"
                     file_stream = io.BytesIO(file_content)
@@ -196,11 +189,21 @@ class CRUD:
                     obj["refkey_id"] = payload["refkey_id"]
                     obj["refkey_table"] = payload["refkey_table"]
                     obj["refkey_name"] = payload["refkey_name"]
+                    obj["search_text"] = build_search_text(doctype_name, payload["metadata"])
+                    extractable = is_extractable(object_name)
+                    if extractable:
+                        obj["content_status"] = "pending"
+                    thumbnail = has_thumbnail_source(object_name)
+                    if thumbnail:
+                        obj["thumbnail_status"] = "pending"
                     insert_metadata = collection_file.insert_one(obj)
 
                     # update storage
                     collection_org.find_one_and_update({"_id": self.org_id}, {"$set": {"usedstorage":storage_minio+file_size}}, return_document=True)
 
+                    # ekstraksi isi (full-text search) dan thumbnail dikerjakan worker RabbitMQ
+                    await asyncio.to_thread(self._queue_post_processing, UUID, extractable, thumbnail)
+
                     return {"filename":object_name,"id":insert_metadata.inserted_id,"folder_path":obj["folder_path"]}
                 except S3Error  as s3e:
                     logger.error(f"Error uploading file: {str(s3e)}")
@@ -223,6 +226,8 @@ class CRUD:
             obj["mod_by"] = self.user_id
             obj["mod_date"] = datetime.now(timezone.utc)
             try:
+                doctype = mongo.get_database()[self.collection_doctype].find_one({"_id": obj["doctype"]}, {"name": 1})
+                obj["search_text"] = build_search_text(doctype["name"] if doctype else "", obj["metadata"])
                 obj["folder_id"] = ""
                 obj["folder_path"] = ""
                 update_metadata = collection.find_one_and_update({"_id": file_id}, {"$set": obj}, return_document=True)
@@ -3,6 +3,8 @@ from typing import Optional
 
 from baseapp.model.common import ApiResponse, CurrentUser
 from baseapp.utils.jwt import get_current_user
+from baseapp.utils.response import ApiRoute
+from baseapp.services.response_cache import cache_response
 
 from baseapp.config import setting
 config = setting.get_settings()
@@ -15,7 +17,7 @@ _crud = CRUD()
 from baseapp.services.permission_check_service import PermissionChecker
 permission_checker = PermissionChecker()
 
-router = APIRouter(prefix="/v1/_enum", tags=["Enum"])
+router = APIRouter(prefix="/v1/_enum", tags=["Enum"], route_class=ApiRoute)
 
 @router.post("/create", response_model=ApiResponse)
 async def create(req: Enum, cu: CurrentUser = Depends(get_current_user)) -> ApiResponse:
@@ -49,6 +51,7 @@ async def update_by_id(enum_id: str, req: EnumUpdate, cu: CurrentUser = Depends(
     return ApiResponse(status=0, message="Data updated", data=response)
 
 @router.get("", response_model=ApiResponse)
+@cache_response("_enum", permission=("_enum", 1), audit_target="_enum")
 async def get_all_data(
         page: int = Query(1, ge=1, description="Page number"),
         per_page: int = Query(10, ge=1, le=100, description="Items per page"),
@@ -86,7 +89,7 @@ async def get_all_data(
             del filters["org_id"]
 
     # Call CRUD function
-    response = _crud.get_all(
+    response = await _crud.aget_all(
         filters=filters,
         page=page,
         per_page=per_page,
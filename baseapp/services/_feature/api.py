@@ -2,6 +2,8 @@ from fastapi import APIRouter, Depends
 
 from baseapp.model.common import ApiResponse, CurrentUser
 from baseapp.utils.jwt import get_current_user
+from baseapp.utils.response import ApiRoute
+from baseapp.services.response_cache import cache_response
 
 from baseapp.config import setting
 config = setting.get_settings()
@@ -13,7 +15,7 @@ _crud = CRUD()
 from baseapp.services.permission_check_service import PermissionChecker
 permission_checker = PermissionChecker()
 
-router = APIRouter(prefix="/v1/_feature", tags=["Feature"])
+router = APIRouter(prefix="/v1/_feature", tags=["Feature"], route_class=ApiRoute)
 
 @router.put("/update", response_model=ApiResponse)
 async def update_feature_permission(req: Feature, cu: CurrentUser = Depends(get_current_user)) -> ApiResponse:
@@ -32,6 +34,7 @@ async def update_feature_permission(req: Feature, cu: CurrentUser = Depends(get_
     return ApiResponse(status=0, message="Data updated", data=response)
     
 @router.get("/list/{role_id}", response_model=ApiResponse)
+@cache_response("_feature", permission=("_feature", 1), audit_target="_featureonrole")
 async def find_by_role_id(role_id: str, cu: CurrentUser = Depends(get_current_user)) -> ApiResponse:
     if not permission_checker.has_permission(cu.roles, "_feature", 1):  # 1 untuk izin baca
         raise PermissionError("Access denied")
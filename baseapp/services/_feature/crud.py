@@ -5,35 +5,21 @@ from typing import Optional, Dict, Any
 
 from baseapp.config import setting, mongodb
 from baseapp.services._feature.model import Feature
-from baseapp.services.audit_trail_service import AuditTrailService
+from baseapp.services.crud_context import ContextAwareCRUD
+from baseapp.services._menu.crud import invalidate_menu_cache
+from baseapp.services.response_cache import invalidate_response_cache, PERMISSION_TAG
 from baseapp.utils.utility import get_enum, generate_uuid
+from baseapp.utils.tracing import traced
 
 config = setting.get_settings()
 logger = logging.getLogger(__name__)
 
-class CRUD:
+@traced
+class CRUD(ContextAwareCRUD):
     def __init__(self):
         self.collection_feature = "_feature"
         self.collection_feature_on_role = "_featureonrole"
 
-    def set_context(self, user_id: str, org_id: str, authority: int, ip_address: Optional[str] = None, user_agent: Optional[str] = None):
-        """
-        Memperbarui konteks pengguna dan menginisialisasi AuditTrailService.
-        """
-        self.user_id = user_id
-        self.org_id = org_id
-        self.authority = authority
-        self.ip_address = ip_address
-        self.user_agent = user_agent
-
-        # Inisialisasi atau perbarui AuditTrailService dengan konteks terbaru
-        self.audit_trail = AuditTrailService(
-            user_id=self.user_id,
-            org_id=self.org_id,
-            ip_address=self.ip_address,
-            user_agent=self.user_agent
-        )
-
     def set_permission(self, data: Feature):
         """
         Update a role's data by ID.
@@ -81,6 +67,8 @@ class CRUD:
                         details={"$set": upd_obj},
                         status="success"
                     )
+                    invalidate_menu_cache()
+                    invalidate_response_cache(PERMISSION_TAG)
                     return update_permission
                 else:
                     resPerm = bitRA[obj['key_action']]
@@ -91,6 +79,8 @@ class CRUD:
                     obj_add["permission"] = resPerm
                     obj_add["org_id"] = self.org_id
                     result = collection_role.insert_one(obj_add) 
+                    invalidate_menu_cache()
+                    invalidate_response_cache(PERMISSION_TAG)
                     return obj
             except PyMongoError as pme:
                 logger.error(f"Database error occurred: {str(pme)}")
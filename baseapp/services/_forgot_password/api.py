@@ -1,6 +1,7 @@
 from fastapi import APIRouter
 
 from baseapp.model.common import ApiResponse
+from baseapp.utils.response import ApiRoute
 
 from baseapp.config import setting
 config = setting.get_settings()
@@ -9,7 +10,7 @@ from baseapp.services._forgot_password.model import OTPRequest, VerifyOTPRequest
 from baseapp.services._forgot_password.crud import CRUD
 _crud = CRUD()
 
-router = APIRouter(prefix="/v1/forgot-password", tags=["Forgot Password"])
+router = APIRouter(prefix="/v1/forgot-password", tags=["Forgot Password"], route_class=ApiRoute)
 
 @router.post("/send-otp", response_model=ApiResponse)
 async def send_otp(req: OTPRequest) -> ApiResponse:
@@ -8,10 +8,12 @@ from baseapp.services.redis_queue import RedisQueueManager
 from baseapp.services._forgot_password.model import OTPRequest, VerifyOTPRequest, ResetPasswordRequest
 from baseapp.utils.utility import hash_password, generate_uuid
 from baseapp.utils.jwt import revoke_all_refresh_tokens
+from baseapp.utils.tracing import traced
 
 config = setting.get_settings()
 logger = logging.getLogger(__name__)
 
+@traced
 class CRUD:
     def __init__(self):
         self.redis_conn = RedisConn()
@@ -42,7 +44,7 @@ class CRUD:
             with self.redis_conn as conn:
                 conn.setex(f"otp:{req.email}", 300, otp)
 
-            self.queue_manager.enqueue_task({"email": req.email, "otp": otp, "subject":"Request Forgot Password", "body":f"Berikut kode OTP Anda: {otp}"})
+            self.queue_manager.enqueue_task({"email": req.email, "template": "forgot_password_otp", "data": {"otp": otp}})
             return {"status": "queued", "message": "OTP has been sent"}
         except Exception as e:
             raise
@@ -2,6 +2,8 @@ from fastapi import APIRouter, Depends
 
 from baseapp.model.common import ApiResponse, CurrentUser
 from baseapp.utils.jwt import get_current_user
+from baseapp.utils.response import ApiRoute
+from baseapp.services.response_cache import cache_response
 
 from baseapp.config import setting
 config = setting.get_settings()
@@ -9,9 +11,10 @@ config = setting.get_settings()
 from baseapp.services._menu.crud import CRUD
 _crud = CRUD()
 
-router = APIRouter(prefix="/v1/_menu", tags=["Menu"])
+router = APIRouter(prefix="/v1/_menu", tags=["Menu"], route_class=ApiRoute)
     
 @router.get("/sidemenu", response_model=ApiResponse)
+@cache_response("_menu", always_etag=True)
 async def sidemenu(cu: CurrentUser = Depends(get_current_user)) -> ApiResponse:
     _crud.set_context(
         user_id=cu.id,
@@ -22,6 +25,5 @@ async def sidemenu(cu: CurrentUser = Depends(get_current_user)) -> ApiResponse:
         user_agent=cu.user_agent   # Jika ada
     )
 
-    response = _crud.get_all()
-    return ApiResponse(status=0, message="Data found", data=response)
-
+    menu = _crud.get_all()
+    return ApiResponse(status=0, message="Data found", data=menu)
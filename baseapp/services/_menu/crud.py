@@ -1,59 +1,82 @@
-import logging, uuid
+import logging
 
 from pymongo.errors import PyMongoError
 from pymongo import ASCENDING
-from typing import Optional, List
 from operator import itemgetter
 
 from baseapp.config import setting, mongodb
-from baseapp.services.audit_trail_service import AuditTrailService
+from baseapp.config.redis import RedisConn
+from baseapp.services.crud_context import ContextAwareCRUD
+from baseapp.services.response_cache import invalidate_response_cache
+from baseapp.utils.cache import TTLCache
 from baseapp.utils.utility import get_enum
+from baseapp.utils.tracing import traced
 
 config = setting.get_settings()
 logger = logging.getLogger(__name__)
 
-class CRUD:
+# Cache menu per worker (tree menu yang sudah jadi di-cache response cache /v1/_menu/sidemenu):
+# - katalog: seluruh _menu + dokumen _feature-nya + enum ROLEACTION
+# - permission: roles user -> gabungan bitmask permission per feature
+# Invalidasi lintas worker lewat counter Redis menu_cache:generation: setiap request membandingkan
+# counter tersebut dengan generation cache lokal dan mengosongkan cache bila berbeda.
+MENU_GENERATION_KEY = "menu_cache:generation"
+_catalog_cache = TTLCache(maxsize=1, ttl=config.menu_cache_ttl)
+_permission_cache = TTLCache(maxsize=config.menu_cache_size, ttl=config.menu_cache_ttl)
+_generation = {"value": None}
+
+def invalidate_menu_cache():
+    """Dipanggil setiap kali _menu, _feature atau _featureonrole berubah."""
+    _catalog_cache.clear()
+    _permission_cache.clear()
+    try:
+        with RedisConn() as redis_conn:
+            _generation["value"] = str(redis_conn.incr(MENU_GENERATION_KEY))
+    except Exception as e:
+        logger.warning(f"Unable to publish menu cache invalidation: {e}")
+    invalidate_response_cache("_menu")
+
+def _sync_generation() -> bool:
+    """
+    Samakan cache lokal dengan menu_cache:generation. Return False bila Redis tidak bisa dibaca:
+    cache lokal tidak dipakai (dibaca ulang dari MongoDB) sampai Redis kembali.
+    """
+    try:
+        with RedisConn() as redis_conn:
+            generation = redis_conn.get(MENU_GENERATION_KEY)
+    except Exception as e:
+        logger.warning(f"Unable to read menu cache generation: {e}")
+        return False
+    if generation != _generation["value"]:
+        _catalog_cache.clear()
+        _permission_cache.clear()
+        _generation["value"] = generation
+    return True
+
+@traced
+class CRUD(ContextAwareCRUD):
     def __init__(self):
         self.collection_feature = "_feature"
         self.collection_feature_on_role = "_featureonrole"
         self.collection_menu = "_menu"
 
-    def set_context(self, user_id: str, org_id: str, authority: int, roles: List, ip_address: Optional[str] = None, user_agent: Optional[str] = None):
-        """
-        Memperbarui konteks pengguna dan menginisialisasi AuditTrailService.
-        """
-        self.user_id = user_id
-        self.org_id = org_id
-        self.authority = authority
-        self.roles = roles
-        self.ip_address = ip_address
-        self.user_agent = user_agent
-
-        # Inisialisasi atau perbarui AuditTrailService dengan konteks terbaru
-        self.audit_trail = AuditTrailService(
-            user_id=self.user_id,
-            org_id=self.org_id,
-            ip_address=self.ip_address,
-            user_agent=self.user_agent
-        )
-
-    def get_all(self):
-        """
-        Retrieve all documents from the collection with optional filters, pagination, and sorting.
-        """
-        with mongodb.MongoConn() as mongo:
-            collection_feature = mongo.get_database()[self.collection_feature]
-            collection_feature_on_role = mongo.get_database()[self.collection_feature_on_role]
-            collection_menu = mongo.get_database()[self.collection_menu]
-            bitRA = get_enum(mongo,"ROLEACTION")
-            bitRA = bitRA["value"]
-            try:
-                # Apply filters
-                query_filter = {"r_id": {"$in": self.roles}}
-
-                # Selected fields
-                # menu
-                selected_fields_1 = {
+    def _load_catalog(self, mongo):
+        """Seluruh menu beserta feature-nya dalam satu aggregation ($lookup), bukan find_one per menu."""
+        collection_menu = mongo.get_database()[self.collection_menu]
+        bitRA = get_enum(mongo,"ROLEACTION")
+        pipeline = [
+            {"$sort": {"sortnumber": ASCENDING}},  # Sorting stage
+            # Lookup stage to join with feature data
+            {
+                "$lookup": {
+                    "from": self.collection_feature,
+                    "localField": "feature",
+                    "foreignField": "_id",
+                    "as": "feature_docs"
+                }
+            },
+            {
+                "$project": {
                     "id": "$_id",
                     "value": 1,
                     "icon": 1,
@@ -61,114 +84,108 @@ class CRUD:
                     "feature": 1,
                     "parent": 1,
                     "sortnumber": 1,
+                    "feature_docs": {"$arrayElemAt": ["$feature_docs", 0]},
                     "_id": 0
                 }
-                # feature on role
-                selected_fields_2 = {
-                    "id": "$_id",
-                    "r_id": 1,
-                    "permission": 1,
-                    "f_id": 1,
-                    "_id": 0
-                }
+            }
+        ]
+        return {"menu": list(collection_menu.aggregate(pipeline)), "bitRA": bitRA["value"]}
+
+    def _load_permission(self, mongo):
+        """Gabungan (OR) permission semua role user per feature."""
+        collection_feature_on_role = mongo.get_database()[self.collection_feature_on_role]
+        cursor = collection_feature_on_role.find({"r_id": {"$in": self.roles}}, {"f_id": 1, "permission": 1, "_id": 0})
+        rolesFeature = {}
+        for i in cursor:
+            rolesFeature[i['f_id']] = i['permission'] | rolesFeature.get(i['f_id'], 0)
+        return rolesFeature
+
+    def _build_tree(self, catalog, rolesFeature):
+        bitRA = catalog["bitRA"]
+        resultsMenu = []
+        resultsParent = []
+        resultsParentID = {}
+        for data in catalog["menu"]:
+            feature_docs = data.get("feature_docs") if data['feature'] != "" else None
+
+            # region 
+            # apabila menggunakan model submenu maka script dibawah di aktifkan
+            if data['parent'] == '' and data['feature'] == "":
+                resultsParent.append({
+                    'id':data['id'],
+                    'value':data['value'],
+                    'details':data['details'],
+                    'icon':f"mdi mdi-{data['icon']}",
+                    'parent':'',
+                    'sortnumber':data['sortnumber']
+                })
+            # endregion
+
+            if feature_docs != None:
+                if self.authority & feature_docs['authority']:
+                    if  feature_docs['_id'] in rolesFeature:
+                        if bitRA['view'] & rolesFeature[feature_docs['_id']] - (feature_docs['negasiperm'][str(self.authority)] & rolesFeature[feature_docs['_id']]):
+                            objMenu = {
+                                'id':feature_docs['feature_name'],
+                                'menuid':data['id'],
+                                'value':data['value'],
+                                'details':data['details'],
+                                'icon':f"mdi mdi-{data['icon']}",
+                                'parent':data['parent'],
+                                'sortnumber':data['sortnumber']
+                            }
+                            if feature_docs['feature_name'] == "_organization":
+                                if self.authority & 1:
+                                    objMenu["value"] = "Partner"
+                                    objMenu["details"] = "Partner"
+                                elif self.authority & 2:
+                                    objMenu["value"] = "Client"
+                                    objMenu["details"] = "Client"
+                                elif self.authority & 4:
+                                    objMenu["value"] = "Customer"
+                                    objMenu["details"] = "Customer"
+                            resultsMenu.append(objMenu)
+
+                            if data['parent'] != '':
+                                resultsParentID[data['parent']]=1
+
+        for parentdata in resultsParent:
+            if resultsParentID.get(parentdata['id']) != None:
+                resultsMenu.append(parentdata)                
+
+        return sorted(resultsMenu, key=itemgetter('sortnumber'))
 
-                # Aggregation pipeline
-                # menu
-                pipeline_1 = [
-                    {"$project": selected_fields_1},  # Project only selected fields
-                    {"$sort": {"sortnumber": ASCENDING}},  # Sorting stage
-                ]
-
-                # feature on role
-                pipeline_2 = [
-                    {"$match": query_filter},  # Filter stage
-                    {"$project": selected_fields_2}  # Project only selected fields
-                ]
-
-                # Execute aggregation pipeline
-                cursor_1 = collection_menu.aggregate(pipeline_1)
-                cursor_2 = collection_feature_on_role.aggregate(pipeline_2)
-                
-                results_1 = list(cursor_1)
-                results_2 = list(cursor_2)
-
-                rolesFeature = {}
-                for i in results_2:
-                    if i['f_id'] not in rolesFeature:
-                        rolesFeature[i['f_id']] = i['permission']
-                    else:
-                        rolesFeature[i['f_id']] = i['permission'] | rolesFeature[i['f_id']]
-                # logger.debug(f"roles of feature: {rolesFeature}")
-                    
-                resultsMenu = []
-                resultsParent = []
-                resultsParentID = {}
-                for data in results_1:
-                    # region join to feature table
-                    data["feature_docs"] = None
-                    if data['feature'] != "":
-                        data["feature_docs"] = collection_feature.find_one({"_id":data['feature']})
-                    # endregion
-
-                    # region 
-                    # apabila menggunakan model submenu maka script dibawah di aktifkan
-                    if data['parent'] == '' and data['feature'] == "":
-                        resultsParent.append({
-                            'id':data['id'],
-                            'value':data['value'],
-                            'details':data['details'],
-                            'icon':f"mdi mdi-{data['icon']}",
-                            'parent':'',
-                            'sortnumber':data['sortnumber']
-                        })
-                    # endregion
-
-                    # logger.debug(f"data menu : {data}")
-                    if data['feature_docs'] != None:
-                        if self.authority & data['feature_docs']['authority']:
-                            if  data['feature_docs']['_id'] in rolesFeature:
-                                if bitRA['view'] & rolesFeature[data['feature_docs']['_id']] - (data['feature_docs']['negasiperm'][str(self.authority)] & rolesFeature[data['feature_docs']['_id']]):
-                                    objMenu = {
-                                        'id':data['feature_docs']['feature_name'],
-                                        'menuid':data['id'],
-                                        'value':data['value'],
-                                        'details':data['details'],
-                                        'icon':f"mdi mdi-{data['icon']}",
-                                        'parent':data['parent'],
-                                        'sortnumber':data['sortnumber']
-                                    }
-                                    if data['feature_docs']['feature_name'] == "_organization":
-                                        if self.authority & 1:
-                                            objMenu["value"] = "Partner"
-                                            objMenu["details"] = "Partner"
-                                        elif self.authority & 2:
-                                            objMenu["value"] = "Client"
-                                            objMenu["details"] = "Client"
-                                        elif self.authority & 4:
-                                            objMenu["value"] = "Customer"
-                                            objMenu["details"] = "Customer"
-                                    resultsMenu.append(objMenu)
-
-                                    if data['parent'] != '':
-                                        resultsParentID[data['parent']]=1
-
-                for parentdata in resultsParent:
-                    if resultsParentID.get(parentdata['id']) != None:
-                        resultsMenu.append(parentdata)                
-
-                return sorted(resultsMenu, key=itemgetter('sortnumber'))
-            except PyMongoError as pme:
-                logger.error(f"Error retrieving role with filters and pagination: {str(e)}")
-                # write audit trail for success
-                self.audit_trail.log_audittrail(
-                    mongo,
-                    action="retrieve",
-                    target=self.collection_feature_on_role,
-                    target_id="agregate",
-                    details={"aggregate": pipeline_2},
-                    status="failure"
-                )
-                raise ValueError("Database error while retrieve document") from pme
-            except Exception as e:
-                logger.exception(f"Unexpected error during deletion: {str(e)}")
-                raise
\ No newline at end of file
+    def get_all(self):
+        """
+        Retrieve menu tree of the current user.
+        Katalog dan permission dibaca dari cache; tree dibangun ulang di memori setiap request.
+        """
+        roles_key = tuple(sorted(self.roles or []))
+        use_cache = _sync_generation()
+        catalog = _catalog_cache.get("catalog") if use_cache else None
+        rolesFeature = _permission_cache.get(roles_key) if use_cache else None
+        if catalog is None or rolesFeature is None:
+            with mongodb.MongoConn() as mongo:
+                try:
+                    if catalog is None:
+                        catalog = self._load_catalog(mongo)
+                        if use_cache:
+                            _catalog_cache.set("catalog", catalog)
+                    if rolesFeature is None:
+                        rolesFeature = self._load_permission(mongo)
+                        if use_cache:
+                            _permission_cache.set(roles_key, rolesFeature)
+                except PyMongoError as pme:
+                    logger.error(f"Error retrieving menu: {str(pme)}")
+                    # write audit trail for fail
+                    self.audit_trail.log_audittrail(
+                        mongo,
+                        action="retrieve",
+                        target=self.collection_menu,
+                        target_id="agregate",
+                        details={"roles": self.roles},
+                        status="failure"
+                    )
+                    raise ValueError("Database error while retrieve document") from pme
+
+        return self._build_tree(catalog, rolesFeature)
@@ -8,10 +8,11 @@ from baseapp.config import setting
 config = setting.get_settings()
 
 from baseapp.utils.jwt import get_current_user
+from baseapp.utils.response import ApiRoute
 from baseapp.services._org import model
 
-from baseapp.services._org.crud import CRUD
-_crud = CRUD()
+from baseapp.services import registry
+_crud = registry.get_service("_organization")
 
 from baseapp.services.permission_check_service import PermissionChecker
 permission_checker = PermissionChecker()
@@ -19,7 +20,7 @@ permission_checker = PermissionChecker()
 import logging
 logger = logging.getLogger()
 
-router = APIRouter(prefix="/v1/_organization", tags=["Organization"])
+router = APIRouter(prefix="/v1/_organization", tags=["Organization"], route_class=ApiRoute)
 
 @router.post("/init_owner", response_model=ApiResponse)
 async def create(req: model.InitRequest) -> ApiResponse:
@@ -101,7 +102,7 @@ async def get_all_data(
         filters["status"] = status
 
     # Call CRUD function
-    response = _crud.get_all(
+    response = await _crud.aget_all(
         filters=filters,
         page=page,
         per_page=per_page,
@@ -2,44 +2,33 @@ import logging
 from datetime import datetime,timezone
 
 from pymongo.errors import DuplicateKeyError, PyMongoError
-from pymongo import ASCENDING, DESCENDING
-
-from typing import Optional, Dict, Any
 
 from baseapp.config import setting, mongodb
 from baseapp.services._org import model
 from baseapp.model.common import UpdateStatus, MINIO_STORAGE_SIZE_LIMIT
 from baseapp.utils.utility import hash_password, get_enum, generate_uuid
-from baseapp.services.audit_trail_service import AuditTrailService
+from baseapp.services.repository import BaseRepository
+from baseapp.services.profile.crud import invalidate_org
+from baseapp.utils.tracing import traced
 
 config = setting.get_settings()
 logger = logging.getLogger(__name__)
 
-class CRUD:
+@traced
+class CRUD(BaseRepository):
+    entity_name = "Organization"
+    list_fields = ("org_name", "org_initial", "org_phone", "org_address", "org_desc", "org_email", "status")
+    indexed_fields = ("rec_date", "authority", "ref_id", "org_name")
+    residual_fields = ("status",)
+
     def __init__(self):
-        self.collection_org = "_organization"
+        self.collection_name = "_organization"
+        self.collection_org = self.collection_name
         self.collection_user = "_user"
         self.collection_role = "_role"
         self.storage = MINIO_STORAGE_SIZE_LIMIT
         self.usedstorage = 0
 
-    def set_context(self, user_id: str, org_id: str, ip_address: Optional[str] = None, user_agent: Optional[str] = None):
-        """
-        Memperbarui konteks pengguna dan menginisialisasi AuditTrailService.
-        """
-        self.user_id = user_id
-        self.org_id = org_id
-        self.ip_address = ip_address
-        self.user_agent = user_agent
-
-        # Inisialisasi atau perbarui AuditTrailService dengan konteks terbaru
-        self.audit_trail = AuditTrailService(
-            user_id=self.user_id,
-            org_id=self.org_id,
-            ip_address=self.ip_address,
-            user_agent=self.user_agent
-        )
-
     def init_owner_org(self, org_data: model.Organization, user_data: model.User):
         """
         Insert a new owner into the collection.
@@ -295,238 +284,21 @@ class CRUD:
             logger.exception(f"Unexpected error occurred while init user: {e}")
             raise
 
-    def get_by_id(self, org_id: str):
-        """
-        Retrieve a organization by ID.
-        """
-        with mongodb.MongoConn() as mongo:
-            collection = mongo.get_database()[self.collection_org]
-            try:
-                data = collection.find_one({"_id": org_id})
-                if not data:
-                    # write audit trail for fail
-                    self.audit_trail.log_audittrail(
-                        mongo,
-                        action="retrieve",
-                        target=self.collection_org,
-                        target_id=org_id,
-                        details={"_id": org_id},
-                        status="failure",
-                        error_message="Organization not found"
-                    )
-                    raise ValueError("Organization not found")
-                # write audit trail for success
-                self.audit_trail.log_audittrail(
-                    mongo,
-                    action="retrieve",
-                    target=self.collection_org,
-                    target_id=org_id,
-                    details={"_id": org_id, "retrieved": data},
-                    status="success"
-                )
-                return data
-            except PyMongoError as pme:
-                logger.error(f"Database error occurred: {str(pme)}")
-                # write audit trail for fail
-                self.audit_trail.log_audittrail(
-                    mongo,
-                    action="retrieve",
-                    target=self.collection_org,
-                    target_id=org_id,
-                    details={"_id": org_id},
-                    status="failure",
-                    error_message=str(pme)
-                )
-                raise ValueError("Database error occurred while find document.") from pme
-            except Exception as e:
-                logger.exception(f"Unexpected error occurred while finding document: {str(e)}")
-                raise
+    def _invalidate(self, org_id: str):
+        invalidate_org(org_id)
+
+    def _cascade_status(self, mongo, org_id: str, obj: dict):
+        # Status organisasi ikut diterapkan ke user dan role-nya
+        mongo.get_database()[self.collection_user].update_one({"org_id": org_id}, {"$set": obj})
+        mongo.get_database()[self.collection_role].update_one({"org_id": org_id}, {"$set": obj})
 
-    def update_by_id(self, org_id: str, data: model.OrganizationUpdate):
-        """
-        Update a organization's data by ID.
-        """
-        with mongodb.MongoConn() as mongo:
-            collection = mongo.get_database()[self.collection_org]
-            obj = data.model_dump()
-            obj["mod_by"] = self.user_id
-            obj["mod_date"] = datetime.now(timezone.utc)
-            try:
-                update_data = collection.find_one_and_update({"_id": org_id}, {"$set": obj}, return_document=True)
-                if not update_data:
-                    # write audit trail for fail
-                    self.audit_trail.log_audittrail(
-                        mongo,
-                        action="update",
-                        target=self.collection_org,
-                        target_id=org_id,
-                        details={"$set": obj},
-                        status="failure",
-                        error_message="Organization not found"
-                    )
-                    raise ValueError("Organization not found")
-                # write audit trail for success
-                self.audit_trail.log_audittrail(
-                    mongo,
-                    action="update",
-                    target=self.collection_org,
-                    target_id=org_id,
-                    details={"$set": obj},
-                    status="success"
-                )
-                return update_data
-            except PyMongoError as pme:
-                logger.error(f"Database error occurred: {str(pme)}")
-                # write audit trail for fail
-                self.audit_trail.log_audittrail(
-                    mongo,
-                    action="update",
-                    target=self.collection_org,
-                    target_id=org_id,
-                    details={"$set": obj},
-                    status="failure",
-                    error_message=str(pme)
-                )
-                raise ValueError("Database error occurred while update document.") from pme
-            except Exception as e:
-                logger.exception(f"Error updating role: {str(e)}")
-                raise
-    
     def update_status(self, org_id: str, data: UpdateStatus):
         """
         Update a organization's data [status] by ID.
         """
-        with mongodb.MongoConn() as mongo:
-            collection = mongo.get_database()[self.collection_org]
-            collection_user = mongo.get_database()[self.collection_user]
-            collection_role = mongo.get_database()[self.collection_role]
-            obj = data.model_dump()
-            obj["mod_by"] = self.user_id
-            obj["mod_date"] = datetime.now(timezone.utc)
-            try:
-                update_org = collection.find_one_and_update({"_id": org_id}, {"$set": obj}, return_document=True)
-                if not update_org:
-                    # write audit trail for fail
-                    self.audit_trail.log_audittrail(
-                        mongo,
-                        action="update",
-                        target=self.collection_org,
-                        target_id=org_id,
-                        details={"$set": obj},
-                        status="failure",
-                        error_message="Organization not found"
-                    )
-                    raise ValueError("Organization not found")
-                update_user = collection_user.find_one_and_update({"org_id": org_id}, {"$set": obj}, return_document=True)
-                update_role = collection_role.find_one_and_update({"org_id": org_id}, {"$set": obj}, return_document=True)
-                logger.info(f"Organization {org_id} status updated.")
-                # write audit trail for success
-                self.audit_trail.log_audittrail(
-                    mongo,
-                    action="update",
-                    target=self.collection_org,
-                    target_id=org_id,
-                    details={"$set": obj},
-                    status="success"
-                )
-                return update_org
-            except PyMongoError as pme:
-                logger.error(f"Database error occurred: {str(pme)}")
-                # write audit trail for fail
-                self.audit_trail.log_audittrail(
-                    mongo,
-                    action="update",
-                    target=self.collection_org,
-                    target_id=org_id,
-                    details={"$set": obj},
-                    status="failure",
-                    error_message=str(pme)
-                )
-                raise ValueError("Database error occurred while update document.") from pme
-            except Exception as e:
-                logger.exception(f"Error updating status: {str(e)}")
-                raise
-
-    def get_all(self, filters: Optional[Dict[str, Any]] = None, page: int = 1, per_page: int = 10, sort_field: str = "_id", sort_order: str = "asc"):
-        """
-        Retrieve all documents from the collection with optional filters, pagination, and sorting.
-        """
-        with mongodb.MongoConn() as mongo:
-            collection = mongo.get_database()[self.collection_org]
-            try:
-                # Apply filters
-                query_filter = filters or {}
-
-                # Pagination
-                skip = (page - 1) * per_page
-                limit = per_page
-
-                # Sorting
-                order = ASCENDING if sort_order == "asc" else DESCENDING
-
-                # Selected field
-                selected_fields={
-                    "id": "$_id",
-                    "org_name":1,
-                    "org_initial":1,
-                    "org_phone":1,
-                    "org_address":1,
-                    "org_desc":1,
-                    "org_email":1,
-                    "status":1,
-                    "_id": 0
-                }
-
-                # Aggregation pipeline
-                pipeline = [
-                    {"$match": query_filter},  # Filter stage
-                    {"$sort": {sort_field: order}},  # Sorting stage
-                    {"$skip": skip},  # Pagination skip stage
-                    {"$limit": limit},  # Pagination limit stage
-                    {"$project": selected_fields}  # Project only selected fields
-                ]
-
-                # Execute aggregation pipeline
-                cursor = collection.aggregate(pipeline)
-                results = list(cursor)
-
-                # Total count
-                total_count = collection.count_documents(query_filter)
-
-                # write audit trail for success
-                self.audit_trail.log_audittrail(
-                    mongo,
-                    action="retrieve",
-                    target=self.collection_org,
-                    target_id="agregate",
-                    details={"aggregate": pipeline},
-                    status="success"
-                )
-
-                return {
-                    "data": results,
-                    "pagination": {
-                        "current_page": page,
-                        "items_per_page": per_page,
-                        "total_items": total_count,
-                        "total_pages": (total_count + per_page - 1) // per_page,  # Ceiling division
-                    },
-                }
-            except PyMongoError as pme:
-                logger.error(f"Error retrieving user with filters and pagination: {str(e)}")
-                # write audit trail for success
-                self.audit_trail.log_audittrail(
-                    mongo,
-                    action="retrieve",
-                    target=self.collection_org,
-                    target_id="agregate",
-                    details={"aggregate": pipeline},
-                    status="failure"
-                )
-                raise ValueError("Database error while retrieve document") from pme
-            except Exception as e:
-                logger.exception(f"Unexpected error during deletion: {str(e)}")
-                raise
+        update_org = self._update(org_id, data, on_updated=self._cascade_status)
+        logger.info(f"Organization {org_id} status updated.")
+        return update_org
 
     def is_owner_exist(self):
         """
@@ -0,0 +1,116 @@
+import codecs, logging, re
+from datetime import datetime, timezone
+from pathlib import Path
+
+from minio.error import S3Error
+from pymongo.errors import PyMongoError
+from pypdf import PdfReader
+from pypdf.errors import PyPdfError
+
+from baseapp.config import setting, minio, mongodb
+from baseapp.services._rabbitmq_worker.base_worker import BaseWorker, PermanentTaskError
+
+config = setting.get_settings()
+logger = logging.getLogger("rabbit")
+
+DMS_EXTRACT_QUEUE = "dms_extract_tasks"
+
+_WHITESPACE = re.compile(r"\s+")
+
+def _extract_pdf(stream, max_chars: int) -> str:
+    parts, total = [], 0
+    for page in PdfReader(stream).pages:
+        text = page.extract_text() or ""
+        parts.append(text)
+        total += len(text)
+        if total >= max_chars:
+            break
+    return " ".join(parts)
+
+def _extract_plain(stream, max_chars: int, chunk_size: int = 64 * 1024) -> str:
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    parts, total = [], 0
+    while total < max_chars:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        text = decoder.decode(chunk)
+        parts.append(text)
+        total += len(text)
+    return "".join(parts)
+
+# Extractor per ekstensi file (upload hanya menerima .pdf/.jpg/.png/.txt)
+EXTRACTORS = {
+    ".pdf": _extract_pdf,
+    ".txt": _extract_plain,
+}
+
+def is_extractable(filename: str) -> bool:
+    return Path(filename).suffix.lower() in EXTRACTORS
+
+class DmsExtractWorker(BaseWorker):
+    """
+    Ekstraksi isi file DMS (PDF dan teks) untuk full-text search.
+
+    Task {"file_id": ...} dikirim setelah upload. Object di-stream dari MinIO ke file sementara,
+    teksnya diekstrak (maksimal DMS_EXTRACT_MAX_CHARS karakter) lalu disimpan di field `content`
+    _dmsfile yang termasuk text index `dms_text`. Status ada di `content_status`:
+    pending -> indexed | skipped | failed.
+
+    Concurrency dibatasi oleh consumer (--workers thread, --prefetch pesan belum di-ack); sisa antrian
+    tetap di RabbitMQ sehingga lonjakan upload tidak menumpuk di memori worker.
+    """
+    def __init__(self):
+        self.collection_file = "_dmsfile"
+        self.minio_conn = minio.MinioConn()
+
+    def _set_content(self, file_id: str, status: str, content=None):
+        obj = {"content_status": status, "content_date": datetime.now(timezone.utc)}
+        if content is not None:
+            obj["content"] = content
+        with mongodb.MongoConn() as mongo:
+            collection = mongo.get_database()[self.collection_file]
+            try:
+                collection.update_one({"_id": file_id}, {"$set": obj})
+            except PyMongoError as pme:
+                logger.error(f"Database error while saving content of file {file_id}: {str(pme)}")
+                raise
+
+    def process(self, task_data: dict):
+        file_id = task_data.get("file_id")
+        if not file_id:
+            raise PermanentTaskError("Extraction task requires file_id")
+
+        with mongodb.MongoConn() as mongo:
+            collection = mongo.get_database()[self.collection_file]
+            obj = collection.find_one({"_id": file_id}, {"filename": 1, "filestat": 1})
+        if not obj:
+            logger.info(f"File {file_id} no longer exists, extraction dropped.")
+            return
+
+        extractor = EXTRACTORS.get(Path(obj["filename"]).suffix.lower())
+        size = (obj.get("filestat") or {}).get("size", 0)
+        if extractor is None or size > config.dms_extract_max_bytes:
+            logger.info(f"File {file_id} ({obj['filename']}, {size} bytes) skipped for extraction.")
+            self._set_content(file_id, "skipped")
+            return
+
+        try:
+            with self.minio_conn as conn:
+                with conn.spool_object(config.minio_bucket, obj["filename"]) as stream:
+                    text = extractor(stream, config.dms_extract_max_chars)
+        except S3Error as s3e:
+            if s3e.code != "NoSuchKey":
+                raise
+            logger.warning(f"Object {obj['filename']} of file {file_id} not found in MinIO.")
+            self._set_content(file_id, "failed")
+            return
+        except (PyPdfError, ValueError) as e:
+            # PDF rusak/terenkripsi: tidak akan berhasil bila diulang
+            logger.warning(f"Unable to extract text of file {file_id}: {e}")
+            self._set_content(file_id, "failed")
+            return
+
+        content = _WHITESPACE.sub(" ", text).strip()[:config.dms_extract_max_chars]
+        self._set_content(file_id, "indexed", content)
+        logger.info(f"File {file_id} indexed ({len(content)} chars).")
@@ -0,0 +1,142 @@
+import io, logging
+from pathlib import Path
+
+from minio.error import S3Error
+from PIL import Image, ImageOps, UnidentifiedImageError
+from pymongo.errors import PyMongoError
+from pypdf import PdfReader
+from pypdf.errors import PyPdfError
+
+from baseapp.config import setting, minio, mongodb
+from baseapp.services._rabbitmq_worker.base_worker import BaseWorker, PermanentTaskError
+
+config = setting.get_settings()
+logger = logging.getLogger("rabbit")
+
+DMS_THUMBNAIL_QUEUE = "dms_thumbnail_tasks"
+
+# Error decode gambar/PDF yang tidak akan berhasil bila diulang. OSError sengaja tidak termasuk:
+# gangguan I/O (MinIO, disk spool) di-retry consumer
+_RENDER_ERRORS = (UnidentifiedImageError, Image.DecompressionBombError, PyPdfError, ValueError)
+
+def thumbnail_object_name(filename: str) -> str:
+    """Object thumbnail di prefix turunan DMS_THUMBNAIL_PREFIX, mis. thumbnails/<uuid>.jpg."""
+    return f"{config.dms_thumbnail_prefix}{Path(filename).stem}.jpg"
+
+def _open_image(stream, size: int):
+    image = Image.open(stream)
+    # JPEG di-decode langsung pada skala terkecil yang masih >= ukuran thumbnail
+    image.draft("RGB", (size, size))
+    return ImageOps.exif_transpose(image)
+
+def _open_pdf(stream, size: int):
+    """
+    Preview halaman pertama PDF: gambar terbesar di halaman tersebut (dokumen hasil scan).
+    Pillow tidak bisa me-render PDF, jadi PDF tanpa gambar tidak memiliki thumbnail.
+    """
+    reader = PdfReader(stream)
+    if not reader.pages:
+        return None
+    images = [embedded.image for embedded in reader.pages[0].images]
+    return max(images, key=lambda image: image.width * image.height, default=None)
+
+# Sumber thumbnail per ekstensi file (upload hanya menerima .pdf/.jpg/.png/.txt)
+RENDERERS = {
+    ".jpg": _open_image,
+    ".png": _open_image,
+    ".pdf": _open_pdf,
+}
+
+def has_thumbnail_source(filename: str) -> bool:
+    return Path(filename).suffix.lower() in RENDERERS
+
+def render_thumbnail(image, size: int, quality: int = 80) -> bytes:
+    """Perkecil `image` (rasio dipertahankan) ke kotak size x size dan encode sebagai JPEG."""
+    image.thumbnail((size, size))
+    if image.mode in ("RGBA", "LA", "P"):
+        # Area transparan (PNG) menjadi putih
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        image = background
+    elif image.mode != "RGB":
+        image = image.convert("RGB")
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=quality, optimize=True)
+    return buffer.getvalue()
+
+class DmsThumbnailWorker(BaseWorker):
+    """
+    Thumbnail/preview file DMS untuk tampilan grid browse.
+
+    Task {"file_id": ...} dikirim setelah upload. Object di-stream dari MinIO, diperkecil menjadi JPEG
+    maksimal DMS_THUMBNAIL_SIZE piksel dan disimpan di thumbnail_object_name(); nama object-nya dicatat
+    di field `thumbnail` _dmsfile sehingga list_file bisa memberi presigned URL thumbnail.
+    Status ada di `thumbnail_status`: pending -> ready | skipped | failed.
+    """
+    def __init__(self):
+        self.collection_file = "_dmsfile"
+        self.minio_conn = minio.MinioConn()
+
+    def _set_thumbnail(self, file_id: str, status: str, thumbnail=None):
+        obj = {"thumbnail_status": status}
+        if thumbnail is not None:
+            obj["thumbnail"] = thumbnail
+        with mongodb.MongoConn() as mongo:
+            collection = mongo.get_database()[self.collection_file]
+            try:
+                collection.update_one({"_id": file_id}, {"$set": obj})
+            except PyMongoError as pme:
+                logger.error(f"Database error while saving thumbnail of file {file_id}: {str(pme)}")
+                raise
+
+    def process(self, task_data: dict):
+        file_id = task_data.get("file_id")
+        if not file_id:
+            raise PermanentTaskError("Thumbnail task requires file_id")
+
+        with mongodb.MongoConn() as mongo:
+            collection = mongo.get_database()[self.collection_file]
+            obj = collection.find_one({"_id": file_id}, {"filename": 1, "filestat": 1})
+        if not obj:
+            logger.info(f"File {file_id} no longer exists, thumbnail dropped.")
+            return
+
+        renderer = RENDERERS.get(Path(obj["filename"]).suffix.lower())
+        size = (obj.get("filestat") or {}).get("size", 0)
+        if renderer is None or size > config.dms_thumbnail_max_bytes:
+            logger.info(f"File {file_id} ({obj['filename']}, {size} bytes) skipped for thumbnail.")
+            self._set_thumbnail(file_id, "skipped")
+            return
+
+        object_name = thumbnail_object_name(obj["filename"])
+        try:
+            with self.minio_conn as conn:
+                minio_client = conn.get_minio_client()
+                with conn.spool_object(config.minio_bucket, obj["filename"]) as stream:
+                    image = renderer(stream, config.dms_thumbnail_size)
+                    data = render_thumbnail(image, config.dms_thumbnail_size) if image is not None else None
+                if data is None:
+                    logger.info(f"File {file_id} has no image to preview.")
+                    self._set_thumbnail(file_id, "skipped")
+                    return
+                minio_client.put_object(
+                    bucket_name=config.minio_bucket,
+                    object_name=object_name,
+                    data=io.BytesIO(data),
+                    length=len(data),
+                    content_type="image/jpeg"
+                )
+        except S3Error as s3e:
+            if s3e.code != "NoSuchKey":
+                raise
+            logger.warning(f"Object {obj['filename']} of file {file_id} not found in MinIO.")
+            self._set_thumbnail(file_id, "failed")
+            return
+        except _RENDER_ERRORS as e:
+            logger.warning(f"Unable to render thumbnail of file {file_id}: {e}")
+            self._set_thumbnail(file_id, "failed")
+            return
+
+        self._set_thumbnail(file_id, "ready", object_name)
+        logger.info(f"Thumbnail of file {file_id} saved as {object_name} ({len(data)} bytes).")
@@ -1,8 +1,236 @@
-import logging
+import hashlib, hmac, json, logging, threading, time, uuid
+from datetime import datetime, timezone
+
+import httpx
+from pymongo.errors import PyMongoError
+
+from baseapp.config import setting, mongodb
+from baseapp.model.common import Status
+from baseapp.services import publisher
+from baseapp.services._rabbitmq_worker.base_worker import BaseWorker, PermanentTaskError, TaskDeferred
+from baseapp.utils.cache import TTLCache
+from baseapp.utils.utility import decrypt_secret
+
+config = setting.get_settings()
 logger = logging.getLogger("rabbit")
 
-class WebhookWorker:
+# Event no-op untuk cek koneksi RabbitMQ (lihat test_connection): di-ack tanpa fan-out
+PING_EVENT = "system.ping"
+
+class WebhookDeliveryError(PermanentTaskError):
+    """Pengiriman webhook gagal secara permanen (tidak akan di-retry)."""
+
+class WebhookRetryError(Exception):
+    """Pengiriman webhook gagal sementara; consumer menjadwalkan retry."""
+
+class CircuitBreaker:
+    """
+    Circuit breaker per endpoint webhook (in-process), dengan key _id dokumen `_webhook`.
+    CLOSED -> OPEN setelah `failure_threshold` kegagalan beruntun; selama OPEN pengiriman
+    ke endpoint tersebut langsung ditunda. Setelah `reset_seconds` satu percobaan
+    diizinkan (HALF-OPEN): sukses menutup circuit, gagal membukanya lagi.
+    """
+    def __init__(self, failure_threshold: int, reset_seconds: int):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._failures = {}
+        self._opened_at = {}
+        self._trial = set()
+        self._lock = threading.Lock()
+
+    def allow(self, key: str) -> bool:
+        with self._lock:
+            opened_at = self._opened_at.get(key)
+            if opened_at is None:
+                return True
+            if time.monotonic() - opened_at < self.reset_seconds or key in self._trial:
+                return False
+            self._trial.add(key)
+            return True
+
+    def release_trial(self, key: str):
+        """Membatalkan percobaan HALF-OPEN yang tidak menghasilkan sukses/gagal (mis. task ditunda)."""
+        with self._lock:
+            self._trial.discard(key)
+
+    def record_success(self, key: str):
+        with self._lock:
+            self._failures.pop(key, None)
+            self._opened_at.pop(key, None)
+            self._trial.discard(key)
+
+    def record_failure(self, key: str):
+        with self._lock:
+            self._trial.discard(key)
+            failures = self._failures.get(key, 0) + 1
+            self._failures[key] = failures
+            if failures >= self.failure_threshold:
+                if key not in self._opened_at:
+                    logger.warning(f"Webhook circuit opened for endpoint {key} after {failures} failures.")
+                self._opened_at[key] = time.monotonic()
+
+class WebhookWorker(BaseWorker):
+    """
+    Dispatcher webhook keluar.
+
+    Task event ({"event_id", "event_type", "event_data", "org_id"}, lihat publisher.publish_webhook_event) di-fan-out menjadi satu task
+    delivery per endpoint terdaftar di koleksi `_webhook`. Task delivery dikirim via
+    httpx.Client bersama (connection pool + keep-alive) yang dipakai semua thread consumer,
+    ditandatangani HMAC-SHA256, dibatasi concurrency-nya per endpoint, dan dilindungi
+    circuit breaker. Kegagalan sementara di-raise sebagai WebhookRetryError dan
+    dijadwalkan ulang oleh consumer lewat antrian delay RabbitMQ (retry_delays);
+    circuit terbuka dan batas concurrency di-raise sebagai TaskDeferred (tidak dihitung retry).
+    """
+    def __init__(self, queue_name: str = "webhook_tasks"):
+        self.queue_name = queue_name
+        self.collection_webhook = "_webhook"
+        self.client = httpx.Client(
+            timeout=config.webhook_timeout,
+            limits=httpx.Limits(
+                max_connections=config.webhook_max_connections,
+                max_keepalive_connections=config.webhook_max_connections,
+            ),
+            headers={"User-Agent": "baseapp-webhook/1.0", "Content-Type": "application/json"},
+        )
+        self.retry_delays = config.webhook_retry_delays
+        self.breaker = CircuitBreaker(config.webhook_circuit_failure_threshold, config.webhook_circuit_reset_seconds)
+        self._semaphores = {}
+        self._endpoint_cache = TTLCache(maxsize=1024, ttl=config.webhook_endpoint_cache_ttl)
+        self._lock = threading.Lock()
+
+    # region endpoint
+    def _find_endpoints(self, org_id: str, event_type: str):
+        with mongodb.MongoConn() as mongo:
+            collection = mongo.get_database()[self.collection_webhook]
+            try:
+                query = {
+                    "org_id": org_id,
+                    "status": Status.ACTIVE.value,
+                    "events": {"$in": [event_type, "*"]}
+                }
+                return list(collection.find(query, {"_id": 1}))
+            except PyMongoError as pme:
+                logger.error(f"Database error while finding webhook endpoints: {str(pme)}")
+                raise ValueError("Database error while retrieve document") from pme
+
+    def _load_endpoint(self, webhook_id: str):
+        with mongodb.MongoConn() as mongo:
+            collection = mongo.get_database()[self.collection_webhook]
+            endpoint = collection.find_one({"_id": webhook_id}, {"url": 1, "secret": 1, "status": 1})
+        if endpoint and endpoint.get("secret"):
+            # Secret disimpan terenkripsi (lihat _webhook CRUD); yang di-cache sudah plaintext
+            try:
+                endpoint["secret"] = decrypt_secret(endpoint["secret"])
+            except ValueError as ve:
+                raise WebhookDeliveryError(f"Webhook {webhook_id}: secret cannot be decrypted, rotate it via /v1/_webhook/rotate-secret") from ve
+        return endpoint
+
+    def _get_endpoint(self, webhook_id: str):
+        """Endpoint (url, secret) di-cache sebentar agar tidak query Mongo per delivery."""
+        return self._endpoint_cache.get_or_set(webhook_id, lambda: self._load_endpoint(webhook_id))
+
+    def _semaphore(self, key: str) -> threading.BoundedSemaphore:
+        semaphore = self._semaphores.get(key)
+        if semaphore is None:
+            with self._lock:
+                semaphore = self._semaphores.setdefault(key, threading.BoundedSemaphore(config.webhook_max_concurrency_per_endpoint))
+        return semaphore
+    # endregion
+
+    @staticmethod
+    def sign(secret: str, timestamp: int, body: bytes) -> str:
+        """Signature: hex(HMAC-SHA256(secret, "<timestamp>.<body>"))."""
+        message = str(timestamp).encode("utf-8") + b"." + body
+        return hmac.new(secret.encode("utf-8"), message, hashlib.sha256).hexdigest()
+
+    def fan_out(self, task_data: dict) -> int:
+        event_type = task_data.get("event_type")
+        if event_type == PING_EVENT:
+            logger.info("Webhook ping event received, nothing to deliver.")
+            return 0
+        org_id = task_data.get("org_id")
+        if not event_type or not org_id:
+            raise WebhookDeliveryError("Webhook event requires event_type and org_id")
+
+        # event_id ditetapkan saat publish (publisher.publish_webhook_event). Untuk pesan lama tanpa event_id,
+        # id diturunkan dari isi pesan sehingga tetap sama bila fan-out di-retry
+        event_id = task_data.get("event_id") or uuid.uuid5(uuid.NAMESPACE_OID, json.dumps(task_data, sort_keys=True, default=str)).hex
+        created_at = task_data.get("created_at") or datetime.now(timezone.utc).isoformat()
+        endpoints = self._find_endpoints(org_id, event_type)
+        deliveries = [{
+            "webhook_id": endpoint["_id"],
+            "event_id": event_id,
+            "event_type": event_type,
+            "event_data": task_data.get("event_data"),
+            "org_id": org_id,
+            "created_at": created_at
+        } for endpoint in endpoints]
+        sent = publisher.get_publisher().publish_batch(self.queue_name, deliveries) if deliveries else 0
+        logger.info(f"Webhook event {event_type} ({event_id}) fanned out to {sent} endpoint(s).")
+        return sent
+
+    def deliver(self, task_data: dict):
+        endpoint = self._get_endpoint(task_data["webhook_id"])
+        if not endpoint or endpoint.get("status") != Status.ACTIVE.value:
+            logger.info(f"Webhook {task_data['webhook_id']} no longer active, delivery dropped.")
+            return
+
+        key = task_data["webhook_id"]
+        body = json.dumps({
+            "id": task_data["event_id"],
+            "type": task_data["event_type"],
+            "created_at": task_data.get("created_at"),
+            "data": task_data.get("event_data"),
+        }, separators=(",", ":")).encode("utf-8")
+        timestamp = int(time.time())
+        headers = {
+            "X-Webhook-Id": task_data["event_id"],
+            "X-Webhook-Event": task_data["event_type"],
+            "X-Webhook-Timestamp": str(timestamp),
+        }
+        if endpoint.get("secret"):
+            headers["X-Webhook-Signature"] = f"sha256={self.sign(endpoint['secret'], timestamp, body)}"
+
+        # Semaphore diambil sebelum breaker.allow(): percobaan HALF-OPEN hanya dimulai bila request benar-benar dikirim
+        semaphore = self._semaphore(key)
+        if not semaphore.acquire(timeout=config.webhook_timeout):
+            raise TaskDeferred(f"Webhook {key}: concurrency limit reached")
+        try:
+            if not self.breaker.allow(key):
+                # Circuit terbuka: endpoint tidak dihubungi, ditunda tanpa menghabiskan jatah retry
+                raise TaskDeferred(f"Webhook {key}: circuit open", delay_seconds=self.breaker.reset_seconds)
+            try:
+                response = self.client.post(endpoint["url"], content=body, headers=headers)
+            except (httpx.InvalidURL, httpx.UnsupportedProtocol, ValueError) as exc:
+                # URL tersimpan tidak valid: bukan kegagalan endpoint, retry tidak akan membantu
+                self.breaker.release_trial(key)
+                raise WebhookDeliveryError(f"Webhook {key}: invalid URL: {exc}") from exc
+            except httpx.HTTPError as exc:
+                self.breaker.record_failure(key)
+                raise WebhookRetryError(f"Webhook {key}: {exc.__class__.__name__}: {exc}") from exc
+            except BaseException:
+                self.breaker.release_trial(key)
+                raise
+        finally:
+            semaphore.release()
+
+        if response.is_success:
+            self.breaker.record_success(key)
+            logger.info(f"Webhook {task_data['webhook_id']} delivered ({response.status_code}).")
+        elif response.status_code == 429 or response.status_code >= 500:
+            self.breaker.record_failure(key)
+            raise WebhookRetryError(f"Webhook {task_data['webhook_id']} failed with HTTP {response.status_code}")
+        else:
+            # 4xx lain: endpoint menolak payload, retry tidak akan membantu
+            self.breaker.record_success(key)
+            raise WebhookDeliveryError(f"Webhook {task_data['webhook_id']} rejected with HTTP {response.status_code}")
+
     def process(self, task_data: dict):
-        """Hanya berisi logika untuk memproses tugas webhook."""
-        logger.info(f"Processing webhook task: {task_data}")
-        logger.info("Webhook task finished.")
\ No newline at end of file
+        """Memproses satu task dari antrian webhook (event atau delivery)."""
+        if "webhook_id" in task_data:
+            self.deliver(task_data)
+        else:
+            self.fan_out(task_data)
+
+    def close(self):
+        self.client.close()
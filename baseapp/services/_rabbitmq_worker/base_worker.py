@@ -0,0 +1,30 @@
+from abc import abstractmethod
+from typing import List, Optional
+
+class PermanentTaskError(Exception):
+    """Tugas gagal dan tidak akan berhasil bila diulang; pesan langsung masuk ke antrian <queue>.dead."""
+
+class TaskDeferred(Exception):
+    """
+    Tugas belum bisa diproses sekarang (mis. circuit terbuka, batas concurrency) tetapi tidak gagal.
+    Pesan dijadwalkan ulang lewat antrian delay tanpa menambah retry count, jadi tidak pernah
+    berakhir di antrian dead letter karena penundaan saja.
+    """
+    def __init__(self, message: str, delay_seconds: Optional[float] = None):
+        super().__init__(message)
+        # Jeda minimum yang diinginkan; None = tier delay terpendek
+        self.delay_seconds = delay_seconds
+
+class BaseWorker:
+    # Jeda (detik) sebelum setiap retry. None = pakai RABBITMQ_RETRY_DELAYS
+    retry_delays: Optional[List[int]] = None
+
+    @abstractmethod
+    def process(self, task_data: dict):
+        """
+        Metode ini WAJIB di-override oleh setiap worker spesifik.
+        Exception apa pun membuat pesan di-retry sesuai retry_delays,
+        kecuali PermanentTaskError yang langsung dikirim ke antrian dead letter
+        dan TaskDeferred yang ditunda tanpa dihitung sebagai retry.
+        """
+        pass
@@ -6,6 +6,7 @@ import logging
 logger = logging.getLogger("rabbit")
 
 from baseapp.services.redis_queue import RedisQueueManager
+from baseapp.utils.tracing import TRACE_CONTEXT_KEY, consumer_span
 
 class BaseWorker:
     def __init__(self,redis_queue_manager: RedisQueueManager):
@@ -25,8 +26,10 @@ class BaseWorker:
         while self.is_running:
             task = self.queue_manager.dequeue_task()
             if task:
+                carrier = task.pop(TRACE_CONTEXT_KEY, None)
                 try:
-                    self.process_task(task)
+                    with consumer_span(f"{self.queue_manager.queue_name} process", carrier, **{"messaging.system": "redis", "messaging.destination.name": self.queue_manager.queue_name}):
+                        self.process_task(task)
                 except Exception as e:
                     logger.error(f"Error processing task {task}. Error: {e}")
             else:
@@ -42,6 +42,7 @@ class DeleteFileWorker(BaseWorker):
                         "refkey_id": 1,
                         "refkey_table": 1,
                         "refkey_name": 1,
+                        "thumbnail": 1,
                         "_id": 0
                     }
 
@@ -59,6 +60,8 @@ class DeleteFileWorker(BaseWorker):
                     for x in results:
                         # remove file in minio
                         minio_client.remove_object(config.minio_bucket, x['filename'])
+                        if x.get('thumbnail'):
+                            minio_client.remove_object(config.minio_bucket, x['thumbnail'])
 
                         # update space storage after deleted file
                         deleted_size = x['filestat']['size']
@@ -1,24 +1,49 @@
-import logging
+import logging,os
 logger = logging.getLogger("rabbit")
 
 from baseapp.services._redis_worker.base_worker import BaseWorker
-from baseapp.config import email_smtp
+from baseapp.config import setting, email_smtp
+
+config = setting.get_settings()
 
 class EmailWorker(BaseWorker):
     def __init__(self, queue_manager):
         super().__init__(queue_manager)
         self.mail_manager = email_smtp.EmailSender()
+        # Template di-compile sekali saat worker start
+        self.template_registry = email_smtp.EmailTemplateRegistry()
+        self.attachment_location = os.path.realpath(config.email_attachment_location)
+
+    def _resolve_attachment(self, path: str) -> str:
+        """
+        Attachment hanya boleh berasal dari folder EMAIL_ATTACHMENT_LOCATION.
+        Path di-resolve (termasuk symlink dan '..') sebelum dicek, path di luar folder ditolak.
+        """
+        resolved = os.path.realpath(os.path.join(self.attachment_location, path))
+        if os.path.commonpath([self.attachment_location, resolved]) != self.attachment_location:
+            raise ValueError(f"Attachment path '{path}' is outside the attachment folder")
+        return resolved
 
     def process_task(self, data: dict):
         """
         Process a task (e.g., send OTP).
+
+        Payload: {"email": ..., "template": "<template id>", "data": {<variables>}}.
+        Payload lama dengan "subject" dan "body" yang sudah jadi tetap didukung.
         """
-        logger.debug(f"data task: {data} type data: {type(data)}")
+        logger.debug("data task: %s type data: %s", data, type(data))
+        if data.get("template"):
+            subject, body = self.template_registry.render(data["template"], data.get("data"))
+        else:
+            subject, body = data.get("subject"), data.get("body")
+
         msg_val = {
             "to":data.get("email"), # mandatory | kalau lebih dari satu jadi array ["aldian@gai.co.id","charly@gai.co.id"]
-            "subject": data.get("subject"),
-            "body_mail": data.get("body")
+            "subject": subject,
+            "body_mail": body
         }
+        if data.get("attachment_path"):
+            msg_val["attachment_path"] = self._resolve_attachment(data["attachment_path"])
 
         body_mail, bcc_recipients = self.mail_manager.body_msg(msg_val)
         self.mail_manager.send_email(body_mail, bcc_recipients)
@@ -2,6 +2,9 @@ from fastapi import APIRouter, Query, Depends
 
 from baseapp.model.common import ApiResponse, CurrentUser, Status, UpdateStatus
 from baseapp.utils.jwt import get_current_user
+from baseapp.utils.response import ApiRoute
+from baseapp.utils.filters import Prefix, FilterError
+from baseapp.services.response_cache import cache_response
 
 from baseapp.config import setting
 config = setting.get_settings()
@@ -14,7 +17,7 @@ _crud = CRUD()
 from baseapp.services.permission_check_service import PermissionChecker
 permission_checker = PermissionChecker()
 
-router = APIRouter(prefix="/v1/_role", tags=["Role"])
+router = APIRouter(prefix="/v1/_role", tags=["Role"], route_class=ApiRoute)
 
 @router.post("/create", response_model=ApiResponse)
 async def create(
@@ -71,6 +74,7 @@ async def update_status(role_id: str, cu: CurrentUser = Depends(get_current_user
     return ApiResponse(status=0, message="Data deleted", data=response)
 
 @router.get("", response_model=ApiResponse)
+@cache_response("_role", permission=("_role", 1), audit_target="_role")
 async def get_all_data(
         page: int = Query(1, ge=1, description="Page number"),
         per_page: int = Query(10, ge=1, le=100, description="Items per page"),
@@ -78,9 +82,9 @@ async def get_all_data(
         sort_order: str = Query("asc", regex="^(asc|desc)$", description="Sort order: 'asc' or 'desc'"),
         cu: CurrentUser = Depends(get_current_user),
         name: str = Query(None, description="Name of role (exact match)"),
-        name_contains: str = Query(None, description="Name contains (case insensitive)"),
-        name_starts_with: str = Query(None, description="Name starts with"),
-        name_ends_with: str = Query(None, description="Name ends with"),
+        name_contains: str = Query(None, deprecated=True, description="No longer supported, use name_starts_with"),
+        name_starts_with: str = Query(None, description="Name starts with (case sensitive)"),
+        name_ends_with: str = Query(None, deprecated=True, description="No longer supported (cannot use an index)"),
         status: str = Query(None, description="Status data")
     ) -> ApiResponse:
 
@@ -101,20 +105,22 @@ async def get_all_data(
     if cu.org_id:
         filters["org_id"] = cu.org_id
 
+    # Pencarian substring/suffix tidak bisa memakai index, diganti prefix (name_starts_with)
+    if name_contains:
+        raise FilterError("name_contains is no longer supported, use name_starts_with.")
+    if name_ends_with:
+        raise FilterError("name_ends_with is no longer supported, use name_starts_with.")
+
     if name:
         filters["name"] = name  # exact match
-    elif name_contains:
-        filters["name"] = {"$regex": f".*{name_contains}.*", "$options": "i"}
     elif name_starts_with:
-        filters["name"] = {"$regex": f"^{name_starts_with}", "$options": "i"}
-    elif name_ends_with:
-        filters["name"] = {"$regex": f"{name_ends_with}$", "$options": "i"}
+        filters["name"] = Prefix(name_starts_with)
 
     if status:
         filters["status"] = status
 
     # Call CRUD function
-    response = _crud.get_all(
+    response = await _crud.aget_all(
         filters=filters,
         page=page,
         per_page=per_page,
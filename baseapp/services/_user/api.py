@@ -3,20 +3,22 @@ from typing import Optional, List
 from datetime import datetime, timezone
 
 from baseapp.model.common import ApiResponse, CurrentUser, Status, UpdateStatus
-from baseapp.utils.jwt import get_current_user, decode_jwt_token, revoke_all_refresh_tokens
+from baseapp.utils.jwt import get_current_user, decode_jwt_token, revoke_all_refresh_tokens, revoke_access_token
+from baseapp.utils.response import ApiRoute
+from baseapp.utils.filters import Prefix, In, FilterError
 from baseapp.config.redis import RedisConn
 from baseapp.config import setting
 config = setting.get_settings()
 
 from baseapp.services._user import model
 
-from baseapp.services._user.crud import CRUD
-_crud = CRUD()
+from baseapp.services import registry
+_crud = registry.get_service("_user")
 
 from baseapp.services.permission_check_service import PermissionChecker
 permission_checker = PermissionChecker()
 
-router = APIRouter(prefix="/v1/_user", tags=["User"])
+router = APIRouter(prefix="/v1/_user", tags=["User"], route_class=ApiRoute)
 
 @router.post("/create", response_model=ApiResponse)
 async def create(req: model.User, cu: CurrentUser = Depends(get_current_user)) -> ApiResponse:
@@ -91,10 +93,7 @@ async def update_change_password(req: model.ChangePassword, response: Response,
     with RedisConn() as redis_conn:
         revoke_all_refresh_tokens(cu.id, redis_conn)
         if jti and exp:
-            sisa_waktu_detik = exp - datetime.now(timezone.utc).timestamp()
-            if sisa_waktu_detik > 0:
-                # Simpan jti ke Redis dengan TTL
-                redis_conn.setex(f"deny_list:{jti}", int(sisa_waktu_detik), "revoked")
+            revoke_access_token(redis_conn, jti, exp)
 
     # Hapus cookie di klien
     response.delete_cookie("refresh_token")
@@ -124,9 +123,11 @@ async def get_all_data(
         sort_field: str = Query("_id", description="Field to sort by"),
         sort_order: str = Query("asc", regex="^(asc|desc)$", description="Sort order: 'asc' or 'desc'"),
         username: Optional[str] = Query(None, description="Filter by username"),
-        username_contains: Optional[str] = Query(None, description="Name contains (case insensitive)"),
+        username_starts_with: Optional[str] = Query(None, description="Username starts with (case sensitive)"),
+        username_contains: Optional[str] = Query(None, deprecated=True, description="No longer supported, use username_starts_with"),
         email: Optional[str] = Query(None, description="Filter by email"),
-        email_contains: Optional[str] = Query(None, description="Filter by email (case insensitive)"),
+        email_starts_with: Optional[str] = Query(None, description="Email starts with (case sensitive)"),
+        email_contains: Optional[str] = Query(None, deprecated=True, description="No longer supported, use email_starts_with"),
         role: Optional[str] = Query(None, description="Filter by role ID"),
         roles: Optional[List[str]] = Query(None, description="Filter by multiple role IDs"),
         status: Optional[str] = Query(None, description="Filter by status"),
@@ -150,16 +151,22 @@ async def get_all_data(
     if cu.org_id:
         filters["org_id"] = cu.org_id
 
+    # Pencarian substring (*_contains) tidak bisa memakai index, diganti prefix (*_starts_with)
+    if username_contains:
+        raise FilterError("username_contains is no longer supported, use username_starts_with.")
+    if email_contains:
+        raise FilterError("email_contains is no longer supported, use email_starts_with.")
+
     # addtional when filter running
     if username:
         filters["username"] = username
-    elif username_contains:
-        filters["username"] = {"$regex": f".*{username_contains}.*", "$options": "i"}
+    elif username_starts_with:
+        filters["username"] = Prefix(username_starts_with)
 
     if email:
         filters["email"] = email
-    elif email_contains:
-        filters["email"] = {"$regex": f".*{email_contains}.*", "$options": "i"}
+    elif email_starts_with:
+        filters["email"] = Prefix(email_starts_with)
 
     if status:
         filters["status"] = status
@@ -170,10 +177,10 @@ async def get_all_data(
     
     # Filter by multiple roles
     if roles:
-        filters["roles"] = roles  # Akan diubah ke $in dalam CRUD
+        filters["roles"] = In(roles)
 
     # Call CRUD function
-    response = _crud.get_all(
+    response = await _crud.aget_all(
         filters=filters,
         page=page,
         per_page=per_page,
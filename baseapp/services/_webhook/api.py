@@ -0,0 +1,146 @@
+from fastapi import APIRouter, Query, Depends
+
+from baseapp.model.common import ApiResponse, CurrentUser, Status, UpdateStatus
+from baseapp.utils.jwt import get_current_user
+from baseapp.utils.response import ApiRoute
+
+from baseapp.config import setting
+config = setting.get_settings()
+
+from baseapp.services._webhook.model import Webhook
+
+from baseapp.services._webhook.crud import CRUD
+_crud = CRUD()
+
+from baseapp.services.permission_check_service import PermissionChecker
+permission_checker = PermissionChecker()
+
+router = APIRouter(prefix="/v1/_webhook", tags=["Webhook"], route_class=ApiRoute)
+
+@router.post("/create", response_model=ApiResponse)
+async def create(
+    req: Webhook,
+    cu: CurrentUser = Depends(get_current_user)
+) -> ApiResponse:
+    if not permission_checker.has_permission(cu.roles, "_webhook", 2):  # 2 untuk izin simpan baru
+        raise PermissionError("Access denied")
+
+    _crud.set_context(
+        user_id=cu.id,
+        org_id=cu.org_id,
+        ip_address=cu.ip_address,  # Jika ada
+        user_agent=cu.user_agent   # Jika ada
+    )
+
+    response = _crud.create(req)
+
+    return ApiResponse(status=0, message="Data created", data=response)
+
+@router.put("/update/{webhook_id}", response_model=ApiResponse)
+async def update_by_id(webhook_id: str, req: Webhook, cu: CurrentUser = Depends(get_current_user)) -> ApiResponse:
+    if not permission_checker.has_permission(cu.roles, "_webhook", 4):  # 4 untuk izin simpan perubahan
+        raise PermissionError("Access denied")
+
+    _crud.set_context(
+        user_id=cu.id,
+        org_id=cu.org_id,
+        ip_address=cu.ip_address,  # Jika ada
+        user_agent=cu.user_agent   # Jika ada
+    )
+
+    response = _crud.update_by_id(webhook_id, req)
+
+    return ApiResponse(status=0, message="Data updated", data=response)
+
+@router.post("/rotate-secret/{webhook_id}", response_model=ApiResponse)
+async def rotate_secret(webhook_id: str, cu: CurrentUser = Depends(get_current_user)) -> ApiResponse:
+    if not permission_checker.has_permission(cu.roles, "_webhook", 4):  # 4 untuk izin simpan perubahan
+        raise PermissionError("Access denied")
+
+    _crud.set_context(
+        user_id=cu.id,
+        org_id=cu.org_id,
+        ip_address=cu.ip_address,  # Jika ada
+        user_agent=cu.user_agent   # Jika ada
+    )
+
+    response = _crud.rotate_secret(webhook_id)
+
+    return ApiResponse(status=0, message="Secret rotated", data=response)
+
+@router.delete("/delete/{webhook_id}", response_model=ApiResponse)
+async def update_status(webhook_id: str, cu: CurrentUser = Depends(get_current_user)) -> ApiResponse:
+    if not permission_checker.has_permission(cu.roles, "_webhook", 4):  # 4 untuk izin simpan perubahan
+        raise PermissionError("Access denied")
+
+    _crud.set_context(
+        user_id=cu.id,
+        org_id=cu.org_id,
+        ip_address=cu.ip_address,  # Jika ada
+        user_agent=cu.user_agent   # Jika ada
+    )
+
+    # Buat instance model langsung
+    manual_data = UpdateStatus(
+        status=Status.DELETE  # nilai yang Anda tentukan
+    )
+    response = _crud.update_status(webhook_id, manual_data)
+    return ApiResponse(status=0, message="Data deleted", data=response)
+
+@router.get("", response_model=ApiResponse)
+async def get_all_data(
+        page: int = Query(1, ge=1, description="Page number"),
+        per_page: int = Query(10, ge=1, le=100, description="Items per page"),
+        sort_field: str = Query("_id", description="Field to sort by"),
+        sort_order: str = Query("asc", regex="^(asc|desc)$", description="Sort order: 'asc' or 'desc'"),
+        cu: CurrentUser = Depends(get_current_user),
+        event: str = Query(None, description="Event type"),
+        status: str = Query(None, description="Status data")
+    ) -> ApiResponse:
+
+    if not permission_checker.has_permission(cu.roles, "_webhook", 1):  # 1 untuk izin baca
+        raise PermissionError("Access denied")
+
+    _crud.set_context(
+        user_id=cu.id,
+        org_id=cu.org_id,
+        ip_address=cu.ip_address,  # Jika ada
+        user_agent=cu.user_agent   # Jika ada
+    )
+
+    # Build filters dynamically
+    filters = {}
+
+    # default filter by organization id
+    if cu.org_id:
+        filters["org_id"] = cu.org_id
+
+    if event:
+        filters["events"] = event
+
+    if status:
+        filters["status"] = status
+
+    # Call CRUD function
+    response = await _crud.aget_all(
+        filters=filters,
+        page=page,
+        per_page=per_page,
+        sort_field=sort_field,
+        sort_order=sort_order,
+    )
+    return ApiResponse(status=0, message="Data loaded", data=response["data"], pagination=response["pagination"])
+
+@router.get("/find/{webhook_id}", response_model=ApiResponse)
+async def find_by_id(webhook_id: str, cu: CurrentUser = Depends(get_current_user)) -> ApiResponse:
+    if not permission_checker.has_permission(cu.roles, "_webhook", 1):  # 1 untuk izin baca
+        raise PermissionError("Access denied")
+
+    _crud.set_context(
+        user_id=cu.id,
+        org_id=cu.org_id,
+        ip_address=cu.ip_address,  # Jika ada
+        user_agent=cu.user_agent   # Jika ada
+    )
+    response = _crud.get_by_id(webhook_id)
+    return ApiResponse(status=0, message="Data found", data=response)
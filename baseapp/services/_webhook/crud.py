@@ -0,0 +1,103 @@
+import logging,secrets
+
+from pymongo import ReturnDocument
+from pymongo.errors import PyMongoError
+from datetime import datetime, timezone
+
+from baseapp.config import setting, mongodb
+from baseapp.services._webhook.model import Webhook
+from baseapp.services.repository import BaseRepository
+from baseapp.utils.utility import encrypt_secret, generate_uuid
+from baseapp.utils.tracing import traced
+
+config = setting.get_settings()
+logger = logging.getLogger(__name__)
+
+def _generate_secret() -> str:
+    return f"whsec_{secrets.token_urlsafe(32)}"
+
+def _public(obj: dict) -> dict:
+    # Secret (terenkripsi) tidak pernah dikembalikan, kecuali sekali saat create / rotate
+    return {key: value for key, value in obj.items() if key != "secret"}
+
+@traced
+class CRUD(BaseRepository):
+    entity_name = "Webhook"
+    list_fields = ("url", "events", "status")
+    indexed_fields = ("rec_date", "status", "org_id", "events")
+
+    def __init__(self, collection_name="_webhook"):
+        self.collection_name = collection_name
+
+    def _id_filter(self, doc_id: str) -> dict:
+        # Webhook hanya bisa dibaca/diubah oleh organisasi pemiliknya
+        query = {"_id": doc_id}
+        if self.org_id:
+            query["org_id"] = self.org_id
+        return query
+
+    def _find_by_id(self, mongo, doc_id: str):
+        return self._collection(mongo).find_one(self._id_filter(doc_id), {"secret": 0})
+
+    def create(self, data: Webhook):
+        """
+        Insert a new webhook endpoint into the collection.
+        Secret HMAC disimpan terenkripsi dan hanya dikembalikan sekali di response ini.
+        """
+        with mongodb.MongoConn() as mongo:
+            collection = mongo.get_database()[self.collection_name]
+
+            obj = data.model_dump()
+            obj["_id"] = generate_uuid()
+            obj["rec_by"] = self.user_id
+            obj["rec_date"] = datetime.now(timezone.utc)
+            obj["org_id"] = self.org_id
+            try:
+                plain_text_secret = _generate_secret()
+                obj["secret"] = encrypt_secret(plain_text_secret)
+                collection.insert_one(obj)
+                return {**_public(obj), "secret": plain_text_secret}
+            except PyMongoError as pme:
+                logger.error(f"Database error occurred: {str(pme)}")
+                raise ValueError("Database error occurred while creating document.") from pme
+            except Exception as e:
+                logger.exception(f"Unexpected error occurred while creating document: {str(e)}")
+                raise
+
+    def update_by_id(self, webhook_id: str, data):
+        """
+        Update a webhook's data by ID.
+        """
+        return _public(super().update_by_id(webhook_id, data))
+
+    def update_status(self, webhook_id: str, data):
+        """
+        Update a webhook's data [status] by ID.
+        """
+        return _public(super().update_status(webhook_id, data))
+
+    def rotate_secret(self, webhook_id: str):
+        """
+        Mengganti secret HMAC webhook. Secret baru hanya dikembalikan sekali di response ini;
+        worker memakai secret baru paling lambat setelah WEBHOOK_ENDPOINT_CACHE_TTL.
+        """
+        not_found = f"{self.entity_name} not found"
+        plain_text_secret = _generate_secret()
+        obj = {
+            "secret": encrypt_secret(plain_text_secret),
+            "mod_by": self.user_id,
+            "mod_date": datetime.now(timezone.utc)
+        }
+        details = {"$set": {**_public(obj), "secret": "<rotated>"}}
+        with mongodb.MongoConn() as mongo:
+            try:
+                updated = self._collection(mongo).find_one_and_update(self._id_filter(webhook_id), {"$set": obj}, projection={"secret": 0}, return_document=ReturnDocument.AFTER)
+                if not updated:
+                    self._audit(mongo, "update", webhook_id, details, status="failure", error_message=not_found)
+                    raise ValueError(not_found)
+                self._audit(mongo, "update", webhook_id, details)
+                return {**updated, "secret": plain_text_secret}
+            except PyMongoError as pme:
+                logger.error(f"Database error occurred: {str(pme)}")
+                self._audit(mongo, "update", webhook_id, details, status="failure", error_message=str(pme))
+                raise ValueError("Database error occurred while update document.") from pme
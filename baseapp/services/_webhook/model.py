@@ -0,0 +1,22 @@
+from pydantic import BaseModel, Field, field_validator
+from typing import List
+from urllib.parse import urlsplit
+from baseapp.model.common import Status
+
+class Webhook(BaseModel):
+    url: str = Field(description="HTTPS/HTTP endpoint that receives the webhook events.")
+    events: List[str] = Field(min_length=1, description="Event types sent to this endpoint, '*' for all events.")
+    status: Status = Field(description="Status of the webhook.")
+
+    @field_validator("url")
+    def validate_url(cls, value):
+        parts = urlsplit(value)
+        if parts.scheme not in ("http", "https") or not parts.netloc:
+            raise ValueError("Webhook URL must be an absolute http(s) URL.")
+        return value
+
+    @field_validator("events")
+    def validate_events(cls, value):
+        if any(not event or not event.strip() for event in value):
+            raise ValueError("Event type must be a non-empty string.")
+        return value
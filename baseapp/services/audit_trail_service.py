@@ -7,6 +7,7 @@ from typing import Optional
 from datetime import datetime, timezone
 
 from baseapp.utils.utility import generate_uuid
+from baseapp.utils.request_context import RequestContext, get_request_context
 from baseapp.config.setting import get_settings
 config = get_settings()
 logger = logging.getLogger(__name__)
@@ -25,11 +26,12 @@ class AuditTrailModel(BaseModel):
     error_message: str = Field(None, description="Error message if the operation failed")
 
 class AuditTrailService:
-    def __init__(self, user_id, org_id, ip_address=None, user_agent=None, collection_name="_audittrail"):
-        self.user_id = user_id
-        self.org_id = org_id
-        self.ip_address = ip_address
-        self.user_agent = user_agent
+    """
+    Tanpa user_id, pelaku diambil dari RequestContext request yang sedang berjalan saat log dicatat,
+    sehingga satu instance bisa dipakai bersama oleh semua request.
+    """
+    def __init__(self, user_id=None, org_id=None, ip_address=None, user_agent=None, collection_name="_audittrail"):
+        self.context = RequestContext(user_id=user_id, org_id=org_id, ip_address=ip_address, user_agent=user_agent) if user_id is not None else None
         self.collection_name = collection_name
 
     def create(self, mongo_conn, data: AuditTrailModel):
@@ -50,15 +52,16 @@ class AuditTrailService:
             raise
 
     def log_audittrail(self, mongo_conn, action, target, target_id, details=None, status="success", error_message=None):
+        context = self.context or get_request_context()
         data = {
-            "org_id": self.org_id,
-            "uid": self.user_id,
+            "org_id": context.org_id,
+            "uid": context.user_id,
             "action": action,
             "target": target,
             "target_id": target_id,
             "details": details or {},
-            "ip_address": self.ip_address,
-            "user_agent": self.user_agent,
+            "ip_address": context.ip_address,
+            "user_agent": context.user_agent,
             "status": status,
             "error_message": error_message
         }
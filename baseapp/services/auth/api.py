@@ -9,14 +9,16 @@ from baseapp.model.common import ApiResponse, TokenResponse, CurrentUser
 from baseapp.config.setting import get_settings
 from baseapp.config.redis import RedisConn
 from baseapp.services.redis_queue import RedisQueueManager
-from baseapp.utils.jwt import create_access_token, create_refresh_token, decode_jwt_token, get_current_user, revoke_all_refresh_tokens
+from baseapp.utils.jwt import create_access_token, create_refresh_token, decode_jwt_token, get_current_user, revoke_all_refresh_tokens, revoke_access_token, store_refresh_token, get_refresh_token, list_refresh_sessions
+from baseapp.utils.response import ApiRoute
 from baseapp.services.auth.model import UserLoginModel, VerifyOTPRequest, ClientAuthCredential
 from baseapp.services.auth.crud import CRUD
+from baseapp.services.response_cache import cache_response
 
 config = get_settings()
 _crud = CRUD()
 logger = logging.getLogger()
-router = APIRouter(prefix="/v1/auth", tags=["Auth"])
+router = APIRouter(prefix="/v1/auth", tags=["Auth"], route_class=ApiRoute)
 
 @router.post("/login", response_model=ApiResponse)
 async def login(response: Response, req: UserLoginModel, x_client_type: Optional[str] = Header(None)) -> ApiResponse:
@@ -49,13 +51,8 @@ async def login(response: Response, req: UserLoginModel, x_client_type: Optional
 
     # Simpan refresh token ke Redis
     
-    redis_key = f"refresh_token:{user_info.id}:{session_id}"
     with RedisConn() as redis_conn:
-        redis_conn.set(
-            redis_key,
-            refresh_token,
-            ex=timedelta(days=expire_refresh_in),
-        )
+        store_refresh_token(redis_conn, user_info.id, session_id, refresh_token, expire_refresh_in)
 
     data = {
         "access_token": access_token,
@@ -97,8 +94,8 @@ async def request_otp(req: UserLoginModel) -> ApiResponse:
     with RedisConn() as redis_conn:
         redis_conn.setex(f"otp:{username}", 300, otp)
     
-    queue_manager = RedisQueueManager(queue_name="otp_tasks")  # Pass actual RedisConn here
-    queue_manager.enqueue_task({"email": username, "otp": otp, "subject":"Login with OTP", "body":f"Berikut kode OTP Anda: {otp}"})
+    queue_manager = RedisQueueManager(redis_conn=RedisConn(), queue_name="otp_tasks")
+    queue_manager.enqueue_task({"email": username, "template": "login_otp", "data": {"otp": otp}})
 
     # Return response berhasil
     return ApiResponse(status=0, data={"status": "queued", "message": "OTP has been sent"})
@@ -124,7 +121,8 @@ async def verify_otp(response: Response, req: VerifyOTPRequest, x_client_type: O
                 "authority": user_info.authority,
                 "org_id": user_info.org_id,
                 "features": user_info.feature,
-                "bitws": user_info.bitws
+                "bitws": user_info.bitws,
+                "session_id": uuid.uuid4().hex
             }
 
             # Buat akses token dan refresh token
@@ -132,13 +130,7 @@ async def verify_otp(response: Response, req: VerifyOTPRequest, x_client_type: O
             refresh_token, expire_refresh_in = create_refresh_token(token_data)
 
             # Simpan refresh token ke Redis
-            session_id = uuid.uuid4().hex
-            redis_key = f"refresh_token:{user_info.id}:{session_id}"
-            redis_conn.set(
-                redis_key,
-                refresh_token,
-                ex=timedelta(days=expire_refresh_in),
-            )
+            store_refresh_token(redis_conn, user_info.id, token_data["session_id"], refresh_token, expire_refresh_in)
 
             # hapus otp dari redis
             redis_conn.delete(f"otp:{username}")
@@ -182,7 +174,7 @@ async def token(
     # Validasi user
     with _crud:
         user_info = _crud.validate_user(username, password)
-    logger.debug(f"User info: {user_info}")
+    logger.debug("User info: %s", user_info)
 
     # Data token
     token_data = {
@@ -192,7 +184,8 @@ async def token(
         "authority": user_info.authority,
         "org_id": user_info.org_id,
         "features": user_info.feature,
-        "bitws": user_info.bitws
+        "bitws": user_info.bitws,
+        "session_id": uuid.uuid4().hex
     }
 
     # Buat akses token dan refresh token
@@ -200,14 +193,8 @@ async def token(
     refresh_token, expire_refresh_in = create_refresh_token(token_data)
 
     # Simpan refresh token ke Redis
-    session_id = uuid.uuid4().hex
-    redis_key = f"refresh_token:{user_info.id}:{session_id}"
     with RedisConn() as redis_conn:
-        redis_conn.set(
-            redis_key,
-            refresh_token,
-            ex=timedelta(days=expire_refresh_in),
-        )
+        store_refresh_token(redis_conn, user_info.id, token_data["session_id"], refresh_token, expire_refresh_in)
 
     # Hitung waktu kedaluwarsa akses token
     expired_at = datetime.now(timezone.utc) + timedelta(minutes=float(expire_access_in))
@@ -249,9 +236,8 @@ async def refresh_token(request: Request, x_client_type: Optional[str] = Header(
         raise ValueError("Invalid refresh token")
 
     # Check token in Redis
-    redis_key = f"refresh_token:{payload["id"]}:{payload["session_id"]}"
     with RedisConn() as redis_conn:
-        stored_token = redis_conn.get(redis_key)
+        stored_token = get_refresh_token(redis_conn, payload.get("id"), payload.get("session_id"))
         if stored_token != refresh_token:
             raise ValueError("Invalid refresh token")
 
@@ -277,17 +263,22 @@ async def logout(response: Response, cu: CurrentUser = Depends(get_current_user)
     with RedisConn() as redis_conn:
         revoke_all_refresh_tokens(cu.id, redis_conn)
         if jti and exp:
-            sisa_waktu_detik = exp - datetime.now(timezone.utc).timestamp()
-            if sisa_waktu_detik > 0:
-                # Simpan jti ke Redis dengan TTL
-                redis_conn.setex(f"deny_list:{jti}", int(sisa_waktu_detik), "revoked")
+            revoke_access_token(redis_conn, jti, exp)
 
     # Hapus cookie di klien
     response.delete_cookie("refresh_token")
 
     return ApiResponse(status=0, message="Logout")
 
+@router.get("/sessions", response_model=ApiResponse)
+async def sessions(cu: CurrentUser = Depends(get_current_user)) -> ApiResponse:
+    # Daftar sesi (refresh token) yang masih aktif milik user
+    with RedisConn() as redis_conn:
+        data = list_refresh_sessions(redis_conn, cu.id)
+    return ApiResponse(status=0, message="Data found", data=data)
+
 @router.post("/status", response_model=ApiResponse)
+@cache_response(per_token=True) # hanya bergantung pada klaim token
 async def auth_status(request: Request, cu: CurrentUser = Depends(get_current_user)) -> ApiResponse:
     # Convert to dict and exclude fields
     cu_data = cu.model_dump(exclude={"log_id", "ip_address", "user_agent", "token"})
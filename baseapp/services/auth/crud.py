@@ -3,10 +3,12 @@ from baseapp.config import setting, mongodb
 from baseapp.services.auth.model import UserInfo, ClientInfo
 from baseapp.model.common import Status
 from baseapp.utils.utility import get_enum, check_password
+from baseapp.utils.tracing import traced
 
 config = setting.get_settings()
 logger = logging.getLogger(__name__)
 
+@traced
 class CRUD:
     def __init__(self):
         self.user_collection = "_user"
@@ -25,32 +27,11 @@ class CRUD:
         # Menutup koneksi saat keluar dari konteks
         self.mongo.__exit__(exc_type, exc_value, traceback)
 
-    def check_org(self, org_id) -> int:
-        collection = self.mongo.get_database()[self.org_collection]
-        query = {"_id": org_id}
-        find_org = collection.find_one(query)
-        if not find_org:
-            logger.warning(f"Organization with ID {org_id} not found.")
-            raise ValueError("Organization not found")
-        return find_org.get("authority")
-
     def get_role_action(self):
         bitRA = get_enum(self.mongo,"ROLEACTION")
         bitRA = bitRA["value"]
         return bitRA
     
-    def get_feature(self, roles):
-        _featureDict = {}
-        collection = self.mongo.get_database()[self.permissions_collection]
-        query = {"r_id": {"$in": roles}}
-        find_role = collection.find(query)
-        for i in find_role:
-            if i['f_id'] not in _featureDict:
-                _featureDict[i['f_id']] = i['permission']
-            else:
-                _featureDict[i['f_id']] = i['permission'] | _featureDict[i['f_id']]
-        return _featureDict
-    
     def validate_password(self, user_info, password: str) -> UserInfo:
         if user_info.get("status") != Status.ACTIVE.value:
             logger.warning(f"User {user_info.get('username')} is not active.")
@@ -74,26 +55,77 @@ class CRUD:
             feature=user_info["feature"]
         )
 
+    def login_pipeline(self, username: str) -> list:
+        """
+        User, authority organisasi dan permission feature dalam satu aggregation.
+        Permission dikelompokkan per feature ($group); OR bitwise antar role dilakukan
+        di find_user karena operator $bitOr baru tersedia di MongoDB 6.3.
+        """
+        return [
+            {"$match": {"$or": [{"username": username}, {"email": username}]}},
+            {"$limit": 1},
+            # Lookup stage to join with org data
+            {
+                "$lookup": {
+                    "from": self.org_collection,
+                    "localField": "org_id",
+                    "foreignField": "_id",
+                    "as": "org"
+                }
+            },
+            # Lookup stage to join with feature on role, grouped per feature
+            {
+                "$lookup": {
+                    "from": self.permissions_collection,
+                    "let": {"roles": {"$ifNull": ["$roles", []]}},
+                    "pipeline": [
+                        {"$match": {"$expr": {"$in": ["$r_id", "$$roles"]}}},
+                        {"$group": {"_id": "$f_id", "permissions": {"$addToSet": "$permission"}}}
+                    ],
+                    "as": "feature"
+                }
+            },
+            {
+                "$project": {
+                    "username": 1,
+                    "org_id": 1,
+                    "password": 1,
+                    "roles": 1,
+                    "status": 1,
+                    "feature": 1,
+                    "org_found": {"$gt": [{"$size": "$org"}, 0]},
+                    "authority": {"$arrayElemAt": ["$org.authority", 0]}
+                }
+            }
+        ]
+
     def find_user(self, username: str) -> dict:
         collection = self.mongo.get_database()[self.user_collection]
-        query = {"$or": [{"username": username}, {"email": username}]}
-        user_info = collection.find_one(query)
+        user_info = next(collection.aggregate(self.login_pipeline(username)), None)
         if not user_info:
             logger.warning(f"User with username or email '{username}' not found.")
             raise ValueError("User not found")
-        user_info["bitws"]=self.get_role_action()
-        user_info["feature"]=self.get_feature(user_info["roles"])
+        if not user_info.pop("org_found"):
+            logger.warning(f"Organization with ID {user_info.get('org_id')} not found.")
+            raise ValueError("Organization not found")
+
+        _featureDict = {}
+        for i in user_info["feature"]:
+            permission = 0
+            for perm in i["permissions"]:
+                permission |= perm
+            _featureDict[i["_id"]] = permission
+        user_info["feature"] = _featureDict
+        user_info["bitws"] = self.get_role_action()
         return user_info
 
     def validate_user(self, username, password=None) -> UserInfo:
         user_info = self.find_user(username)
-        authority = self.check_org(user_info["org_id"])
 
         user_data = {
             key: user_info.get(key, None)
-            for key in ["_id", "username", "org_id", "password", "roles", "status", "bitws", "feature"]
+            for key in ["_id", "username", "org_id", "password", "roles", "status", "bitws", "feature", "authority"]
         }
-        user_data["authority"] = authority
         if password is None:
             return UserInfo(
                 id=user_data["_id"], 
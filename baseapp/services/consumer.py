@@ -1,74 +1,238 @@
-import argparse, json
-from baseapp.config.rabbitmq import RabbitMqConn
+import argparse, json, time, functools
+import pika, pika.exceptions
+from concurrent.futures import ThreadPoolExecutor
+from baseapp.config import setting
+from baseapp.config.rabbitmq import RabbitMqConn, RETRY_COUNT_HEADER, LAST_ERROR_HEADER, ORIGINAL_QUEUE_HEADER, dead_letter_queue_name
+from baseapp.services._rabbitmq_worker.base_worker import PermanentTaskError, TaskDeferred
+from baseapp.utils.metrics import start_metrics_server
+from baseapp.utils.tracing import consumer_span, setup_tracing
 
 # Importing the worker class
 from baseapp.services._rabbitmq_worker._webhook_worker import WebhookWorker
+from baseapp.services._rabbitmq_worker._dms_extract_worker import DmsExtractWorker, DMS_EXTRACT_QUEUE
+from baseapp.services._rabbitmq_worker._dms_thumbnail_worker import DmsThumbnailWorker, DMS_THUMBNAIL_QUEUE
 
-import logging.config
-logging.config.fileConfig('logging.conf')
+from baseapp.config.log import setup_logging
+setup_logging()
 from logging import getLogger
 logger = getLogger("rabbit")
 
+config = setting.get_settings()
+
 WORKER_MAP = {
     "webhook_tasks": WebhookWorker,
+    DMS_EXTRACT_QUEUE: DmsExtractWorker,
+    DMS_THUMBNAIL_QUEUE: DmsThumbnailWorker,
     # Tambahkan worker lain di sini
 }
 
-def start_consuming(queue_name: str, worker_instance):
+# Error koneksi yang memicu reconnect otomatis
+RECONNECT_ERRORS = (
+    ConnectionError,
+    pika.exceptions.AMQPConnectionError,
+    pika.exceptions.StreamLostError,
+)
+# Channel yang ditutup broker hanya di-reconnect untuk reply code sementara: 320 CONNECTION_FORCED,
+# 541 INTERNAL_ERROR. Error lain (PRECONDITION_FAILED, ACCESS_REFUSED, NOT_FOUND, ...) tidak akan
+# hilang dengan reconnect, jadi worker berhenti.
+RECONNECT_CHANNEL_REPLY_CODES = (320, 541)
+
+def _should_reconnect(error: Exception) -> bool:
+    if isinstance(error, pika.exceptions.ChannelClosedByBroker):
+        return error.reply_code in RECONNECT_CHANNEL_REPLY_CODES
+    return isinstance(error, RECONNECT_ERRORS)
+
+def _ack(channel, delivery_tag):
+    # Dijalankan di thread koneksi (via add_callback_threadsafe)
+    if channel.is_open:
+        channel.basic_ack(delivery_tag=delivery_tag)
+    else:
+        logger.warning(f"Channel closed before ack of delivery {delivery_tag}; message will be redelivered.")
+
+def _retry_count(properties) -> int:
+    headers = properties.headers or {}
+    try:
+        return int(headers.get(RETRY_COUNT_HEADER, 0))
+    except (TypeError, ValueError):
+        return 0
+
+def _reroute(channel, publish_channel, delivery_tag, routing_key, properties, body, headers):
     """
-    Memulai worker untuk mendengarkan pesan dari antrian secara terus-menerus.
+    Dijalankan di thread koneksi: salin pesan ke antrian delay/dead (menunggu confirm broker),
+    baru kemudian ack pesan asli. Jika publish gagal, pesan asli dikembalikan ke antrian.
     """
+    if not channel.is_open:
+        logger.warning(f"Channel closed before settling delivery {delivery_tag}; message will be redelivered.")
+        return
     try:
-        # Gunakan context manager untuk koneksi yang andal
-        with RabbitMqConn() as channel:
-            # Deklarasi antrian yang andal, harus cocok dengan publisher
-            channel.queue_declare(queue=queue_name, durable=True, auto_delete=False)
-            
-            # Ambil 1 pesan per worker pada satu waktu untuk distribusi beban yang adil
-            channel.basic_qos(prefetch_count=1)
-
-            # Definisikan fungsi callback di dalam scope ini agar bisa mengakses 'channel'
-            def callback(ch, method, properties, body):
-                try:
-                    task_data = json.loads(body)
-                    logger.info(f"New task received for worker {worker_instance.__class__.__name__}")
-                    # Delegasikan tugas ke method process() dari worker yang sesuai
-                    worker_instance.process(task_data)
-                    ch.basic_ack(delivery_tag=method.delivery_tag)
-                    logger.info("Task successfully processed and acknowledged.")
-
-                except Exception as e:
-                    logger.error(f"Terjadi error saat memproses tugas: {e}")
-                    # Tolak pesan (nack) dan jangan masukkan kembali ke antrian (requeue=False)
-                    # Ini akan mengirim pesan ke Dead Letter Exchange jika dikonfigurasi
-                    ch.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
-
-            # Mulai proses consuming dengan manual acknowledgement
-            channel.basic_consume(
-                queue=queue_name,
-                on_message_callback=callback,
-                auto_ack=False # Sangat penting untuk keandalan
+        publish_channel.basic_publish(
+            exchange='',
+            routing_key=routing_key,
+            body=body,
+            properties=pika.BasicProperties(
+                content_type=properties.content_type,
+                delivery_mode=pika.DeliveryMode.Persistent,
+                headers=headers
             )
+        )
+    except Exception as e:
+        logger.error(f"Failed to move delivery {delivery_tag} to '{routing_key}': {e}")
+        channel.basic_nack(delivery_tag=delivery_tag, requeue=True)
+        return
+    channel.basic_ack(delivery_tag=delivery_tag)
+
+def _defer_tier(retry_delays, delay_seconds) -> int:
+    """Tier delay terpendek yang jedanya >= delay_seconds (tier terpanjang bila tidak ada)."""
+    return next((i for i, delay in enumerate(retry_delays) if delay >= (delay_seconds or 0)), len(retry_delays) - 1)
+
+def _failure_route(queue_name: str, delay_queues, retry_delays, properties, error: Exception):
+    """
+    Menentukan tujuan pesan yang gagal: antrian delay tier berikutnya atau <queue>.dead.
+    TaskDeferred memakai antrian delay yang sama tanpa menambah retry count.
+    """
+    retries = _retry_count(properties)
+    headers = dict(properties.headers or {})
+    headers[LAST_ERROR_HEADER] = str(error)[:1000]
+    if isinstance(error, TaskDeferred) and delay_queues:
+        return delay_queues[_defer_tier(retry_delays, error.delay_seconds)], headers, retries
+    if isinstance(error, PermanentTaskError) or retries >= len(delay_queues):
+        headers[ORIGINAL_QUEUE_HEADER] = queue_name
+        return dead_letter_queue_name(queue_name), headers, retries
+    headers[RETRY_COUNT_HEADER] = retries + 1
+    return delay_queues[retries], headers, retries
+
+def _process_delivery(connection, channel, publish_channel, queue_name, delay_queues, retry_delays, worker_instance, delivery_tag, properties, body):
+    """
+    Dijalankan di thread pool. Ack/publish tidak boleh dipanggil langsung dari thread ini
+    (pika tidak thread-safe), jadi dikirim kembali ke thread koneksi.
+    """
+    try:
+        try:
+            task_data = json.loads(body)
+        except ValueError as ve:
+            raise PermanentTaskError(f"Invalid JSON payload: {ve}") from ve
+        logger.info(f"New task received for worker {worker_instance.__class__.__name__}")
+        # Delegasikan tugas ke method process() dari worker yang sesuai; span tersambung ke publisher lewat header
+        with consumer_span(f"{queue_name} process", properties.headers, **{"messaging.system": "rabbitmq", "messaging.destination.name": queue_name}):
+            worker_instance.process(task_data)
+        settle = functools.partial(_ack, channel, delivery_tag)
+        logger.info("Task successfully processed and acknowledged.")
+    except Exception as e:
+        routing_key, headers, retries = _failure_route(queue_name, delay_queues, retry_delays, properties, e)
+        if isinstance(e, TaskDeferred) and routing_key != dead_letter_queue_name(queue_name):
+            logger.info(f"Tugas ditunda via '{routing_key}' (retry tetap {retries}): {e}")
+        elif routing_key == dead_letter_queue_name(queue_name):
+            logger.error(f"Terjadi error saat memproses tugas (retry {retries}), dipindahkan ke '{routing_key}': {e}")
+        else:
+            logger.warning(f"Terjadi error saat memproses tugas (retry {retries + 1}/{len(delay_queues)} via '{routing_key}'): {e}")
+        settle = functools.partial(_reroute, channel, publish_channel, delivery_tag, routing_key, properties, body, headers)
+
+    try:
+        connection.add_callback_threadsafe(settle)
+    except Exception as ce:
+        # Koneksi sudah ditutup (mis. reconnect); broker akan mengirim ulang pesan ini
+        logger.warning(f"Unable to settle delivery {delivery_tag}: {ce}")
 
-            logger.info(f"[*] Worker '{worker_instance.__class__.__name__}' ready for queue '{queue_name}'. To exit press CTRL+C")
+def _consume(queue_name: str, worker_instance, executor: ThreadPoolExecutor, prefetch_count: int):
+    rabbit_conn = RabbitMqConn()
+    # Gunakan context manager untuk koneksi yang andal
+    with rabbit_conn as channel:
+        connection = rabbit_conn.connection
+
+        # Deklarasi antrian yang andal, harus cocok dengan publisher
+        channel.queue_declare(queue=queue_name, durable=True, auto_delete=False)
+
+        # Antrian delay per tier (DLX kembali ke queue_name) dan antrian akhir <queue>.dead
+        retry_delays = getattr(worker_instance, "retry_delays", None) or config.rabbitmq_retry_delays
+        delay_queues = rabbit_conn.declare_retry_queues(queue_name, retry_delays, channel=channel)
+
+        # Channel terpisah dengan publisher confirms untuk memindahkan pesan yang gagal
+        publish_channel = connection.channel()
+        publish_channel.confirm_delivery()
+
+        # Batas pesan yang belum di-ack sekaligus juga membatasi antrian di thread pool
+        channel.basic_qos(prefetch_count=prefetch_count)
+
+        def callback(ch, method, properties, body):
+            # Thread koneksi tidak pernah terblokir oleh tugas yang lambat,
+            # sehingga heartbeat tetap diproses selama tugas berjalan
+            executor.submit(_process_delivery, connection, ch, publish_channel, queue_name, delay_queues, retry_delays, worker_instance, method.delivery_tag, properties, body)
+
+        # Mulai proses consuming dengan manual acknowledgement
+        channel.basic_consume(
+            queue=queue_name,
+            on_message_callback=callback,
+            auto_ack=False # Sangat penting untuk keandalan
+        )
+
+        logger.info(f"[*] Worker '{worker_instance.__class__.__name__}' ready for queue '{queue_name}' (prefetch={prefetch_count}, retry delays={retry_delays}). To exit press CTRL+C")
+        try:
             channel.start_consuming()
+        except KeyboardInterrupt:
+            channel.stop_consuming()
+            # Tunggu tugas yang sedang berjalan, lalu kirim ack yang tersisa
+            executor.shutdown(wait=True)
+            connection.process_data_events(time_limit=1)
+            raise
+
+def start_consuming(queue_name: str, worker_instance, prefetch_count: int = None, workers: int = None, reconnect_delay: float = 5.0):
+    """
+    Memulai worker untuk mendengarkan pesan dari antrian secara terus-menerus.
+    Pesan diproses paralel oleh thread pool; koneksi dibuat ulang otomatis bila terputus.
+    """
+    prefetch_count = prefetch_count or config.rabbitmq_prefetch_count
+    workers = workers or config.rabbitmq_consumer_workers
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"{queue_name}-worker")
+    logger.info(f"Processing deliveries of '{queue_name}' with {workers} worker thread(s).")
 
+    try:
+        while True:
+            try:
+                _consume(queue_name, worker_instance, executor, prefetch_count)
+                # start_consuming berhenti tanpa error (mis. stop_consuming dipanggil)
+                break
+            except Exception as e:
+                if not _should_reconnect(e):
+                    raise
+                logger.error(f"RabbitMQ connection lost: {e}. Reconnecting in {reconnect_delay}s...")
+                time.sleep(reconnect_delay)
     except KeyboardInterrupt:
         logger.info("Worker stopped by user.")
     except Exception as e:
-        logger.error(f"RabbitMQ connection failed: {e}")
+        logger.critical(f"RabbitMQ consumer stopped: {e}")
+        raise
+    finally:
+        executor.shutdown(wait=False)
 
 
 if __name__ == "__main__":
     # Buat parser untuk argumen command-line
     parser = argparse.ArgumentParser(description="RabbitMQ Consumer Worker")
     parser.add_argument(
-        '--queue', 
-        type=str, 
+        '--queue',
+        type=str,
         required=True,
         choices=WORKER_MAP.keys(),
         help="Nama antrian yang akan di-consume."
     )
+    parser.add_argument(
+        '--prefetch',
+        type=int,
+        default=None,
+        help="Jumlah pesan yang belum di-ack per consumer (default: RABBITMQ_PREFETCH_COUNT)."
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help="Jumlah thread pemroses pesan (default: RABBITMQ_CONSUMER_WORKERS)."
+    )
+    parser.add_argument(
+        '--metrics-port',
+        type=int,
+        default=config.metrics_worker_port,
+        help="Port HTTP untuk metric Prometheus worker ini (default: METRICS_WORKER_PORT, 0 = nonaktif)."
+    )
     args = parser.parse_args()
     queue_name = args.queue
 
@@ -78,6 +242,8 @@ if __name__ == "__main__":
         exit(1)
 
     worker_instance = WorkerClass()
+    start_metrics_server(args.metrics_port)
+    setup_tracing(service_name=f"{config.otel_service_name}-worker-{queue_name}")
 
     # Jalankan consumer dengan instance worker tersebut
-    start_consuming(queue_name=args.queue, worker_instance=worker_instance)
\ No newline at end of file
+    start_consuming(queue_name=args.queue, worker_instance=worker_instance, prefetch_count=args.prefetch, workers=args.workers)
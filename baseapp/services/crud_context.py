@@ -0,0 +1,37 @@
+from typing import List, Optional
+
+from baseapp.services.audit_trail_service import AuditTrailService
+from baseapp.utils.request_context import get_request_context, set_request_context
+
+def _context_field(name: str):
+    return property(lambda self: getattr(get_request_context(), name), doc=f"`{name}` dari RequestContext request saat ini.")
+
+class ContextAwareCRUD:
+    """
+    Base class CRUD tanpa state per request: user_id, org_id, dll. dibaca dari RequestContext
+    (ContextVar), dan satu AuditTrailService dipakai bersama oleh semua request.
+    Aman dipakai dari banyak request sekaligus, termasuk dari threadpool.
+    """
+    audit_trail = AuditTrailService()
+
+    user_id = _context_field("user_id")
+    org_id = _context_field("org_id")
+    authority = _context_field("authority")
+    roles = _context_field("roles")
+    ip_address = _context_field("ip_address")
+    user_agent = _context_field("user_agent")
+
+    def set_context(self, user_id: str, org_id: str, authority: Optional[int] = None, roles: Optional[List] = None,
+                    ip_address: Optional[str] = None, user_agent: Optional[str] = None):
+        """
+        Menetapkan konteks pengguna untuk request yang sedang berjalan (bukan atribut instance),
+        sehingga berlaku juga untuk service lain yang dipanggil di request yang sama.
+        """
+        set_request_context(
+            user_id=user_id,
+            org_id=org_id,
+            authority=authority,
+            roles=roles,
+            ip_address=ip_address,
+            user_agent=user_agent
+        )
@@ -1,5 +1,6 @@
 from fastapi import APIRouter
 from baseapp.model.common import ApiResponse
+from baseapp.utils.response import ApiRoute
 from baseapp.config.setting import get_settings
 config = get_settings()
 
@@ -9,7 +10,7 @@ _crud = CRUD()
 import logging
 logger = logging.getLogger()
 
-router = APIRouter(prefix="/v1/init", tags=["Init"])
+router = APIRouter(prefix="/v1/init", tags=["Init"], route_class=ApiRoute)
 
 @router.post("/database", response_model=ApiResponse)
 async def init_database() -> ApiResponse:
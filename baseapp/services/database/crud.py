@@ -2,10 +2,18 @@ import logging,json
 from pymongo.errors import PyMongoError
 
 from baseapp.config import setting, mongodb, minio
+from baseapp.services._menu.crud import invalidate_menu_cache
+from baseapp.utils.tracing import traced
 
 config = setting.get_settings()
 logger = logging.getLogger(__name__)
 
+def load_initdata() -> dict:
+    """Skema collection (index) dan data awal dari initdata.json."""
+    with open(f"{config.file_location}initdata.json") as json_file:
+        return json.load(json_file)
+
+@traced
 class CRUD:
     def __init__(self):
         pass
@@ -15,14 +23,17 @@ class CRUD:
         Create database and tables with schema.
         """
         try:
-            with open(f"{config.file_location}initdata.json") as json_file:
-                initData = json.load(json_file)            
-                with mongodb.MongoConn() as mongo_conn:
-                    is_exists = mongo_conn.check_database_exists()
-                    logger.debug(f"Database exist is {is_exists}")
-                    if not is_exists:
-                        mongo_conn.create_database(initData)
-                    return is_exists
+            initData = load_initdata()
+            with mongodb.MongoConn() as mongo_conn:
+                is_exists = mongo_conn.check_database_exists()
+                logger.debug("Database exist is %s", is_exists)
+                if not is_exists:
+                    mongo_conn.create_database(initData)
+                    invalidate_menu_cache()
+                else:
+                    # Database lama: cukup tambahkan index yang belum ada
+                    mongo_conn.ensure_indexes(initData)
+                return is_exists
         except PyMongoError as pme:
             logger.error(f"Database error occurred: {str(pme)}")
             raise ValueError("Database error occurred while create database and tables.") from pme
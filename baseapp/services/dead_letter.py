@@ -0,0 +1,83 @@
+"""
+Replay pesan dari antrian dead letter (<queue>.dead) kembali ke antrian asalnya.
+
+    python -m baseapp.services.dead_letter --queue webhook_tasks --dry-run
+    python -m baseapp.services.dead_letter --queue webhook_tasks --limit 100
+"""
+import argparse
+import pika
+
+from baseapp.config.rabbitmq import RabbitMqConn, RETRY_COUNT_HEADER, LAST_ERROR_HEADER, ORIGINAL_QUEUE_HEADER, dead_letter_queue_name
+
+from baseapp.config.log import setup_logging
+setup_logging()
+from logging import getLogger
+logger = getLogger("rabbit")
+
+def replay_dead_letters(queue_name: str, limit: int = None, dry_run: bool = False) -> int:
+    """
+    Memindahkan pesan dari <queue_name>.dead ke antrian asal (header x-original-queue,
+    default queue_name) dengan hitungan retry di-reset.
+    Return: jumlah pesan yang dipindahkan (atau yang akan dipindahkan bila dry_run).
+    """
+    dead_queue = dead_letter_queue_name(queue_name)
+    with RabbitMqConn() as channel:
+        pending = channel.queue_declare(queue=dead_queue, durable=True, auto_delete=False).method.message_count
+        total = pending if limit is None else min(limit, pending)
+        logger.info(f"{pending} message(s) in '{dead_queue}', {'inspecting' if dry_run else 'replaying'} {total}.")
+        if total == 0:
+            return 0
+
+        channel.confirm_delivery()
+        peeked = []
+        moved = 0
+        try:
+            while moved < total:
+                method, properties, body = channel.basic_get(queue=dead_queue, auto_ack=False)
+                if method is None:
+                    break
+                headers = dict(properties.headers or {})
+                target = headers.pop(ORIGINAL_QUEUE_HEADER, None) or queue_name
+                if isinstance(target, bytes):
+                    target = target.decode("utf-8")
+
+                if dry_run:
+                    logger.info(f"[dry-run] -> '{target}' retries={headers.get(RETRY_COUNT_HEADER, 0)} error={headers.get(LAST_ERROR_HEADER)}")
+                    peeked.append(method.delivery_tag)
+                    moved += 1
+                    continue
+
+                headers.pop(RETRY_COUNT_HEADER, None)
+                headers.pop(LAST_ERROR_HEADER, None)
+                channel.queue_declare(queue=target, durable=True, auto_delete=False)
+                channel.basic_publish(
+                    exchange='',
+                    routing_key=target,
+                    body=body,
+                    properties=pika.BasicProperties(
+                        content_type=properties.content_type,
+                        delivery_mode=pika.DeliveryMode.Persistent,
+                        headers=headers
+                    ),
+                    mandatory=True
+                )
+                # Ack setelah publish dikonfirmasi broker, sehingga pesan tidak hilang
+                channel.basic_ack(delivery_tag=method.delivery_tag)
+                moved += 1
+        finally:
+            # Pesan yang hanya diperiksa dikembalikan ke antrian dead letter
+            for delivery_tag in peeked:
+                channel.basic_nack(delivery_tag=delivery_tag, requeue=True)
+
+    logger.info(f"{moved} message(s) {'inspected' if dry_run else 'replayed'} from '{dead_queue}'.")
+    return moved
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay RabbitMQ dead-lettered messages")
+    parser.add_argument('--queue', type=str, required=True, help="Nama antrian asal (tanpa akhiran .dead).")
+    parser.add_argument('--limit', type=int, default=None, help="Jumlah maksimum pesan yang di-replay.")
+    parser.add_argument('--dry-run', action='store_true', help="Hanya tampilkan pesan tanpa memindahkannya.")
+    args = parser.parse_args()
+
+    replay_dead_letters(args.queue, limit=args.limit, dry_run=args.dry_run)
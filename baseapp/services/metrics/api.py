@@ -0,0 +1,55 @@
+import logging, threading
+from fastapi import APIRouter, Response
+from prometheus_client.core import GaugeMetricFamily
+
+from baseapp.config import setting
+from baseapp.config.redis import RedisConn
+from baseapp.config.rabbitmq import RabbitMqConn, dead_letter_queue_name
+from baseapp.utils.metrics import metrics_registry, render_metrics
+
+config = setting.get_settings()
+logger = logging.getLogger(__name__)
+
+class QueueDepthCollector:
+    """Kedalaman antrian worker, dibaca saat scrape: list Redis dan antrian RabbitMQ (beserta dead letter)."""
+    def __init__(self):
+        self._redis = RedisConn()
+        self._rabbit = RabbitMqConn()
+        self._lock = threading.Lock()
+
+    def _family(self):
+        return GaugeMetricFamily("worker_queue_depth", "Messages waiting in worker queues", labels=["broker", "queue"])
+
+    def describe(self):
+        # Tanpa describe(), registry memanggil collect() (dan koneksi ke broker) saat register
+        yield self._family()
+
+    def collect(self):
+        family = self._family()
+        try:
+            redis_conn = self._redis.get_connection()
+            for queue_name in config.metrics_redis_queues:
+                family.add_metric(["redis", queue_name], redis_conn.llen(queue_name))
+        except Exception as e:
+            logger.warning(f"Unable to read Redis queue depth: {e}")
+
+        # pika BlockingConnection tidak thread-safe, scrape bisa datang bersamaan
+        with self._lock:
+            for queue_name in config.metrics_rabbitmq_queues:
+                for name in (queue_name, dead_letter_queue_name(queue_name)):
+                    try:
+                        result = self._rabbit.get_channel().queue_declare(queue=name, passive=True)
+                        family.add_metric(["rabbitmq", name], result.method.message_count)
+                    except Exception as e:
+                        # Antrian belum ada menutup channel; get_channel() membuatnya ulang pada iterasi berikutnya
+                        logger.warning(f"Unable to read RabbitMQ queue depth for '{name}': {e}")
+        yield family
+
+_registry = metrics_registry(QueueDepthCollector())
+
+router = APIRouter(tags=["Metrics"])
+
+@router.get("/metrics", include_in_schema=False)
+def metrics() -> Response:
+    body, content_type = render_metrics(_registry)
+    return Response(content=body, media_type=content_type)
@@ -1,9 +1,13 @@
 import logging,time
-from fastapi import Request, FastAPI
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from baseapp.utils.utility import generate_uuid
+from baseapp.utils.response import response_class_for
 from baseapp.config import setting
+from baseapp.config.log import log_id_var
+from baseapp.utils.metrics import HTTP_IN_PROGRESS, HTTP_REQUEST_DURATION, HTTP_REQUESTS
 from baseapp.model.common import ApiResponse
 
 config = setting.get_settings()
@@ -13,72 +17,106 @@ class BusinessError(Exception):
     def __init__(self, message: str, code: int = 400):
         self.message = message
         self.code = code
-    
-async def handle_exceptions(request: Request, call_next):
-    try:
-        return await call_next(request)
-    except BusinessError as be:
+
+def map_exception(exc: Exception):
+    """Exception dari service layer -> (http status code, pesan ApiResponse)."""
+    if isinstance(exc, BusinessError):
         # Untuk kesalahan error bisnis
-        return JSONResponse(
-            content=ApiResponse(status=4, message=be.message).model_dump(),
-            status_code=be.code
-        )
-    except ValueError as ve:
+        return exc.code, exc.message
+    if isinstance(exc, ValueError):
         # Untuk kesalahan validasi user input
-        logger.warning(f"Validation error: {str(ve)}")
-        return JSONResponse(
-            content=ApiResponse(status=4, message=str(ve)).model_dump(),
-            status_code=400
-        )
-    except ConnectionError as ce:
+        logger.warning("Validation error: %s", exc)
+        return 400, str(exc)
+    if isinstance(exc, ConnectionError):
         # Untuk kesalahan koneksi ke layanan eksternal
-        logger.error(f"Connection error: {str(ce)}")
-        return JSONResponse(
-            content=ApiResponse(status=4, message="Service unavailable.").model_dump(),
-            status_code=503
-        )
-    except PermissionError as pe:
+        logger.error("Connection error: %s", exc)
+        return 503, "Service unavailable."
+    if isinstance(exc, PermissionError):
         # Untuk kesalahan otorisasi
-        logger.warning(f"Permission denied: {str(pe)}")
-        return JSONResponse(
-            content=ApiResponse(status=4, message="Access denied.").model_dump(),
-            status_code=403
-        )
-    except Exception as e:
-        # Untuk semua kesalahan lainnya
-        logger.exception(f"Unhandled error: {str(e)}")
-        message = "Internal server error" if config.app_env == "production" else str(e)
-        return JSONResponse(
-            content=ApiResponse(status=4, message=message).model_dump(),
-            status_code=500
-        )
-    
-async def add_process_time_and_log(request: Request, call_next):
-    if "log_id" in request.headers:
-        log_id = request.headers.get("log_id")
-    else:
-        log_id = generate_uuid()
-    request.state.log_id = log_id
-    log_request = {
-        "log_id": log_id,
-        "method": request.method,
-        "url": request.url.path,
-    }
-    logging.info(f"request: {log_request}")
-
-    start_time = time.time()
-    response = await call_next(request)
-
-    process_time = time.time() - start_time
-    response.headers["X-Process-Time"] = str(process_time)
-    log_response = {
-        "log_id": log_id,
-        "process_time": str(process_time),
-        "http_status_code": response.status_code
-    }
-    logging.info(f"response: {log_response}")
-    return response
+        logger.warning("Permission denied: %s", exc)
+        return 403, "Access denied."
+    # Untuk semua kesalahan lainnya
+    logger.exception("Unhandled error: %s", exc)
+    message = "Internal server error" if config.app_env == "production" else str(exc)
+    return 500, message
+
+class HandleExceptionsMiddleware:
+    """
+    Pure ASGI middleware: exception yang lolos dari router dipetakan ke ApiResponse(status=4).
+    Error dikirim dengan format yang sama dengan yang diminta client (JSON/CBOR/MessagePack).
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_wrapper(message: Message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as exc:
+            if response_started:
+                # Header sudah terkirim, tidak bisa diganti dengan response error
+                raise
+            status_code, message = map_exception(exc)
+            response_class = response_class_for(Headers(scope=scope).get("accept"))
+            response = response_class(content=ApiResponse(status=4, message=message).model_dump(), status_code=status_code)
+            await response(scope, receive, send)
+
+class ProcessTimeLogMiddleware:
+    """
+    Pure ASGI middleware: log_id (dari header `log_id` atau UUID baru) disimpan di request.state,
+    request/response di-log, lama proses dikirim di header X-Process-Time,
+    dan latency dicatat ke metric Prometheus per route template.
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        log_id = Headers(scope=scope).get("log_id") or generate_uuid()
+        scope.setdefault("state", {})["log_id"] = log_id
+        # log_id ikut tercatat di semua log selama request ini (lihat LogIdFilter)
+        token = log_id_var.set(log_id)
+        method, path = scope["method"], scope["path"]
+        logger.info("request %s %s", method, path, extra={"method": method, "url": path})
+
+        start_time = time.perf_counter()
+        in_progress = HTTP_IN_PROGRESS.labels(method)
+        in_progress.inc()
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                process_time = time.perf_counter() - start_time
+                MutableHeaders(scope=message)["X-Process-Time"] = str(process_time)
+                # Route sudah di-match router saat response dimulai; path mentah tidak dipakai agar label tidak meledak
+                route = scope.get("route")
+                route_path = getattr(route, "path", "unmatched")
+                HTTP_REQUEST_DURATION.labels(method, route_path).observe(process_time)
+                HTTP_REQUESTS.labels(method, route_path, str(message["status"])).inc()
+                logger.info("response %s %s %s %.6f", method, path, message["status"], process_time,
+                            extra={"http_status_code": message["status"], "process_time": process_time})
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_progress.dec()
+            log_id_var.reset(token)
 
 def setup_middleware(app: FastAPI):
-    app.middleware("http")(handle_exceptions)
-    app.middleware("http")(add_process_time_and_log)
\ No newline at end of file
+    # Middleware yang ditambahkan terakhir menjadi lapisan terluar
+    app.add_middleware(HandleExceptionsMiddleware)
+    app.add_middleware(ProcessTimeLogMiddleware)
@@ -10,7 +10,8 @@ from fastapi.responses import RedirectResponse
 from baseapp.config.redis import RedisConn
 from baseapp.model.common import ApiResponse, CurrentUser
 from typing import Optional
-from baseapp.utils.jwt import create_access_token, create_refresh_token, get_current_user
+from baseapp.utils.jwt import create_access_token, create_refresh_token, get_current_user, store_refresh_token
+from baseapp.utils.response import ApiRoute
 
 from baseapp.services.oauth_google.model import GoogleToken
 from baseapp.services.oauth_google.crud import CRUD
@@ -25,7 +26,7 @@ config = setting.get_settings()
 import logging
 logger = logging.getLogger()
 
-router = APIRouter(prefix="/v1/oauth", tags=["Oauth"])
+router = APIRouter(prefix="/v1/oauth", tags=["Oauth"], route_class=ApiRoute)
 
 # FUNCTION REFRESH TOKEN GOOGLE 
 def refreshToken(session):
@@ -71,7 +72,7 @@ async def auth_google_callback(
     
     try:
         logger.debug("API LOGIN GOOGLE")
-        logger.debug(f"Redirect Flutter {flutter_redirect}")
+        logger.debug("Redirect Flutter %s", flutter_redirect)
         
         # 1. Dapatkan token dari Google
         resGoogle = _crud.login_google(code)
@@ -83,7 +84,7 @@ async def auth_google_callback(
             'access_token': resGoogle['access_token']
         }
 
-        logger.debug(f"Request link google account: {oauth_data}")
+        logger.debug("Request link google account: %s", oauth_data)
 
         params = parse.urlencode(oauth_data)
         return RedirectResponse(url=f"{flutter_redirect}?{params}")
@@ -129,7 +130,8 @@ async def login_google_account(response: Response, req: GoogleToken) -> ApiRespo
         "authority": user_info.authority,
         "org_id": user_info.org_id,
         "features": user_info.feature,
-        "bitws": user_info.bitws
+        "bitws": user_info.bitws,
+        "session_id": uuid.uuid4().hex
     }
 
     # Buat akses token dan refresh token
@@ -137,14 +139,8 @@ async def login_google_account(response: Response, req: GoogleToken) -> ApiRespo
     refresh_token, expire_refresh_in = create_refresh_token(token_data)
 
     # Simpan refresh token ke Redis
-    session_id = uuid.uuid4().hex
-    redis_key = f"refresh_token:{user_info.id}:{session_id}"
     with RedisConn() as redis_conn:
-        redis_conn.set(
-            redis_key,
-            refresh_token,
-            ex=timedelta(days=expire_refresh_in),
-        )
+        store_refresh_token(redis_conn, user_info.id, token_data["session_id"], refresh_token, expire_refresh_in)
         
     # Hitung waktu kedaluwarsa akses token
     expired_at = datetime.now(timezone.utc) + timedelta(minutes=float(expire_access_in))
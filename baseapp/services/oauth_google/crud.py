@@ -2,41 +2,26 @@ import logging
 from urllib import parse
 
 from pymongo.errors import PyMongoError
-from typing import Optional
 from datetime import datetime, timezone
 
 import requests
 
 from baseapp.config import setting, mongodb
 from baseapp.services.oauth_google.model import Google, GoogleToken
-from baseapp.services.audit_trail_service import AuditTrailService
+from baseapp.services.crud_context import ContextAwareCRUD
+from baseapp.services.profile.crud import invalidate_user
+from baseapp.utils.tracing import traced
 
 config = setting.get_settings()
 logger = logging.getLogger(__name__)
 
-class CRUD:
+@traced
+class CRUD(ContextAwareCRUD):
     def __init__(self, collection_name="_user"):
         self.collection_name = collection_name
         self.httpsOptionsForGoogle = "https://www.googleapis.com:443"
         self.redirect_uri = config.google_redirect_uri
 
-    def set_context(self, user_id: str, org_id: str, ip_address: Optional[str] = None, user_agent: Optional[str] = None):
-        """
-        Memperbarui konteks pengguna dan menginisialisasi AuditTrailService.
-        """
-        self.user_id = user_id
-        self.org_id = org_id
-        self.ip_address = ip_address
-        self.user_agent = user_agent
-
-        # Inisialisasi atau perbarui AuditTrailService dengan konteks terbaru
-        self.audit_trail = AuditTrailService(
-            user_id=self.user_id,
-            org_id=self.org_id,
-            ip_address=self.ip_address,
-            user_agent=self.user_agent
-        )
-
     def link_to_google(self, data: GoogleToken):
         """
         Link current account to google.
@@ -76,6 +61,7 @@ class CRUD:
                     details={"$set": obj},
                     status="success"
                 )
+                invalidate_user(self.user_id)
                 del update_user["password"]
                 return update_user
             except PyMongoError as pme:
@@ -185,6 +171,7 @@ class CRUD:
                     details={"$set": obj},
                     status="success"
                 )
+                invalidate_user(self.user_id)
                 del update_user["password"]
                 return update_user
             except PyMongoError as pme:
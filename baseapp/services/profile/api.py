@@ -2,58 +2,47 @@ from fastapi import APIRouter, Depends
 
 from baseapp.model.common import ApiResponse, CurrentUser
 from baseapp.utils.jwt import get_current_user
+from baseapp.utils.response import ApiRoute
 
 from baseapp.config import setting
 config = setting.get_settings()
 
-import logging, httpx
+from baseapp.services.profile.crud import CRUD
+_crud = CRUD()
+
+from baseapp.services.permission_check_service import PermissionChecker
+permission_checker = PermissionChecker()
+
+import logging
 logger = logging.getLogger()
 
-router = APIRouter(prefix="/v1/profile", tags=["Profile"])
+router = APIRouter(prefix="/v1/profile", tags=["Profile"], route_class=ApiRoute)
     
 @router.get("/organization", response_model=ApiResponse)
 async def get_org_profile(cu: CurrentUser = Depends(get_current_user)) -> ApiResponse:
-    token: str = cu.token
-    org_id: str = cu.org_id
-    api_url = config.host + f"/v1/_organization/find/{org_id}"
-    headers = {'Content-Type': 'application/json', 'Authorization': "Bearer "+ token}
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.request(
-                method="GET",
-                url=api_url,
-                headers=headers,
-                timeout=30
-            )
-            logger.debug(f"respon org profile: {response.raise_for_status()}")
-            response.raise_for_status()
-            return ApiResponse.model_validate_json(response.text)
-        except httpx.RequestError as exc:
-            logger.error(f"An error occurred while requesting {exc.request.url}: {exc}")
-            raise ValueError(str(exc))
-        except httpx.HTTPStatusError as exc:
-            logger.error(f"HTTP error occurred: {exc.response.status_code}")
-            ApiResponse.model_validate_json(exc.response.text)
+    if not (permission_checker.has_permission(cu.roles, "_organization", 1) or permission_checker.has_permission(cu.roles, "_myorg", 1)):  # 1 untuk izin baca
+        raise PermissionError("Access denied")
+
+    _crud.set_context(
+        user_id=cu.id,
+        org_id=cu.org_id,
+        ip_address=cu.ip_address,  # Jika ada
+        user_agent=cu.user_agent   # Jika ada
+    )
+    response = _crud.get_org_profile(cu.org_id)
+    return ApiResponse(status=0, message="Data found", data=response)
 
 @router.get("/user", response_model=ApiResponse)
 async def get_user_profile(cu: CurrentUser = Depends(get_current_user)) -> ApiResponse:
-    token: str = cu.token
-    user_id: str = cu.id
-    api_url = config.host + f"/v1/_user/find/{user_id}"
-    headers = {'Content-Type': 'application/json', 'Authorization': "Bearer "+ token}
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.request(
-                method="GET",
-                url=api_url,
-                headers=headers,
-                timeout=30
-            )
-            response.raise_for_status()
-            return ApiResponse.model_validate_json(response.text)
-        except httpx.RequestError as exc:
-            logger.error(f"An error occurred while requesting {exc.request.url}: {exc}")
-            raise ValueError(str(exc))
-        except httpx.HTTPStatusError as exc:
-            logger.error(f"HTTP error occurred: {exc.response.status_code}")
-            return ApiResponse.model_validate_json(exc.response.text)
\ No newline at end of file
+    if not (permission_checker.has_permission(cu.roles, "_user", 1) or
+        permission_checker.has_permission(cu.roles, "_myprofile", 1)):  # 1 untuk izin baca
+        raise PermissionError("Access denied")
+
+    _crud.set_context(
+        user_id=cu.id,
+        org_id=cu.org_id,
+        ip_address=cu.ip_address,  # Jika ada
+        user_agent=cu.user_agent   # Jika ada
+    )
+    response = _crud.get_user_profile(cu.id)
+    return ApiResponse(status=0, message="Data found", data=response)
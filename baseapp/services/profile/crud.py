@@ -0,0 +1,62 @@
+import logging
+
+from baseapp.config import setting, mongodb
+from baseapp.services import registry
+from baseapp.utils.cache import TTLCache
+from baseapp.services.crud_context import ContextAwareCRUD
+from baseapp.utils.tracing import traced
+
+config = setting.get_settings()
+logger = logging.getLogger(__name__)
+
+# Cache profil per worker; entri basi paling lama profile_cache_ttl detik
+_user_cache = TTLCache(maxsize=config.profile_cache_size, ttl=config.profile_cache_ttl)
+_org_cache = TTLCache(maxsize=config.profile_cache_size, ttl=config.profile_cache_ttl)
+
+def invalidate_user(user_id: str):
+    _user_cache.pop(user_id)
+
+def invalidate_org(org_id: str):
+    _org_cache.pop(org_id)
+    # Profil user menyertakan org_data, jadi ikut dikosongkan
+    _user_cache.clear()
+
+def invalidate_role(role_id: str):
+    # Profil user menyertakan roles; role yang berubah/dihapus bisa dipakai banyak user
+    _user_cache.clear()
+
+@traced
+class CRUD(ContextAwareCRUD):
+    """
+    Profil user/organisasi yang sedang login, dibaca langsung dari service layer _user/_organization.
+    Service tersebut membaca RequestContext yang sama, jadi konteks tidak perlu diteruskan.
+    """
+    def _service(self, name: str):
+        return registry.get_service(name)
+
+    def _get_profile(self, cache: TTLCache, name: str, doc_id: str):
+        """
+        Cache miss dibaca lewat get_by_id service (yang menulis audit trail "retrieve");
+        cache hit menulis audit trail yang sama di sini.
+        """
+        service = self._service(name)
+        obj = cache.get(doc_id)
+        if obj is None:
+            obj = service.get_by_id(doc_id)
+            cache.set(doc_id, obj)
+            return obj
+        with mongodb.MongoConn() as mongo:
+            self.audit_trail.log_audittrail(
+                mongo,
+                action="retrieve",
+                target=service.collection_name,
+                target_id=doc_id,
+                details={"_id": doc_id, "retrieved": obj, "cache": "hit"}
+            )
+        return obj
+
+    def get_org_profile(self, org_id: str):
+        return self._get_profile(_org_cache, "_organization", org_id)
+
+    def get_user_profile(self, user_id: str):
+        return self._get_profile(_user_cache, "_user", user_id)
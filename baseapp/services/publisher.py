@@ -1,56 +1,366 @@
-import pika, json, logging
+import pika, json, logging, queue, threading, time
+import pika.exceptions
+from pika.adapters.blocking_connection import ReturnedMessage
+from datetime import datetime, timezone
+from typing import Any, List, Optional
+
+from baseapp.config import setting
 from baseapp.config.rabbitmq import RabbitMqConn
+from baseapp.utils.metrics import observe
+from baseapp.utils.tracing import inject_context, producer_span
+from baseapp.utils.utility import generate_uuid
 
+config = setting.get_settings()
 logger = logging.getLogger("rabbit")
 
-def publish_message(queue_name: str, task_data: dict):
+# Error yang menandakan koneksi/channel rusak dan perlu dibuat ulang
+RECONNECT_ERRORS = (
+    ConnectionError,
+    pika.exceptions.AMQPConnectionError,
+    pika.exceptions.ChannelClosed,
+    pika.exceptions.ChannelWrongStateError,
+    pika.exceptions.ConnectionWrongStateError,
+    pika.exceptions.StreamLostError,
+)
+
+class _BatchConfirmChannel:
     """
-    Membuka koneksi, mengirim satu pesan ke antrian, lalu menutup koneksi.
-    Fungsi ini sekarang mandiri dan tidak memerlukan class.
+    Channel publisher confirms untuk publish_batch.
+    BlockingChannel.basic_publish dalam mode confirm menunggu ack broker untuk setiap pesan, jadi batch
+    dikirim lewat channel pika di bawahnya (_impl): semua pesan dikirim dengan mandatory=True, lalu
+    ack broker ditunggu sekali untuk seluruh batch. Delivery tag publisher berurutan per channel.
+    Memakai API internal pika (_impl, _flush_output): versi pika dipin di requirements.txt dan
+    dicek tests/test_publisher.py, jalankan ulang test tersebut sebelum upgrade pika.
+    """
+    def __init__(self, connection):
+        self.channel = connection.channel()
+        self._impl = self.channel._impl
+        self._last_tag = 0
+        self._unconfirmed = set()
+        self._nacked = []
+        self._returned = []
+        selected = []
+        self._impl.confirm_delivery(ack_nack_callback=self._on_confirm, callback=selected.append)
+        self.channel._flush_output(lambda: bool(selected))
+        self._impl.add_on_return_callback(self._on_return)
 
-    Args:
-        queue_name (str): Nama antrian tujuan.
-        task_data (dict): Data tugas yang akan dikirim.
+    @property
+    def is_open(self):
+        return self.channel.is_open
+
+    def _on_confirm(self, frame):
+        method = frame.method
+        if method.multiple:
+            tags = {tag for tag in self._unconfirmed if tag <= method.delivery_tag}
+        else:
+            tags = {method.delivery_tag}
+        self._unconfirmed -= tags
+        if isinstance(method, pika.spec.Basic.Nack):
+            self._nacked.extend(tags)
+
+    def _on_return(self, channel, method, properties, body):
+        # Basic.Return (pesan mandatory yang tidak bisa dirutekan) selalu datang sebelum ack-nya
+        self._returned.append(ReturnedMessage(method, properties, body))
+
+    def publish(self, routing_key: str, bodies: List[str], properties, timeout: float):
+        """
+        Mengirim bodies lalu menunggu konfirmasi seluruhnya.
+        Raise NackError/UnroutableError bila ada pesan yang ditolak/tidak dapat dirutekan, dan
+        ConnectionError bila konfirmasi tidak lengkap dalam `timeout` detik (channel harus dibuang).
+        """
+        self._nacked, self._returned = [], []
+        with observe("rabbitmq", "publish_batch"):
+            for body in bodies:
+                self._impl.basic_publish(exchange='', routing_key=routing_key, body=body, properties=properties, mandatory=True)
+                self._last_tag += 1
+                self._unconfirmed.add(self._last_tag)
+            deadline = time.monotonic() + timeout
+            self.channel._flush_output(lambda: not self._unconfirmed or time.monotonic() > deadline)
+        if self._unconfirmed:
+            raise ConnectionError(f"RabbitMQ: {len(self._unconfirmed)} message(s) not confirmed within {timeout}s")
+        if self._nacked:
+            logger.warning(f"RabbitMQ: {len(self._nacked)}/{len(bodies)} message(s) nacked by broker on '{routing_key}'")
+            raise pika.exceptions.NackError(self._returned)
+        if self._returned:
+            raise pika.exceptions.UnroutableError(self._returned)
+
+    def close(self):
+        if self.channel.is_open:
+            self.channel.close()
+
+class _PooledChannel:
     """
-    try:
-        # Gunakan context manager untuk koneksi yang aman
-        with RabbitMqConn() as channel:
-            # Deklarasi antrian yang andal (durable dan tidak auto-delete)
-            channel.queue_declare(queue=queue_name, durable=True, auto_delete=False)
+    Satu koneksi RabbitMQ yang dipakai ulang oleh publisher.
+    pika.BlockingConnection tidak thread-safe, jadi setiap item pool memiliki
+    koneksinya sendiri dan hanya dipakai oleh satu thread pada satu waktu.
+    """
+    def __init__(self):
+        self.conn = RabbitMqConn()
+        self.channel = self.conn.__enter__()
+        # Publisher confirms: basic_publish menunggu ack dari broker
+        self.channel.confirm_delivery()
+        self.batch_channel = None
+        self.declared_queues = set()
+        self.released_at = time.monotonic()
+
+    @property
+    def is_open(self):
+        return self.channel is not None and self.channel.is_open and self.conn.connection.is_open
+
+    def is_healthy(self) -> bool:
+        """
+        Dicek saat channel diambil dari pool. Selama menganggur di pool tidak ada yang memproses
+        heartbeat, sehingga koneksi yang menganggur lebih lama dari interval heartbeat kemungkinan
+        sudah ditutup broker dan langsung dibuang. Selain itu process_data_events(0) melayani
+        heartbeat/frame yang tertunda dan mendeteksi koneksi yang sudah putus sebelum dipakai publish.
+        """
+        if not self.is_open:
+            return False
+        if config.rabbitmq_heartbeat and time.monotonic() - self.released_at > config.rabbitmq_heartbeat:
+            return False
+        try:
+            self.conn.connection.process_data_events(0)
+        except Exception as e:
+            logger.warning(f"RabbitMQ: pooled connection is no longer usable: {e}")
+            return False
+        return self.is_open
+
+    def declare_queue(self, queue_name: str, arguments: Optional[dict] = None):
+        # Deklarasi cukup sekali per koneksi (hasilnya di-cache)
+        if queue_name not in self.declared_queues:
+            self.channel.queue_declare(queue=queue_name, durable=True, auto_delete=False, arguments=arguments)
+            self.declared_queues.add(queue_name)
+
+    def get_batch_channel(self) -> _BatchConfirmChannel:
+        """Channel publish batch: satu kali menunggu konfirmasi broker untuk banyak pesan."""
+        if self.batch_channel is None or not self.batch_channel.is_open:
+            self.batch_channel = _BatchConfirmChannel(self.conn.connection)
+        return self.batch_channel
+
+    def close(self):
+        try:
+            if self.batch_channel is not None:
+                self.batch_channel.close()
+            self.conn.close()
+        except Exception as e:
+            logger.warning(f"RabbitMQ: error while closing pooled channel: {e}")
+
+class RabbitMqPublisher:
+    """
+    Publisher jangka panjang dengan pool channel.
+
+    - Koneksi dan channel dibuat sekali lalu dipakai ulang (tidak connect/close per pesan).
+    - Deklarasi antrian di-cache per koneksi.
+    - publish() menunggu publisher confirm per pesan, publish_batch() mengirim seluruh batch
+      lalu menunggu konfirmasi broker sekali untuk semuanya.
+    - Koneksi yang putus (atau terlalu lama menganggur) dibuang dari pool dan dibuat ulang secara otomatis.
+    """
+    def __init__(self, pool_size: Optional[int] = None, max_retries: int = 3, retry_delay: float = 0.5,
+                 acquire_timeout: float = 30, confirm_timeout: float = 30):
+        self.pool_size = pool_size or config.rabbitmq_publisher_pool_size
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.acquire_timeout = acquire_timeout
+        self.confirm_timeout = confirm_timeout
+        self._pool = queue.LifoQueue(maxsize=self.pool_size)
+        self._created = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _acquire(self, timeout: Optional[float] = None) -> _PooledChannel:
+        """Raise queue.Empty bila pool penuh dan tidak ada channel yang dikembalikan dalam `timeout` detik."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                item = self._pool.get_nowait()
+            except queue.Empty:
+                item = None
+
+            if item is None:
+                with self._lock:
+                    can_create = self._created < self.pool_size
+                    if can_create:
+                        self._created += 1
+                if can_create:
+                    try:
+                        return _PooledChannel()
+                    except Exception:
+                        with self._lock:
+                            self._created -= 1
+                        raise
+                # Pool penuh: tunggu channel yang sedang dipakai thread lain
+                item = self._pool.get(timeout=None if deadline is None else max(0.0, deadline - time.monotonic()))
+
+            if item.is_healthy():
+                return item
+            self._discard(item)
+
+    def _release(self, item: _PooledChannel):
+        if self._closed or not item.is_open:
+            self._discard(item)
+            return
+        item.released_at = time.monotonic()
+        self._pool.put_nowait(item)
 
-            message_body = json.dumps(task_data)
+    def _discard(self, item: _PooledChannel):
+        item.close()
+        with self._lock:
+            self._created -= 1
 
-            # Mengaktifkan konfirmasi pengiriman (Publisher Confirms)
-            channel.confirm_delivery()
+    def _run(self, fn):
+        """Menjalankan fn(item) dengan channel dari pool, reconnect bila koneksi putus."""
+        last_error = None
+        for attempt in range(1, self.max_retries + 1):
+            item = None
+            try:
+                item = self._acquire(timeout=self.acquire_timeout)
+                result = fn(item)
+            except queue.Empty:
+                raise ConnectionError(f"Failed to publish to RabbitMQ: no pooled channel available within {self.acquire_timeout}s")
+            except RECONNECT_ERRORS as e:
+                last_error = e
+                logger.warning(f"RabbitMQ: connection lost while publishing (attempt {attempt}/{self.max_retries}): {e}")
+                if item is not None:
+                    self._discard(item)
+                time.sleep(self.retry_delay * attempt)
+                continue
+            except Exception:
+                if item is not None:
+                    self._release(item)
+                raise
+            self._release(item)
+            return result
+        raise ConnectionError(f"Failed to publish to RabbitMQ after {self.max_retries} attempts: {last_error}")
 
-            # Kirim pesan dengan mode persistent
-            channel.basic_publish(
+    @staticmethod
+    def _properties(headers: Optional[dict] = None):
+        return pika.BasicProperties(
+            content_type='application/json',
+            delivery_mode=pika.DeliveryMode.Persistent, # Pesan tidak akan hilang jika RabbitMQ restart
+            headers=headers
+        )
+
+    def publish(self, queue_name: str, task_data: dict, headers: Optional[dict] = None, queue_arguments: Optional[dict] = None):
+        """
+        Mengirim satu pesan dan menunggu konfirmasi broker.
+        Raise pika.exceptions.UnroutableError jika pesan tidak dapat dirutekan.
+        """
+        message_body = json.dumps(task_data)
+
+        def _publish(item: _PooledChannel):
+            item.declare_queue(queue_name, queue_arguments)
+            item.channel.basic_publish(
                 exchange='',
                 routing_key=queue_name,
                 body=message_body,
-                properties=pika.BasicProperties(
-                    content_type='application/json',
-                    delivery_mode=pika.DeliveryMode.Persistent # Pesan tidak akan hilang jika RabbitMQ restart
-                ),
+                properties=self._properties(headers),
                 mandatory=True
             )
-            logger.info(f"Pesan berhasil dikirim ke antrian '{queue_name}'")
 
+        with producer_span(f"{queue_name} publish", **{"messaging.system": "rabbitmq", "messaging.destination.name": queue_name}):
+            # Trace context dikirim di header AMQP (traceparent) untuk span consumer
+            headers = inject_context(headers)
+            self._run(_publish)
+        logger.debug("Pesan berhasil dikirim ke antrian '%s'", queue_name)
+
+    def publish_batch(self, queue_name: str, tasks: List[dict], headers: Optional[dict] = None):
+        """
+        Mengirim banyak pesan sekaligus dengan publisher confirms: seluruh pesan dikirim (mandatory)
+        lalu konfirmasi broker ditunggu sekali per batch. Bila koneksi putus di tengah batch, seluruh
+        batch dikirim ulang (at-least-once), jadi consumer harus idempotent.
+        Raise pika.exceptions.UnroutableError / NackError bila ada pesan yang tidak dapat dirutekan / ditolak.
+        """
+        if not tasks:
+            return 0
+        bodies = [json.dumps(task) for task in tasks]
+
+        def _publish(item: _PooledChannel):
+            item.declare_queue(queue_name)
+            item.get_batch_channel().publish(queue_name, bodies, self._properties(headers), self.confirm_timeout)
+
+        with producer_span(f"{queue_name} publish", **{"messaging.system": "rabbitmq", "messaging.destination.name": queue_name, "messaging.batch.message_count": len(bodies)}):
+            headers = inject_context(headers)
+            self._run(_publish)
+        logger.debug("%s pesan berhasil dikirim ke antrian '%s'", len(bodies), queue_name)
+        return len(bodies)
+
+    def close(self):
+        """Menutup seluruh koneksi di pool. Dipanggil saat aplikasi shutdown."""
+        self._closed = True
+        while True:
+            try:
+                item = self._pool.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(item)
+        logger.info("RabbitMQ publisher pool closed.")
+
+_publisher: Optional[RabbitMqPublisher] = None
+_publisher_lock = threading.Lock()
+
+def get_publisher() -> RabbitMqPublisher:
+    """Mengembalikan publisher global (dibuat sekali per proses)."""
+    global _publisher
+    if _publisher is None:
+        with _publisher_lock:
+            if _publisher is None:
+                _publisher = RabbitMqPublisher()
+    return _publisher
+
+def close_publisher():
+    global _publisher
+    with _publisher_lock:
+        if _publisher is not None:
+            _publisher.close()
+            _publisher = None
+
+def publish_message(queue_name: str, task_data: dict, headers: Optional[dict] = None) -> bool:
+    """
+    Mengirim satu pesan ke antrian melalui publisher global yang persisten.
+
+    Args:
+        queue_name (str): Nama antrian tujuan.
+        task_data (dict): Data tugas yang akan dikirim.
+        headers (dict): Header AMQP tambahan (opsional).
+
+    Returns:
+        bool: True jika pesan dikonfirmasi broker.
+    """
+    try:
+        get_publisher().publish(queue_name, task_data, headers=headers)
+        logger.info(f"Pesan berhasil dikirim ke antrian '{queue_name}'")
+        return True
     except pika.exceptions.UnroutableError:
         logger.error("Pesan tidak dapat dirutekan. Antrian mungkin tidak ada.")
     except Exception as e:
         logger.error(f"Gagal mengirim pesan ke RabbitMQ: {e}")
+    return False
+
+def publish_batch(queue_name: str, tasks: List[dict], headers: Optional[dict] = None) -> int:
+    """Mengirim banyak pesan ke antrian dengan satu kali konfirmasi broker. Return jumlah pesan terkirim."""
+    try:
+        return get_publisher().publish_batch(queue_name, tasks, headers=headers)
+    except Exception as e:
+        logger.error(f"Gagal mengirim batch ke RabbitMQ: {e}")
+        return 0
+
+def publish_webhook_event(event_type: str, event_data: Any, org_id: str) -> bool:
+    """
+    Mengirim event ke antrian 'webhook_tasks'. event_id dan created_at ditetapkan di sini (saat publish),
+    sehingga fan-out yang di-retry mengirim id yang sama ke receiver (X-Webhook-Id) untuk dedupe.
+    """
+    return publish_message(queue_name="webhook_tasks", task_data={
+        "event_id": generate_uuid(),
+        "event_type": event_type,
+        "event_data": event_data,
+        "org_id": org_id,
+        "created_at": datetime.now(timezone.utc).isoformat()
+    })
 
 
 if __name__ == "__main__":
     # Contoh penggunaan fungsi publisher
-    
-    # Data yang akan dikirim
-    objData = {
-        "event_type": "payment.succeeded",
-        "event_data": {"payment_id": "pay_12345", "amount": 50000},
-        "org_id": "org_abcde"
-    }
-
-    # Mengirim pesan ke antrian 'webhook_tasks'
-    publish_message(queue_name="webhook_tasks", task_data=objData)
\ No newline at end of file
+
+    # Mengirim event ke antrian 'webhook_tasks'
+    publish_webhook_event("payment.succeeded", {"payment_id": "pay_12345", "amount": 50000}, "org_abcde")
+    close_publisher()
@@ -1,18 +1,22 @@
 import argparse
 import time
-import logging.config
 from baseapp.config.redis import RedisConn
 from baseapp.services.redis_queue import RedisQueueManager
+from baseapp.config import setting
+from baseapp.utils.metrics import start_metrics_server
+from baseapp.utils.tracing import setup_tracing
 
 # Importing the worker classes
 from baseapp.services._redis_worker.email_worker import EmailWorker
 from baseapp.services._redis_worker.delete_file_worker import DeleteFileWorker
 
-import logging.config
-logging.config.fileConfig('logging.conf')
+from baseapp.config.log import setup_logging
+setup_logging()
 from logging import getLogger
 logger = getLogger("rabbit")
 
+config = setting.get_settings()
+
 WORKER_MAP = {
     "otp_tasks": EmailWorker,
     "minio_delete_file_tasks": DeleteFileWorker
@@ -28,6 +32,12 @@ if __name__ == "__main__":
         choices=WORKER_MAP.keys(),
         help="Nama antrian yang akan di-consume."
     )
+    parser.add_argument(
+        '--metrics-port',
+        type=int,
+        default=config.metrics_worker_port,
+        help="Port HTTP untuk metric Prometheus worker ini (default: METRICS_WORKER_PORT, 0 = nonaktif)."
+    )
     args = parser.parse_args()
     queue_name = args.queue
 
@@ -39,6 +49,8 @@ if __name__ == "__main__":
 
     logger.info(f"Starting {WorkerClass.__name__} for queue: '{queue_name}'...")
     
+    start_metrics_server(args.metrics_port)
+    setup_tracing(service_name=f"{config.otel_service_name}-worker-{queue_name}")
     redis_conn = RedisConn()
     queue_manager = RedisQueueManager(redis_conn=redis_conn,queue_name=queue_name)
     worker = WorkerClass(queue_manager)
@@ -1,5 +1,6 @@
 import json
 from baseapp.config.redis import RedisConn
+from baseapp.utils.tracing import TRACE_CONTEXT_KEY, inject_context, producer_span
 
 import logging
 logger = logging.getLogger("rabbit")
@@ -13,9 +14,12 @@ class RedisQueueManager:
         """
         Push a task to the Redis queue.
         """
-        with self.redis_conn as conn:
-            conn.lpush(self.queue_name, json.dumps(data))
-            logger.info(f"Task added to queue: {data}")
+        with producer_span(f"{self.queue_name} enqueue", **{"messaging.system": "redis", "messaging.destination.name": self.queue_name}):
+            # Trace context ikut di payload agar span worker tersambung ke request asal
+            payload = dict(data, **{TRACE_CONTEXT_KEY: inject_context()})
+            with self.redis_conn as conn:
+                conn.lpush(self.queue_name, json.dumps(payload))
+                logger.info(f"Task added to queue: {data}")
 
     def dequeue_task(self):
         """
@@ -0,0 +1,31 @@
+import importlib, threading
+
+# Nama service -> (module, class). Instance dibuat sekali per proses saat pertama kali diminta,
+# sehingga router dan service lain memakai objek service layer yang sama tanpa HTTP loopback.
+SERVICES = {
+    "_organization": ("baseapp.services._org.crud", "CRUD"),
+    "_user": ("baseapp.services._user.crud", "CRUD"),
+}
+
+_instances = {}
+_lock = threading.Lock()
+
+def get_service(name: str):
+    """Mengembalikan instance service layer bersama untuk `name`."""
+    instance = _instances.get(name)
+    if instance is not None:
+        return instance
+    if name not in SERVICES:
+        raise ValueError(f"Service '{name}' is not registered")
+    with _lock:
+        instance = _instances.get(name)
+        if instance is None:
+            module_name, class_name = SERVICES[name]
+            instance = getattr(importlib.import_module(module_name), class_name)()
+            _instances[name] = instance
+    return instance
+
+def register_service(name: str, instance):
+    """Mendaftarkan (atau mengganti) instance service secara eksplisit."""
+    with _lock:
+        _instances[name] = instance
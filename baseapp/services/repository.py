@@ -0,0 +1,196 @@
+import asyncio, logging
+
+from functools import cached_property
+from pymongo.errors import PyMongoError
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
+from typing import Optional, Dict, Any, Callable, List
+from datetime import datetime, timezone
+
+from baseapp.config import mongodb
+from baseapp.services.crud_context import ContextAwareCRUD
+from baseapp.utils.filters import FilterCompiler
+
+logger = logging.getLogger(__name__)
+
+class BaseRepository(ContextAwareCRUD):
+    """
+    Base class service layer untuk satu collection: get_all, get_by_id, update_by_id dan update_status
+    beserta audit trail-nya. Subclass cukup mengisi atribut class dan, bila perlu, override hook:
+
+    - list_fields: field yang dikembalikan get_all (selain `id`)
+    - indexed_fields / residual_fields: field yang boleh difilter dan di-sort (lihat FilterCompiler);
+      samakan dengan index collection di data/files/initdata.json
+    - list_lookups(): stage $lookup/$addFields untuk get_all, dijalankan setelah $skip/$limit
+      sehingga hanya dokumen di halaman tersebut yang di-join
+    - _id_filter(): filter satu dokumen untuk baca/update (default {"_id": doc_id})
+    - _find_by_id(): cara membaca satu dokumen (default find_one)
+    - _invalidate(): membersihkan cache setelah dokumen berubah
+    """
+    collection_name: str = ""
+    entity_name: str = "Data"
+    list_fields: tuple = ()
+    indexed_fields: tuple = ()
+    residual_fields: tuple = ()
+
+    def list_lookups(self) -> List[dict]:
+        return []
+
+    @cached_property
+    def _list_tail(self) -> List[dict]:
+        # Stage join + projection get_all dibangun sekali per instance, bukan per request
+        projection = {"id": "$_id", **{field: 1 for field in self.list_fields}, "_id": 0}
+        return [*self.list_lookups(), {"$project": projection}]
+
+    @cached_property
+    def filter_compiler(self) -> FilterCompiler:
+        return FilterCompiler(self.indexed_fields, self.residual_fields)
+
+    def _collection(self, mongo):
+        return mongo.get_database()[self.collection_name]
+
+    def _audit(self, mongo, action: str, target_id, details=None, status: str = "success", error_message: Optional[str] = None):
+        """Satu-satunya titik penulisan audit trail untuk operasi repository."""
+        self.audit_trail.log_audittrail(
+            mongo,
+            action=action,
+            target=self.collection_name,
+            target_id=target_id,
+            details=details,
+            status=status,
+            error_message=error_message
+        )
+
+    def _invalidate(self, doc_id: str):
+        pass
+
+    def _id_filter(self, doc_id: str) -> dict:
+        return {"_id": doc_id}
+
+    def _find_by_id(self, mongo, doc_id: str):
+        return self._collection(mongo).find_one(self._id_filter(doc_id))
+
+    def get_by_id(self, doc_id: str):
+        """
+        Retrieve a document by ID.
+        """
+        not_found = f"{self.entity_name} not found"
+        with mongodb.MongoConn() as mongo:
+            try:
+                obj = self._find_by_id(mongo, doc_id)
+                if not obj:
+                    # write audit trail for fail
+                    self._audit(mongo, "retrieve", doc_id, {"_id": doc_id}, status="failure", error_message=not_found)
+                    raise ValueError(not_found)
+                # write audit trail for success
+                self._audit(mongo, "retrieve", doc_id, {"_id": doc_id, "retrieved": obj})
+                return obj
+            except PyMongoError as pme:
+                logger.error("Database error occurred: %s", pme)
+                # write audit trail for fail
+                self._audit(mongo, "retrieve", doc_id, {"_id": doc_id}, status="failure", error_message=str(pme))
+                raise ValueError("Database error occurred while find document.") from pme
+
+    def _update(self, doc_id: str, data, on_updated: Optional[Callable] = None):
+        """
+        $set hasil model_dump() `data` (ditambah mod_by/mod_date) ke dokumen `doc_id`.
+        `on_updated(mongo, doc_id, obj)` dijalankan setelah update berhasil, sebelum audit trail.
+        """
+        not_found = f"{self.entity_name} not found"
+        obj = data.model_dump()
+        obj["mod_by"] = self.user_id
+        obj["mod_date"] = datetime.now(timezone.utc)
+        with mongodb.MongoConn() as mongo:
+            try:
+                updated = self._collection(mongo).find_one_and_update(self._id_filter(doc_id), {"$set": obj}, return_document=ReturnDocument.AFTER)
+                if not updated:
+                    # write audit trail for fail
+                    self._audit(mongo, "update", doc_id, {"$set": obj}, status="failure", error_message=not_found)
+                    raise ValueError(not_found)
+                if on_updated:
+                    on_updated(mongo, doc_id, obj)
+                # write audit trail for success
+                self._audit(mongo, "update", doc_id, {"$set": obj})
+                self._invalidate(doc_id)
+                return updated
+            except PyMongoError as pme:
+                logger.error("Database error occurred: %s", pme)
+                # write audit trail for fail
+                self._audit(mongo, "update", doc_id, {"$set": obj}, status="failure", error_message=str(pme))
+                raise ValueError("Database error occurred while update document.") from pme
+
+    def update_by_id(self, doc_id: str, data):
+        """
+        Update a document's data by ID.
+        """
+        return self._update(doc_id, data)
+
+    def update_status(self, doc_id: str, data):
+        """
+        Update a document's data [status] by ID.
+        """
+        updated = self._update(doc_id, data)
+        logger.info("%s %s status updated.", self.entity_name, doc_id)
+        return updated
+
+    def _count(self, collection, query_filter: Dict[str, Any], skip: int, per_page: int, page_size: int) -> int:
+        # Halaman yang tidak penuh adalah halaman terakhir, total bisa dihitung tanpa count_documents
+        if 0 < page_size < per_page or (skip == 0 and page_size == 0):
+            return skip + page_size
+        return collection.count_documents(query_filter)
+
+    def get_all(self, filters: Optional[Dict[str, Any]] = None, page: int = 1, per_page: int = 10, sort_field: str = "_id", sort_order: str = "asc"):
+        """
+        Retrieve all documents from the collection with optional filters, pagination, and sorting.
+        """
+        query_filter = self.filter_compiler.compile(filters)
+        sort_field = self.filter_compiler.sort_field(sort_field)
+        skip = (page - 1) * per_page
+        order = ASCENDING if sort_order == "asc" else DESCENDING
+
+        # Aggregation pipeline
+        pipeline = [
+            {"$match": query_filter},  # Filter stage
+            {"$sort": {sort_field: order}},  # Sorting stage
+            {"$skip": skip},  # Pagination skip stage
+            {"$limit": per_page},  # Pagination limit stage
+            *self._list_tail  # Join + project only selected fields
+        ]
+
+        with mongodb.MongoConn() as mongo:
+            collection = self._collection(mongo)
+            try:
+                results = list(collection.aggregate(pipeline))
+                total_count = self._count(collection, query_filter, skip, per_page, len(results))
+
+                # write audit trail for success
+                self._audit(mongo, "retrieve", "agregate", {"aggregate": pipeline})
+
+                return {
+                    "data": results,
+                    "pagination": {
+                        "current_page": page,
+                        "items_per_page": per_page,
+                        "total_items": total_count,
+                        "total_pages": (total_count + per_page - 1) // per_page,  # Ceiling division
+                    },
+                }
+            except PyMongoError as pme:
+                logger.error("Error retrieving %s with filters and pagination: %s", self.collection_name, pme)
+                # write audit trail for fail
+                self._audit(mongo, "retrieve", "agregate", {"aggregate": pipeline}, status="failure", error_message=str(pme))
+                raise ValueError("Database error while retrieve document") from pme
+
+    # Mode async: operasi yang sama dijalankan di thread pool agar event loop tidak terblokir
+    # oleh pymongo. RequestContext ikut tersalin ke thread (asyncio.to_thread menyalin contextvars).
+
+    async def aget_all(self, *args, **kwargs):
+        return await asyncio.to_thread(self.get_all, *args, **kwargs)
+
+    async def aget_by_id(self, doc_id: str):
+        return await asyncio.to_thread(self.get_by_id, doc_id)
+
+    async def aupdate_by_id(self, doc_id: str, data):
+        return await asyncio.to_thread(self.update_by_id, doc_id, data)
+
+    async def aupdate_status(self, doc_id: str, data):
+        return await asyncio.to_thread(self.update_status, doc_id, data)
@@ -0,0 +1,191 @@
+import asyncio, functools, hashlib, inspect, logging
+from typing import Optional, Tuple
+
+from fastapi import Request, Response
+from redis.exceptions import WatchError
+
+from baseapp.config import setting
+from baseapp.config import mongodb
+from baseapp.config.redis import RedisConn
+from baseapp.model.common import ApiResponse
+from baseapp.services.audit_trail_service import AuditTrailService
+from baseapp.services.permission_check_service import PermissionChecker
+from baseapp.utils.request_context import set_request_context
+from baseapp.utils.response import MEDIA_JSON, RESPONSE_CLASSES, decode, dumps, negotiate
+
+config = setting.get_settings()
+logger = logging.getLogger(__name__)
+
+# Body ApiResponse yang sudah diserialisasi disimpan di Redis:
+# - response_cache:{hash}    -> hash {"etag", "body"} dengan TTL
+# - response_cache_tag:{tag} -> set key cache yang bergantung pada tag tersebut
+# - response_cache_gen:{tag} -> counter yang naik setiap tag di-invalidate; response yang dibangun
+#   dari data sebelum invalidasi tidak ditulis ke cache (lihat cache_response)
+CACHE_PREFIX = "response_cache:"
+TAG_PREFIX = "response_cache_tag:"
+GENERATION_PREFIX = "response_cache_gen:"
+# Semua entri ikut di-tag dengan ini: perubahan permission role membatalkan seluruh cache,
+# karena hasil cache hanya boleh dipakai oleh role yang sudah lolos cek permission
+PERMISSION_TAG = "_featureonrole"
+
+_redis = RedisConn()
+_permission_checker = PermissionChecker()
+_audit_trail = AuditTrailService()
+
+def _conn():
+    return _redis.get_connection()
+
+def _cache_key(request: Request, cu, per_token: bool) -> str:
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    if per_token:
+        scope = hashlib.sha1(cu.token.encode("utf-8")).hexdigest()
+    else:
+        roles = ",".join(sorted(getattr(cu, "roles", None) or []))
+        scope = f"{cu.org_id}|{getattr(cu, 'authority', '')}|{roles}"
+    raw = f"{request.method}|{request.url.path}?{query}|{scope}"
+    return CACHE_PREFIX + hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    return if_none_match.strip() == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]
+
+def _response(body: Optional[str], etag: str, request: Request) -> Response:
+    # Cache menyimpan representasi JSON; CBOR/MessagePack di-encode ulang dengan ETag sendiri
+    media = negotiate(request.headers.get("accept"))
+    if media != MEDIA_JSON:
+        etag = f'{etag[:-1]}-{media.rsplit("/", 1)[1]}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Accept"}
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    if media != MEDIA_JSON:
+        return RESPONSE_CLASSES[media](decode(body.encode("utf-8")), headers=headers)
+    return Response(content=body, media_type=MEDIA_JSON, headers=headers)
+
+def _serialize(result: ApiResponse) -> Tuple[str, str]:
+    body = dumps(result).decode("utf-8")
+    return body, f'"{hashlib.sha1(body.encode("utf-8")).hexdigest()}"'
+
+def _check_permission(cu, permission: Tuple[str, int]):
+    feature, required = permission
+    if not _permission_checker.has_permission(cu.roles, feature, required):
+        raise PermissionError("Access denied")
+
+def _audit_hit(cu, request: Request, target: str, etag: str):
+    # Cache hit melewati CRUD, jadi audit trail "retrieve" ditulis di sini
+    set_request_context(
+        user_id=cu.id,
+        org_id=cu.org_id,
+        ip_address=getattr(cu, "ip_address", None),
+        user_agent=getattr(cu, "user_agent", None)
+    )
+    with mongodb.MongoConn() as mongo:
+        _audit_trail.log_audittrail(
+            mongo,
+            action="retrieve",
+            target=target,
+            target_id="agregate",
+            details={"path": request.url.path, "query": str(request.query_params), "cache": etag}
+        )
+
+def invalidate_response_cache(*tags: str):
+    """Hapus semua response cache yang di-tag dengan salah satu `tags`. Dipanggil dari operasi tulis CRUD."""
+    if not config.response_cache_enabled:
+        return
+    try:
+        redis_conn = _conn()
+        for tag in tags:
+            tag_key = TAG_PREFIX + tag
+            redis_conn.incr(GENERATION_PREFIX + tag)
+            keys = redis_conn.smembers(tag_key)
+            redis_conn.delete(*keys, tag_key)
+    except Exception as e:
+        logger.warning(f"Unable to invalidate response cache {tags}: {e}")
+
+def cache_response(*tags: str, ttl: Optional[int] = None, per_token: bool = False,
+                   permission: Optional[Tuple[str, int]] = None, audit_target: Optional[str] = None,
+                   always_etag: bool = False):
+    """
+    Decorator route GET yang mengembalikan ApiResponse.
+    Response di-cache per route + query + (org, authority, roles) atau per token (per_token=True),
+    dikirim dengan ETag kuat, dan dijawab 304 bila If-None-Match cocok.
+    Handler harus menerima `cu` (CurrentUser/CurrentClient).
+
+    Cache hit tidak menjalankan handler, jadi:
+    - permission=(feature, bit): cek permission yang sama dengan handler, dijalankan sebelum cache dibaca
+    - audit_target: collection audit trail "retrieve" yang dicatat handler; dicatat juga saat cache hit
+
+    always_etag=True: ETag/304 tetap dikirim walaupun response cache dimatikan (handler selalu dijalankan).
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        params = list(signature.parameters.values())
+        request_param = next((p.name for p in params if p.annotation is Request), None)
+        inject_request = request_param is None
+        if inject_request:
+            request_param = "_cache_request"
+            params.append(inspect.Parameter(request_param, inspect.Parameter.KEYWORD_ONLY, annotation=Request))
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            request = kwargs.pop(request_param) if inject_request else kwargs[request_param]
+            if not config.response_cache_enabled:
+                result = await func(*args, **kwargs)
+                if always_etag and isinstance(result, ApiResponse):
+                    return _response(*_serialize(result), request)
+                return result
+
+            cu = kwargs["cu"]
+            if permission:
+                await asyncio.to_thread(_check_permission, cu, permission)
+
+            key = _cache_key(request, cu, per_token)
+            try:
+                etag, body = _conn().hmget(key, "etag", "body")
+            except Exception as e:
+                logger.warning(f"Response cache read failed: {e}")
+                etag, body = None, None
+            if etag and body is not None:
+                if audit_target:
+                    await asyncio.to_thread(_audit_hit, cu, request, audit_target, etag)
+                return _response(body, etag, request)
+
+            # Generation tag dibaca sebelum handler membaca database; bila ada invalidasi selama
+            # handler berjalan, hasilnya dikirim ke client tapi tidak ditulis ke cache
+            all_tags = tags + (PERMISSION_TAG,)
+            generation_keys = [GENERATION_PREFIX + tag for tag in all_tags]
+            try:
+                generations = _conn().mget(generation_keys)
+            except Exception as e:
+                logger.warning(f"Response cache read failed: {e}")
+                generations = None
+
+            result = await func(*args, **kwargs)
+            if not isinstance(result, ApiResponse):
+                return result
+            body, etag = _serialize(result)
+            expire = ttl or config.response_cache_ttl
+            if generations is None:
+                return _response(body, etag, request)
+            try:
+                with _conn().pipeline() as pipe:
+                    # WATCH + MULTI: invalidasi di antara pengecekan generation dan EXEC membatalkan penulisan
+                    pipe.watch(*generation_keys)
+                    if pipe.mget(generation_keys) == generations:
+                        pipe.multi()
+                        pipe.hset(key, mapping={"etag": etag, "body": body})
+                        pipe.expire(key, expire)
+                        for tag in all_tags:
+                            pipe.sadd(TAG_PREFIX + tag, key)
+                            pipe.expire(TAG_PREFIX + tag, max(expire, config.response_cache_ttl))
+                        pipe.execute()
+            except WatchError:
+                logger.debug("Response cache invalidated while building %s, not cached.", key)
+            except Exception as e:
+                logger.warning(f"Response cache write failed: {e}")
+            return _response(body, etag, request)
+
+        wrapper.__signature__ = signature.replace(parameters=params)
+        return wrapper
+    return decorator
@@ -1,15 +1,17 @@
-from fastapi import APIRouter
-import logging
+from fastapi import APIRouter, Request, Response
+import logging, time
+import httpx
 
 from baseapp.test_connection import crud as test
 from baseapp.model.common import ApiResponse
+from baseapp.utils.response import ApiRoute, ORJSONResponse, MEDIA_CBOR, MEDIA_JSON, MEDIA_MSGPACK, decode, encode, media_type_of
 
 from baseapp.config import setting
 
 config = setting.get_settings()
 logger = logging.getLogger()
 
-router = APIRouter(prefix="/v1/test", tags=["Test Connection"])
+router = APIRouter(prefix="/v1/test", tags=["Test Connection"], route_class=ApiRoute)
 
 @router.get("/database", response_model=ApiResponse)
 async def test_connection_to_database() -> ApiResponse:
@@ -34,4 +36,39 @@ async def test_connection_to_rabbit() -> ApiResponse:
 @router.get("/redis-worker")
 async def test_redis_worker() -> ApiResponse:
     resp = test.test_redis_worker()
-    return ApiResponse(status=0, message=resp)
\ No newline at end of file
+    return ApiResponse(status=0, message=resp)
+
+FORWARD_ENCODINGS = {"cbor": MEDIA_CBOR, "msgpack": MEDIA_MSGPACK}
+
+@router.api_route("/forward/{encoding}/{path:path}", methods=["GET", "POST", "PUT", "DELETE"])
+async def forward_encoded(encoding: str, path: str, request: Request) -> Response:
+    """
+    Uji negosiasi CBOR/MessagePack: body JSON di-encode ke `encoding`, diteruskan ke `/{path}` di proses yang sama
+    dengan Content-Type/Accept tersebut, lalu response-nya di-decode kembali ke JSON.
+    """
+    media = FORWARD_ENCODINGS.get(encoding)
+    if media is None:
+        raise ValueError(f"Unsupported encoding '{encoding}', use one of: {', '.join(FORWARD_ENCODINGS)}")
+
+    body = await request.body()
+    headers = {"accept": media}
+    if "authorization" in request.headers:
+        headers["authorization"] = request.headers["authorization"]
+    if body:
+        body = encode(decode(body), media)
+        headers["content-type"] = media
+
+    transport = httpx.ASGITransport(app=request.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://forward") as client:
+        start = time.perf_counter()
+        resp = await client.request(request.method, f"/{path}", params=request.query_params.multi_items(), content=body or None, headers=headers)
+        elapsed = time.perf_counter() - start
+
+    # Error bawaan FastAPI (mis. 422) tetap JSON, jadi decode sesuai Content-Type response
+    resp_media = media_type_of(resp.headers.get("content-type")) or MEDIA_JSON
+    content = decode(resp.content, resp_media) if resp.content else None
+    return ORJSONResponse(content, status_code=resp.status_code, headers={
+        "X-Forward-Content-Type": resp.headers.get("content-type", ""),
+        "X-Forward-Content-Length": str(len(resp.content)),
+        "X-Forward-Time": f"{elapsed:.6f}",
+    })
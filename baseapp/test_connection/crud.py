@@ -1,6 +1,7 @@
 import logging
 from baseapp.config import setting, redis, mongodb, minio
 from baseapp.services import publisher
+from baseapp.services._rabbitmq_worker._webhook_worker import PING_EVENT
 from baseapp.services.redis_queue import RedisQueueManager
 
 config = setting.get_settings()
@@ -39,11 +40,13 @@ def test_connection_to_minio():
 def test_connection_to_rabbit():
     logger.info("RabbitMQ test connection")
     try:
+        # Event ping di-ack oleh webhook worker tanpa fan-out (tidak masuk webhook_tasks.dead)
         objData = {
-            "name": "rabbitmq",
-            "message": "Hello RabbitMQ!"
+            "event_type": PING_EVENT,
+            "event_data": {"message": "Hello RabbitMQ!"}
         }
-        publisher.publish_message(queue_name="webhook_tasks", task_data=objData)
+        if not publisher.publish_message(queue_name="webhook_tasks", task_data=objData):
+            raise ConnectionError("RabbitMQ: message was not confirmed by the broker.")
         return "RabbitMQ: Connection successful. Queue 'webhook_tasks' declared."
     except Exception as e:
         logger.error(f"Failed to publish message to RabbitMQ: {e}")
@@ -52,8 +55,8 @@ def test_connection_to_rabbit():
 def test_redis_worker():
     logger.info("Redis worker test connection")
     try:
-        queue_manager = RedisQueueManager(queue_name="otp_tasks")
-        queue_manager.enqueue_task({"email": "aldian.mm.02@gmail.com", "otp": "123456", "subject":"Login with OTP", "body":f"Berikut kode OTP Anda: 123456"})
+        queue_manager = RedisQueueManager(redis_conn=redis.RedisConn(), queue_name="otp_tasks")
+        queue_manager.enqueue_task({"email": "aldian.mm.02@gmail.com", "template": "login_otp", "data": {"otp": "123456"}})
         return "Redis worker: Task enqueued successfully."
     except Exception as e:
         logger.error(f"Failed to publish message to Redis: {e}")
@@ -0,0 +1,85 @@
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional
+
+# Filter query untuk get_all: router membangun dict {field: nilai/operator},
+# FilterCompiler mengubahnya menjadi query MongoDB yang aman dan bisa memakai index.
+# Nilai biasa (str/int/bool) berarti exact match; pola regex dari client tidak pernah diteruskan apa adanya.
+
+class FilterError(ValueError):
+    """Filter/sort ditolak; ValueError sehingga dijawab 400 oleh middleware."""
+
+@dataclass(frozen=True, slots=True)
+class Exact:
+    value: Any
+
+@dataclass(frozen=True, slots=True)
+class Prefix:
+    """Diawali `value` (case-sensitive): regex ter-anchor `^...` yang bisa memakai index field."""
+    value: str
+
+@dataclass(frozen=True, slots=True)
+class In:
+    values: tuple
+
+    def __init__(self, values: Iterable[Any]):
+        object.__setattr__(self, "values", tuple(values))
+
+@dataclass(frozen=True, slots=True)
+class Range:
+    gte: Any = None
+    gt: Any = None
+    lte: Any = None
+    lt: Any = None
+
+_SCALARS = (str, int, float, bool)
+MAX_IN_VALUES = 100
+
+class FilterCompiler:
+    """
+    Filter per collection.
+    - indexed: field ber-index; boleh difilter dan di-sort
+    - residual: field tambahan yang hanya boleh difilter bersama minimal satu field ber-index
+      (mis. status), agar query tidak pernah menjadi collection scan
+    """
+    def __init__(self, indexed: Iterable[str], residual: Iterable[str] = ()):
+        self.indexed = frozenset(indexed) | {"_id"}
+        self.residual = frozenset(residual)
+
+    def compile(self, filters: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        query = {}
+        for field, value in (filters or {}).items():
+            if field not in self.indexed and field not in self.residual:
+                raise FilterError(f"Filtering on '{field}' is not allowed.")
+            if value is None:
+                continue
+            query[field] = self._compile_value(field, value)
+        if query and self.indexed.isdisjoint(query):
+            raise FilterError(f"Filter on {', '.join(sorted(query))} requires an indexed field ({', '.join(sorted(self.indexed))}).")
+        return query
+
+    def _compile_value(self, field: str, value: Any):
+        if isinstance(value, Exact):
+            value = value.value
+        if isinstance(value, _SCALARS):
+            return value
+        if isinstance(value, Prefix):
+            if not value.value:
+                raise FilterError(f"Prefix filter on '{field}' must not be empty.")
+            return {"$regex": f"^{re.escape(value.value)}"}
+        if isinstance(value, In):
+            if not 0 < len(value.values) <= MAX_IN_VALUES or not all(isinstance(v, _SCALARS) for v in value.values):
+                raise FilterError(f"Filter '{field}' expects 1-{MAX_IN_VALUES} plain values.")
+            return {"$in": list(value.values)}
+        if isinstance(value, Range):
+            bounds = {f"${op}": bound for op, bound in (("gte", value.gte), ("gt", value.gt), ("lte", value.lte), ("lt", value.lt)) if bound is not None}
+            if not bounds:
+                raise FilterError(f"Range filter on '{field}' needs at least one bound.")
+            return bounds
+        # dict/list mentah (mis. {"$where": ...}) tidak diterima dari router
+        raise FilterError(f"Unsupported filter value for '{field}'.")
+
+    def sort_field(self, field: str) -> str:
+        if field not in self.indexed:
+            raise FilterError(f"Sorting on '{field}' is not allowed.")
+        return field
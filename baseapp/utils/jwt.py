@@ -1,11 +1,13 @@
 from datetime import datetime, timedelta, timezone
-import logging
+import logging, threading, time
 from typing import Dict, Any, Optional, Union
 from fastapi import Depends, HTTPException, Request
 from fastapi.security import OAuth2PasswordBearer
 from jose import ExpiredSignatureError, JWTError, jwt
 
 from baseapp.utils.utility import generate_uuid
+from baseapp.utils.bloom import BloomFilter
+from baseapp.utils.cache import TTLCache
 from baseapp.model.common import CurrentUser, CurrentClient
 from baseapp.config.setting import get_settings
 from baseapp.config.redis import RedisConn
@@ -16,12 +18,137 @@ jwt_algorithm = config.jwt_algorithm
 jwt_access_expired_in = int(config.jwt_access_expired_in)
 jwt_refresh_expired_in = int(config.jwt_refresh_expired_in)
 
+# Backend JWT: "jose" (python-jose, default) atau "pyjwt" (PyJWT, lebih cepat untuk decode)
+if config.jwt_backend == "pyjwt":
+    import jwt as pyjwt
+
+    def _encode(claims: dict) -> str:
+        return pyjwt.encode(claims, jwt_secret_key, algorithm=jwt_algorithm)
+
+    def _decode(token: str) -> Dict[str, Any]:
+        # Exception PyJWT diterjemahkan ke exception python-jose agar pemanggil tidak berubah
+        try:
+            return pyjwt.decode(token, jwt_secret_key, algorithms=[jwt_algorithm], options={"verify_aud": False})
+        except pyjwt.ExpiredSignatureError as err:
+            raise ExpiredSignatureError(str(err)) from err
+        except pyjwt.InvalidTokenError as err:
+            raise JWTError(str(err)) from err
+else:
+    def _encode(claims: dict) -> str:
+        return jwt.encode(claims, jwt_secret_key, algorithm=jwt_algorithm)
+
+    def _decode(token: str) -> Dict[str, Any]:
+        return jwt.decode(token, jwt_secret_key, algorithms=[jwt_algorithm])
+
+# Cache access token terverifikasi -> (claims, actor). Entri berakhir tepat pada exp token.
+# Refresh token (tanpa jti, tidak bisa dicek ke deny list) tidak pernah di-cache.
+_token_cache = TTLCache(maxsize=config.jwt_token_cache_size, ttl=60)
+
+# Deny list access token:
+# - deny_list:{jti}      -> key dengan TTL sisa umur token (sumber kebenaran)
+# - deny_list:index      -> sorted set jti dengan score = exp, untuk membangun filter lokal
+# - deny_list:version    -> naik setiap ada pencabutan; worker membangun ulang filter bila berubah
+DENY_LIST_INDEX_KEY = "deny_list:index"
+DENY_LIST_VERSION_KEY = "deny_list:version"
+
+class DenyListFilter:
+    """
+    Bloom filter per proses berisi JTI yang dicabut.
+    Token yang tidak ada di filter pasti belum dicabut (tanpa I/O); hanya bila filter
+    menyatakan "mungkin" barulah Redis dicek. Filter disinkronkan dengan deny_list:version
+    paling sering sekali per sync_interval detik.
+    """
+    def __init__(self, capacity: int, error_rate: float, sync_interval: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self.filter = BloomFilter(capacity, error_rate)
+        self.version = None
+        self.synced_at = None
+        self.stale = True
+        self._lock = threading.Lock()
+
+    def _migrate(self, redis_conn):
+        """Sekali jalan: masukkan key deny_list:{jti} lama (sebelum ada index) ke deny_list:index."""
+        now = time.time()
+        for key in redis_conn.scan_iter(match="deny_list:*", count=500):
+            if key in (DENY_LIST_INDEX_KEY, DENY_LIST_VERSION_KEY):
+                continue
+            jti = key.split(":", 1)[1]
+            ttl = redis_conn.ttl(key)
+            if ttl and ttl > 0:
+                redis_conn.zadd(DENY_LIST_INDEX_KEY, {jti: now + ttl})
+        redis_conn.setnx(DENY_LIST_VERSION_KEY, 1)
+
+    def _rebuild(self, redis_conn, version):
+        now = time.time()
+        redis_conn.zremrangebyscore(DENY_LIST_INDEX_KEY, "-inf", now)
+        jtis = redis_conn.zrangebyscore(DENY_LIST_INDEX_KEY, now, "+inf")
+        bloom = BloomFilter(max(self.capacity, len(jtis) * 2), self.error_rate)
+        for jti in jtis:
+            bloom.add(jti)
+        self.filter = bloom
+        self.version = version
+
+    def sync(self):
+        now = time.monotonic()
+        if self.synced_at is not None and now - self.synced_at < self.sync_interval:
+            return
+        with self._lock:
+            if self.synced_at is not None and now - self.synced_at < self.sync_interval:
+                return
+            self.synced_at = now
+            try:
+                with RedisConn() as redis_conn:
+                    version = redis_conn.get(DENY_LIST_VERSION_KEY)
+                    if version is None:
+                        self._migrate(redis_conn)
+                        version = redis_conn.get(DENY_LIST_VERSION_KEY)
+                    if version != self.version or self.stale:
+                        self._rebuild(redis_conn, version)
+                self.stale = False
+            except Exception as e:
+                # Filter tidak bisa dipercaya: semua token dicek ke Redis sampai sinkron lagi
+                logging.warning(f"Unable to sync JWT deny list filter: {e}")
+                self.stale = True
+
+    def add(self, jti: str):
+        self.filter.add(jti)
+
+    def might_contain(self, jti: str) -> bool:
+        self.sync()
+        return self.stale or self.filter.might_contain(jti)
+
+_deny_list = DenyListFilter(
+    capacity=config.jwt_deny_list_capacity,
+    error_rate=config.jwt_deny_list_error_rate,
+    sync_interval=config.jwt_deny_list_sync_interval
+)
+
+def revoke_access_token(redis_conn, jti: str, exp: float):
+    """Memasukkan jti access token ke deny list sampai token tersebut kedaluwarsa."""
+    sisa_waktu_detik = exp - datetime.now(timezone.utc).timestamp()
+    if sisa_waktu_detik <= 0:
+        return
+    # Simpan jti ke Redis dengan TTL
+    redis_conn.setex(f"deny_list:{jti}", int(sisa_waktu_detik), "revoked")
+    redis_conn.zadd(DENY_LIST_INDEX_KEY, {jti: exp})
+    redis_conn.incr(DENY_LIST_VERSION_KEY)
+    _deny_list.add(jti)
+
+def is_token_revoked(jti: str) -> bool:
+    # Kasus umum (token tidak dicabut) selesai di filter lokal tanpa akses jaringan
+    if not _deny_list.might_contain(jti):
+        return False
+    with RedisConn() as redis_conn:
+        return bool(redis_conn.exists(f"deny_list:{jti}"))
+
 def create_access_token(data: dict, expire_in: int = 60) -> tuple:
     to_encode = data.copy()
     _expire_in = expire_in if expire_in else jwt_access_expired_in
     expire = datetime.now(timezone.utc) + timedelta(minutes=_expire_in)
     to_encode.update({"exp": expire, "jti": generate_uuid()})
-    token = jwt.encode(to_encode, jwt_secret_key, algorithm=jwt_algorithm)
+    token = _encode(to_encode)
     return token, _expire_in
 
 def create_refresh_token(data: dict, expire_in: int = 7) -> tuple:
@@ -29,11 +156,25 @@ def create_refresh_token(data: dict, expire_in: int = 7) -> tuple:
     _expire_in = expire_in if expire_in else jwt_refresh_expired_in
     expire = datetime.now(timezone.utc) + timedelta(days=_expire_in)
     to_encode.update({"exp": expire})
-    token = jwt.encode(to_encode, jwt_secret_key, algorithm=jwt_algorithm)
+    token = _encode(to_encode)
     return token, _expire_in
 
+def _decode_cached(token: str):
+    """Decode + verifikasi token, memakai cache bila access token yang sama sudah pernah diverifikasi."""
+    cached = _token_cache.get(token) if config.jwt_token_cache_size > 0 else None
+    if cached is not None:
+        return cached
+    claims = _decode(token)
+    entry = [claims, None]
+    exp = claims.get("exp")
+    if config.jwt_token_cache_size > 0 and exp and claims.get("jti"):
+        ttl = float(exp) - time.time()
+        if ttl > 0:
+            _token_cache.set(token, entry, ttl=ttl)
+    return entry
+
 def decode_jwt_token(token: str) -> Dict[str, Any]:
-    return jwt.decode(token, jwt_secret_key, algorithms=[jwt_algorithm])
+    return _decode_cached(token)[0]
 
 def credentials_exception(message: str):
     return HTTPException(
@@ -45,7 +186,7 @@ def credentials_exception(message: str):
 Actor = Union[CurrentUser, CurrentClient]
 def _get_current_user(ctx: Request, token: str = Depends(OAuth2PasswordBearer(tokenUrl="v1/auth/token"))) -> Actor:
     try:
-        credentials = decode_jwt_token(token)
+        entry = _decode_cached(token)
     
     except ExpiredSignatureError as err:
         error_message = f"_get_current_user - Log ID: , Error Code: 4, Error Message: {err=}, {type(err)=}"
@@ -57,38 +198,40 @@ def _get_current_user(ctx: Request, token: str = Depends(OAuth2PasswordBearer(to
         logging.error(error_message)
         raise credentials_exception(message="Could not validate credentials")
 
+    credentials = entry[0]
     jti = credentials.get("jti")
     if jti:
-        # Cek apakah JTI ada di dalam deny list Redis
-        with RedisConn() as redis_conn:
-            if redis_conn.exists(f"deny_list:{jti}"):
-                # Jika ada, berarti token sudah dicabut. Tolak akses.
-                raise credentials_exception(message="Token has been revoked")
-
-    if "authority" in credentials:
-        return CurrentUser(
-            id=credentials["id"],
-            name=credentials["sub"],
-            roles=credentials["roles"],
-            org_id=credentials["org_id"],
-            token=token,
-            authority=credentials["authority"],
-            features=credentials["features"],
-            bitws=credentials["bitws"],
-            log_id=ctx.state.log_id,
-            ip_address=ctx.client.host,
-            user_agent=ctx.headers.get("user-agent")
-        )
-    else:
-        return CurrentClient(
-            id=credentials["id"],
-            client_id=credentials["sub"],
-            org_id=credentials["org_id"],
-            token=token,
-            log_id=ctx.state.log_id,
-            ip_address=ctx.client.host,
-            user_agent=ctx.headers.get("user-agent")
-        )
+        # Cek apakah JTI ada di dalam deny list
+        if is_token_revoked(jti):
+            # Jika ada, berarti token sudah dicabut. Tolak akses.
+            raise credentials_exception(message="Token has been revoked")
+
+    # Actor dibangun (dan divalidasi pydantic) sekali per token, lalu hanya disalin
+    # dengan data request (tanpa validasi ulang)
+    if entry[1] is None:
+        if "authority" in credentials:
+            entry[1] = CurrentUser(
+                id=credentials["id"],
+                name=credentials["sub"],
+                roles=credentials["roles"],
+                org_id=credentials["org_id"],
+                token=token,
+                authority=credentials["authority"],
+                features=credentials["features"],
+                bitws=credentials["bitws"]
+            )
+        else:
+            entry[1] = CurrentClient(
+                id=credentials["id"],
+                client_id=credentials["sub"],
+                org_id=credentials["org_id"],
+                token=token
+            )
+    return entry[1].model_copy(update={
+        "log_id": ctx.state.log_id,
+        "ip_address": ctx.client.host,
+        "user_agent": ctx.headers.get("user-agent")
+    })
 
 def get_current_user(ctx: Request, token: str = Depends(OAuth2PasswordBearer(tokenUrl="v1/auth/token"))) -> Actor:
     return _get_current_user(ctx, token)
@@ -98,22 +241,80 @@ def get_current_user_optional(ctx: Request, token: Optional[str] = Depends(OAuth
         return None
     return _get_current_user(ctx, token)
 
+# Sesi refresh token:
+# - refresh_token:{user_id}:{session_id} -> refresh token (TTL = umur refresh token)
+# - refresh_sessions:{user_id}           -> sorted set session_id dengan score = waktu kedaluwarsa,
+#   sehingga operasi per user cukup O(jumlah sesi user tersebut), tanpa SCAN keyspace
+REFRESH_SESSIONS_MIGRATED_KEY = "refresh_sessions:migrated"
+
+def _refresh_token_key(user_id: str, session_id: str) -> str:
+    return f"refresh_token:{user_id}:{session_id}"
+
+def _refresh_sessions_key(user_id: str) -> str:
+    return f"refresh_sessions:{user_id}"
+
+def store_refresh_token(redis_conn, user_id: str, session_id: str, refresh_token: str, expire_in_days: int):
+    """Menyimpan refresh token satu sesi dan mencatatnya di index sesi user."""
+    ttl = timedelta(days=expire_in_days)
+    now = time.time()
+    index_key = _refresh_sessions_key(user_id)
+    pipe = redis_conn.pipeline()
+    pipe.set(_refresh_token_key(user_id, session_id), refresh_token, ex=ttl)
+    pipe.zadd(index_key, {session_id: now + ttl.total_seconds()})
+    pipe.zremrangebyscore(index_key, "-inf", now)
+    pipe.expire(index_key, ttl)
+    pipe.execute()
+
+def get_refresh_token(redis_conn, user_id: str, session_id: str) -> Optional[str]:
+    return redis_conn.get(_refresh_token_key(user_id, session_id))
+
+def list_refresh_sessions(redis_conn, user_id: str) -> list:
+    """Daftar sesi aktif user: [{"session_id", "expired_at"}]."""
+    now = time.time()
+    index_key = _refresh_sessions_key(user_id)
+    redis_conn.zremrangebyscore(index_key, "-inf", now)
+    return [
+        {"session_id": session_id, "expired_at": datetime.fromtimestamp(score, timezone.utc).isoformat()}
+        for session_id, score in redis_conn.zrangebyscore(index_key, now, "+inf", withscores=True)
+    ]
+
+def revoke_refresh_session(redis_conn, user_id: str, session_id: str):
+    pipe = redis_conn.pipeline()
+    pipe.delete(_refresh_token_key(user_id, session_id))
+    pipe.zrem(_refresh_sessions_key(user_id), session_id)
+    pipe.execute()
+
+def migrate_refresh_sessions(redis_conn) -> int:
+    """
+    Sekali jalan: daftarkan key refresh_token:{user_id}:{session_id} lama (sebelum ada index sesi)
+    ke refresh_sessions:{user_id}. Dijaga dengan flag di Redis agar hanya satu proses yang menjalankannya.
+    """
+    if not redis_conn.set(REFRESH_SESSIONS_MIGRATED_KEY, datetime.now(timezone.utc).isoformat(), nx=True):
+        return 0
+    migrated = 0
+    now = time.time()
+    for key in redis_conn.scan_iter(match="refresh_token:*", count=500):
+        parts = key.split(":")
+        if len(parts) != 3:
+            continue
+        ttl = redis_conn.ttl(key)
+        if ttl is None or ttl <= 0:
+            continue
+        index_key = _refresh_sessions_key(parts[1])
+        redis_conn.zadd(index_key, {parts[2]: now + ttl})
+        if redis_conn.ttl(index_key) < ttl:
+            redis_conn.expire(index_key, ttl)
+        migrated += 1
+    logging.info(f"{migrated} refresh token session(s) migrated to per-user index.")
+    return migrated
+
 def _perform_revoke_token(redis_conn, user_id: str):
-    """Mencari dan menghapus semua refresh token milik satu user."""
-    keys_to_delete = []
-    cursor = 0
-    pattern = f"refresh_token:{user_id}:*"
-    
-    while True:
-        cursor, keys = redis_conn.scan(cursor=cursor, match=pattern, count=100)
-        if keys:
-            keys_to_delete.extend(keys)
-        
-        if cursor == 0:
-            break
-    
+    """Menghapus semua refresh token milik satu user berdasarkan index sesinya."""
+    index_key = _refresh_sessions_key(user_id)
+    session_ids = redis_conn.zrange(index_key, 0, -1)
+    keys_to_delete = [_refresh_token_key(user_id, session_id) for session_id in session_ids]
+    redis_conn.delete(*keys_to_delete, index_key)
     if keys_to_delete:
-        redis_conn.delete(*keys_to_delete)
         logging.info(f"{len(keys_to_delete)} refresh token(s) for user {user_id} have been revoked.")
 
 def revoke_all_refresh_tokens(user_id: str, conn=None):
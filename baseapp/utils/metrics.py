@@ -0,0 +1,98 @@
+import os, time
+from contextlib import contextmanager
+from typing import Iterable, Optional
+
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, CONTENT_TYPE_LATEST, generate_latest, multiprocess, start_http_server
+
+# Metric Prometheus untuk API dan worker.
+# Bila PROMETHEUS_MULTIPROC_DIR di-set (beberapa proses uvicorn), nilai digabung oleh MultiProcessCollector.
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests per route template and status code",
+    ["method", "route", "status"]
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency per route template",
+    ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+HTTP_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "HTTP requests currently being served",
+    ["method"], multiprocess_mode="livesum"
+)
+BACKEND_CALL_DURATION = Histogram(
+    "backend_call_duration_seconds", "Latency of MongoDB/Redis/MinIO/RabbitMQ calls",
+    ["backend", "operation"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+)
+BACKEND_ERRORS = Counter(
+    "backend_errors_total", "Failed MongoDB/Redis/MinIO/RabbitMQ calls",
+    ["backend", "operation"]
+)
+POOL_IN_USE = Gauge(
+    "connection_pool_in_use", "Connections currently checked out of the pool",
+    ["backend"], multiprocess_mode="livesum"
+)
+POOL_MAX_SIZE = Gauge(
+    "connection_pool_max_size", "Maximum connections per pool",
+    ["backend"], multiprocess_mode="livemax"
+)
+
+@contextmanager
+def observe(backend: str, operation: str):
+    """Mengukur satu panggilan ke backend; exception dihitung sebagai error lalu diteruskan."""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        BACKEND_ERRORS.labels(backend, operation).inc()
+        raise
+    finally:
+        BACKEND_CALL_DURATION.labels(backend, operation).observe(time.perf_counter() - start)
+
+class InstrumentedClient:
+    """
+    Proxy client driver (MinIO, channel pika) yang mengukur setiap pemanggilan method publik.
+    `operations` membatasi method yang diukur; None berarti semua method publik.
+    """
+    def __init__(self, client, backend: str, operations: Optional[Iterable[str]] = None):
+        self._client = client
+        self._backend = backend
+        self._operations = set(operations) if operations is not None else None
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+        if self._operations is not None and name not in self._operations:
+            return attr
+
+        def instrumented(*args, **kwargs):
+            with observe(self._backend, name):
+                return attr(*args, **kwargs)
+        return instrumented
+
+    @property
+    def client(self):
+        """Objek driver asli."""
+        return self._client
+
+def metrics_registry(*collectors) -> CollectorRegistry:
+    """Registry untuk endpoint /metrics; gabungan semua proses bila PROMETHEUS_MULTIPROC_DIR di-set."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    for collector in collectors:
+        registry.register(collector)
+    return registry
+
+def render_metrics(registry: CollectorRegistry):
+    """Return: (body, content type) format teks Prometheus."""
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+def start_metrics_server(port: int):
+    """Expose /metrics dari proses worker (consumer, redis_manager) pada `port`; 0 = nonaktif."""
+    if port:
+        start_http_server(port)
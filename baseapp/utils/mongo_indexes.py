@@ -0,0 +1,75 @@
+import logging
+from typing import Any, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Index collection dideklarasikan di data/files/initdata.json ("index" per collection):
+# - "field"                                  -> index tunggal field_1
+# - {"nama": ["a", "b"]}                     -> compound index ascending
+# - {"nama": {"keys": {...}, <opsi>: ...}}   -> spesifikasi lengkap, mis. text index dengan weights
+
+def index_specs(collection_config: Dict[str, Any]) -> List[Tuple[list, dict]]:
+    """Daftar (keys, options) untuk create_index dari konfigurasi satu collection."""
+    specs = []
+    for idx in collection_config.get("index", []):
+        if isinstance(idx, str):
+            specs.append(([(idx, 1)], {}))
+        elif isinstance(idx, dict):
+            for index_name, fields in idx.items():
+                if isinstance(fields, dict):
+                    options = {k: v for k, v in fields.items() if k != "keys"}
+                    specs.append((list(fields["keys"].items()), {"name": index_name, **options}))
+                else:
+                    specs.append(([(field, 1) for field in fields], {"name": index_name}))
+    return specs
+
+def index_name(keys: list, options: dict) -> str:
+    """Nama index; sama dengan nama default MongoDB bila tidak diberikan."""
+    return options.get("name") or "_".join(f"{field}_{direction}" for field, direction in keys)
+
+def _direction(value):
+    return value if isinstance(value, str) else int(value)
+
+def _signature(keys: list, options: dict):
+    """Bentuk pembanding spesifikasi index, sama untuk initdata.json dan index_information()."""
+    text_fields = [field for field, direction in keys if direction == "text"]
+    prefix = [(field, _direction(direction)) for field, direction in keys if direction != "text"]
+    if not text_fields:
+        return (tuple(prefix), None, None)
+    weights = options.get("weights", {})
+    return (tuple(prefix), {field: int(weights.get(field, 1)) for field in text_fields}, options.get("default_language", "english"))
+
+def _existing_signature(info: dict):
+    if "weights" not in info:
+        return (tuple((field, _direction(direction)) for field, direction in info["key"]), None, None)
+    prefix = tuple((field, _direction(direction)) for field, direction in info["key"] if field not in ("_fts", "_ftsx"))
+    weights = {field: int(weight) for field, weight in info["weights"].items()}
+    return (prefix, weights, info.get("default_language", "english"))
+
+def ensure_indexes(db, config_json: Dict[str, Any]) -> int:
+    """
+    Menyamakan index database (juga database yang sudah berjalan sebelum index ditambahkan) dengan
+    initdata.json: index yang belum ada dibuat, index dengan nama sama tetapi key/weights berbeda
+    di-drop lalu dibuat ulang. MongoDB hanya mengizinkan satu text index per collection, jadi text index
+    lama dengan nama lain juga di-drop. Idempotent; return jumlah index yang dibuat.
+    """
+    created = 0
+    for collection_name, collection_config in config_json.items():
+        collection = db[collection_name]
+        existing = collection.index_information()
+        for keys, options in index_specs(collection_config):
+            name = index_name(keys, options)
+            signature = _signature(keys, options)
+            if name in existing and _existing_signature(existing[name]) == signature:
+                continue
+            stale = [other for other, info in existing.items()
+                     if other == name or (signature[1] is not None and "weights" in info)]
+            for other in stale:
+                collection.drop_index(other)
+                del existing[other]
+                logger.warning(f"Dropped index {other} on {collection_name}, definition changed")
+            collection.create_index(keys, **{**options, "name": name})
+            existing[name] = collection.index_information()[name]
+            logger.info(f"Created index {name} on {collection_name}")
+            created += 1
+    return created
@@ -0,0 +1,48 @@
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+# Konteks pengguna untuk request yang sedang berjalan.
+# ContextVar terisolasi per task asyncio dan ikut tersalin ke threadpool (run_in_threadpool),
+# sehingga instance CRUD bersama tidak perlu menyimpan state per request.
+
+@dataclass(frozen=True, slots=True)
+class RequestContext:
+    user_id: Optional[str] = None
+    org_id: Optional[str] = None
+    authority: Optional[int] = None
+    roles: Tuple[str, ...] = ()
+    ip_address: Optional[str] = None
+    user_agent: Optional[str] = None
+
+_EMPTY_CONTEXT = RequestContext()
+_request_context: ContextVar[RequestContext] = ContextVar("request_context", default=_EMPTY_CONTEXT)
+
+def get_request_context() -> RequestContext:
+    """Konteks request saat ini; konteks kosong bila dipanggil di luar request (mis. worker)."""
+    return _request_context.get()
+
+def set_request_context(user_id: Optional[str] = None, org_id: Optional[str] = None, authority: Optional[int] = None,
+                        roles: Optional[list] = None, ip_address: Optional[str] = None, user_agent: Optional[str] = None) -> Token:
+    """Mengganti konteks untuk request (task/thread) saat ini saja."""
+    return _request_context.set(RequestContext(
+        user_id=user_id,
+        org_id=org_id,
+        authority=authority,
+        roles=tuple(roles or ()),
+        ip_address=ip_address,
+        user_agent=user_agent
+    ))
+
+def reset_request_context(token: Token):
+    _request_context.reset(token)
+
+@contextmanager
+def request_context(**fields):
+    """Konteks sementara untuk kode di luar request HTTP (worker, script)."""
+    token = set_request_context(**fields)
+    try:
+        yield get_request_context()
+    finally:
+        reset_request_context(token)
@@ -0,0 +1,199 @@
+import functools, inspect
+from contextvars import ContextVar
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Any, Callable, Optional
+
+import cbor2, msgpack, orjson
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+from pydantic_core import PydanticSerializationError
+
+MEDIA_JSON = "application/json"
+MEDIA_CBOR = "application/cbor"
+MEDIA_MSGPACK = "application/msgpack"
+_MEDIA_TYPES = {
+    "application/json": MEDIA_JSON,
+    "application/cbor": MEDIA_CBOR,
+    "application/msgpack": MEDIA_MSGPACK,
+    "application/x-msgpack": MEDIA_MSGPACK,
+    "application/vnd.msgpack": MEDIA_MSGPACK,
+}
+
+# Media type response hasil negosiasi Accept untuk request yang sedang berjalan (di-set oleh ApiRoute)
+_response_media: ContextVar[str] = ContextVar("response_media", default=MEDIA_JSON)
+
+def _default(obj):
+    # Tipe yang tidak dikenal orjson (ObjectId, Decimal, bytes dari MongoDB/MinIO)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, bytes):
+        return obj.decode("utf-8", errors="replace")
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    return str(obj)
+
+def _cbor_default(encoder, obj):
+    encoder.encode(_default(obj))
+
+def dumps(content: Any) -> bytes:
+    """Serialisasi JSON cepat untuk ApiResponse maupun dict/list biasa."""
+    if isinstance(content, BaseModel):
+        try:
+            return content.__pydantic_serializer__.to_json(content)
+        except PydanticSerializationError:
+            # data: Any berisi tipe non-JSON (mis. ObjectId)
+            content = content.model_dump()
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+def encode(content: Any, media: str = MEDIA_JSON) -> bytes:
+    """Serialisasi content ke JSON, CBOR atau MessagePack. Struktur data sama dengan representasi JSON."""
+    if media == MEDIA_JSON:
+        return dumps(content)
+    if isinstance(content, BaseModel):
+        try:
+            content = content.model_dump(mode="json")
+        except PydanticSerializationError:
+            content = content.model_dump()
+    if media == MEDIA_CBOR:
+        return cbor2.dumps(content, default=_cbor_default, timezone=timezone.utc)
+    return msgpack.packb(content, default=_default)
+
+def decode(body: bytes, media: str = MEDIA_JSON) -> Any:
+    if media == MEDIA_CBOR:
+        return cbor2.loads(body)
+    if media == MEDIA_MSGPACK:
+        return msgpack.unpackb(body, raw=False)
+    return orjson.loads(body)
+
+def media_type_of(content_type: Optional[str]) -> Optional[str]:
+    """Media type yang didukung dari header Content-Type, atau None."""
+    if not content_type:
+        return None
+    return _MEDIA_TYPES.get(content_type.split(";", 1)[0].strip().lower())
+
+def negotiate(accept: Optional[str]) -> str:
+    """Pilih media type response dari header Accept (memperhatikan q-value). Default JSON."""
+    if not accept:
+        return MEDIA_JSON
+    best, best_q = MEDIA_JSON, 0.0
+    for part in accept.split(","):
+        media, _, params = part.partition(";")
+        media = media_type_of(media)
+        if media is None:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q > best_q:
+            best, best_q = media, q
+    return best
+
+class ORJSONResponse(JSONResponse):
+    """Default response class: orjson, dan model pydantic diserialisasi langsung tanpa jsonable_encoder."""
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+class CBORResponse(Response):
+    media_type = MEDIA_CBOR
+
+    def render(self, content: Any) -> bytes:
+        return encode(content, MEDIA_CBOR)
+
+class MsgPackResponse(Response):
+    media_type = MEDIA_MSGPACK
+
+    def render(self, content: Any) -> bytes:
+        return encode(content, MEDIA_MSGPACK)
+
+RESPONSE_CLASSES = {MEDIA_JSON: ORJSONResponse, MEDIA_CBOR: CBORResponse, MEDIA_MSGPACK: MsgPackResponse}
+
+def response_class_for(accept: Optional[str]):
+    """Response class sesuai header Accept, untuk response yang dibuat di luar ApiRoute (mis. exception handler)."""
+    return RESPONSE_CLASSES[negotiate(accept)]
+
+async def _decoded_request(request: Request, media: str) -> Request:
+    """Request dengan body CBOR/MessagePack yang sudah di-decode, terlihat sebagai JSON oleh FastAPI."""
+    body = await request.body()
+    scope = dict(request.scope)
+    scope["headers"] = [(k, v) for k, v in request.scope["headers"] if k != b"content-type"]
+    scope["headers"].append((b"content-type", MEDIA_JSON.encode("latin-1")))
+    decoded = Request(scope, request.receive)
+    decoded._body = body
+    if body:
+        try:
+            decoded._json = decode(body, media)
+        except Exception as e:
+            raise ValueError(f"Invalid {media} request body") from e
+    return decoded
+
+def _sub_response_param(signature: inspect.Signature):
+    return next((p.name for p in signature.parameters.values() if p.annotation is Response), None)
+
+def _fast_endpoint(endpoint: Callable, status_code) -> Callable:
+    """
+    Bungkus endpoint supaya ApiResponse (BaseModel) langsung dirender dengan response class hasil negosiasi Accept.
+    FastAPI tidak lagi melakukan model_dump -> validate -> serialize -> json.dumps untuk response_model.
+    Header/cookie/status yang di-set pada parameter `response: Response` tetap diteruskan.
+    """
+    sub_response = _sub_response_param(inspect.signature(endpoint))
+
+    def render(result, kwargs):
+        if not isinstance(result, BaseModel):
+            return result
+        response = RESPONSE_CLASSES[_response_media.get()](result, status_code=status_code or 200)
+        if sub_response and kwargs.get(sub_response) is not None:
+            sub = kwargs[sub_response]
+            response.raw_headers.extend((k, v) for k, v in sub.raw_headers if k != b"content-length")
+            if sub.status_code:
+                response.status_code = sub.status_code
+        return response
+
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            return render(await endpoint(*args, **kwargs), kwargs)
+    else:
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            return render(endpoint(*args, **kwargs), kwargs)
+    return wrapper
+
+class ApiRoute(APIRoute):
+    """
+    Route class untuk router yang mengembalikan ApiResponse; dipasang via APIRouter(route_class=ApiRoute).
+    Body request CBOR/MessagePack (Content-Type) di-decode, dan response di-encode sesuai header Accept.
+    """
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        if not getattr(endpoint, "__fast_endpoint__", False):
+            endpoint = _fast_endpoint(endpoint, kwargs.get("status_code"))
+            endpoint.__fast_endpoint__ = True
+        super().__init__(path, endpoint, **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            media = media_type_of(request.headers.get("content-type"))
+            if media in (MEDIA_CBOR, MEDIA_MSGPACK):
+                request = await _decoded_request(request, media)
+            token = _response_media.set(negotiate(request.headers.get("accept")))
+            try:
+                response = await handler(request)
+            finally:
+                _response_media.reset(token)
+            response.headers.append("Vary", "Accept")
+            return response
+
+        return route_handler
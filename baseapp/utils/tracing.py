@@ -0,0 +1,100 @@
+import functools, inspect, logging
+from contextlib import contextmanager
+from typing import Optional
+
+from opentelemetry import propagate, trace
+from opentelemetry.trace import SpanKind
+
+from baseapp.config import setting
+
+config = setting.get_settings()
+logger = logging.getLogger(__name__)
+
+# Key di payload Redis queue yang membawa trace context (W3C traceparent/tracestate);
+# pesan RabbitMQ membawanya di header AMQP
+TRACE_CONTEXT_KEY = "_trace_context"
+
+# Tanpa setup_tracing() tracer ini no-op (API OpenTelemetry tanpa SDK)
+tracer = trace.get_tracer("baseapp")
+
+def setup_tracing(service_name: Optional[str] = None, app=None) -> bool:
+    """
+    Pasang TracerProvider dengan exporter OTLP (collector lokal) dan instrumentasi pymongo, redis
+    dan urllib3 (dipakai client MinIO). `app` FastAPI ikut diinstrumentasi bila diberikan.
+    Dipanggil sekali per proses sebelum koneksi dibuat; no-op bila OTEL_ENABLED=false.
+    """
+    if not config.otel_enabled:
+        return False
+
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+    from opentelemetry.instrumentation.pymongo import PymongoInstrumentor
+    from opentelemetry.instrumentation.redis import RedisInstrumentor
+    from opentelemetry.instrumentation.urllib3 import URLLib3Instrumentor
+
+    resource = Resource.create({
+        "service.name": service_name or config.otel_service_name,
+        "deployment.environment": config.app_env,
+    })
+    provider = TracerProvider(resource=resource)
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=config.otel_exporter_otlp_endpoint, insecure=True)))
+    trace.set_tracer_provider(provider)
+
+    PymongoInstrumentor().instrument()
+    RedisInstrumentor().instrument()
+    URLLib3Instrumentor().instrument()
+    if app is not None:
+        from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+        FastAPIInstrumentor.instrument_app(app, excluded_urls="/metrics")
+
+    logger.info("OpenTelemetry tracing enabled for %s, exporting to %s", resource.attributes["service.name"], config.otel_exporter_otlp_endpoint)
+    return True
+
+def inject_context(carrier: Optional[dict] = None) -> dict:
+    """Salinan `carrier` (header/payload) ditambah trace context span yang sedang aktif."""
+    carrier = dict(carrier or {})
+    propagate.inject(carrier)
+    return carrier
+
+@contextmanager
+def producer_span(name: str, **attributes):
+    with tracer.start_as_current_span(name, kind=SpanKind.PRODUCER, attributes=attributes) as span:
+        yield span
+
+@contextmanager
+def consumer_span(name: str, carrier: Optional[dict], **attributes):
+    """Span worker yang menjadi child dari span pengirim pesan (trace context dari `carrier`)."""
+    parent = propagate.extract(carrier or {})
+    with tracer.start_as_current_span(name, context=parent, kind=SpanKind.CONSUMER, attributes=attributes) as span:
+        yield span
+
+def _span_method(func, span_name: str):
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            with tracer.start_as_current_span(span_name):
+                return await func(*args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with tracer.start_as_current_span(span_name):
+            return func(*args, **kwargs)
+    return wrapper
+
+def traced(cls):
+    """
+    Class decorator untuk CRUD: setiap method publik (termasuk yang diwarisi dari BaseRepository)
+    dijalankan di dalam span `<modul>.<Class>.<method>`. Bila tracing nonaktif class dikembalikan apa adanya.
+    """
+    if not config.otel_enabled:
+        return cls
+    prefix = f"{cls.__module__.removeprefix('baseapp.services.')}.{cls.__name__}"
+    for name in dir(cls):
+        attr = inspect.getattr_static(cls, name)
+        if name.startswith("_") or name == "set_context" or not inspect.isfunction(attr):
+            continue
+        setattr(cls, name, _span_method(attr, f"{prefix}.{name}"))
+    return cls
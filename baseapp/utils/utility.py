@@ -1,11 +1,21 @@
-import bcrypt,string,secrets,logging,uuid,hashlib
+import bcrypt,string,secrets,logging,uuid,hashlib,threading,time,base64
+import nacl.exceptions, nacl.secret
 from pymongo.errors import PyMongoError
 
 from baseapp.config.setting import get_settings
+from baseapp.config.redis import RedisConn
+from baseapp.utils.cache import TTLCache
 
 config = get_settings()
 logger = logging.getLogger(__name__)
 
+# Cache enum per worker. Versi global di Redis (ENUM_VERSION_KEY) dinaikkan setiap kali _enum berubah;
+# tiap worker mengecek versi tersebut paling sering sekali per enum_cache_check_interval detik.
+ENUM_VERSION_KEY = "enum_cache:version"
+_enum_cache = TTLCache(maxsize=config.enum_cache_size, ttl=config.enum_cache_ttl)
+_enum_version = {"value": None, "checked_at": None}
+_enum_version_lock = threading.Lock()
+
 def generate_uuid() -> str:
     return str(uuid.uuid4().hex)
 
@@ -28,20 +38,90 @@ def check_password(password: str, stored_hash: str) -> bool:
         logger.warning(f"Error saat mengecek password: {e}")
         return False
 
+def encrypt_secret(plain_text: str) -> str:
+    """
+    Enkripsi secret yang harus bisa dibaca kembali (mis. secret HMAC webhook), berbeda dengan
+    client secret API credential yang cukup di-hash. XSalsa20-Poly1305 (nacl SecretBox) dengan
+    key API_CIPHER_KEY (base64, 32 byte); nonce acak disimpan di depan ciphertext.
+    """
+    box = nacl.secret.SecretBox(base64.b64decode(config.api_cipher_key))
+    return base64.b64encode(box.encrypt(plain_text.encode("utf-8"))).decode("ascii")
+
+def decrypt_secret(cipher_text: str) -> str:
+    """Kebalikan encrypt_secret. Raise ValueError bila ciphertext rusak atau key berbeda."""
+    box = nacl.secret.SecretBox(base64.b64decode(config.api_cipher_key))
+    try:
+        return box.decrypt(base64.b64decode(cipher_text)).decode("utf-8")
+    except (nacl.exceptions.CryptoError, ValueError) as e:
+        raise ValueError("Unable to decrypt secret") from e
+
 def generate_password(length: int = 8):
     characters = string.ascii_letters + string.digits + string.punctuation
     password = ''.join(secrets.choice(characters) for _ in range(length))
     return password
  
+def _sync_enum_version():
+    """Kosongkan cache lokal bila worker lain mengubah _enum (versi di Redis berubah)."""
+    now = time.monotonic()
+    checked_at = _enum_version["checked_at"]
+    if checked_at is not None and now - checked_at < config.enum_cache_check_interval:
+        return
+    with _enum_version_lock:
+        first_check = _enum_version["checked_at"] is None
+        if not first_check and now - _enum_version["checked_at"] < config.enum_cache_check_interval:
+            return
+        _enum_version["checked_at"] = now
+        try:
+            with RedisConn() as redis_conn:
+                version = redis_conn.get(ENUM_VERSION_KEY)
+        except Exception as e:
+            # Redis tidak tersedia: cache tetap dibatasi oleh TTL
+            logger.warning(f"Unable to check enum cache version: {e}")
+            return
+        if version != _enum_version["value"]:
+            if not first_check:
+                _enum_cache.clear()
+            _enum_version["value"] = version
+
 def get_enum(mongo, enum_id):
+    _sync_enum_version()
+    enum = _enum_cache.get(enum_id)
+    if enum is not None:
+        return enum
     collection = mongo.get_database()["_enum"]
     try:
         enum = collection.find_one({"_id": enum_id})
+        if enum is not None:
+            _enum_cache.set(enum_id, enum)
         return enum
     except PyMongoError as pme:
         raise ValueError("Database error occurred while find document.") from pme
     except Exception as e:
         raise
 
+def preload_enums(mongo):
+    """Memuat enum sistem (type hardcoded) ke cache saat startup."""
+    collection = mongo.get_database()["_enum"]
+    try:
+        count = 0
+        for enum in collection.find({"type": "hardcoded"}):
+            _enum_cache.set(enum["_id"], enum)
+            count += 1
+        return count
+    except PyMongoError as pme:
+        raise ValueError("Database error occurred while find document.") from pme
+
+def invalidate_enum(enum_id: str = None):
+    """Hapus enum dari cache lokal dan beri tahu worker lain lewat versi di Redis."""
+    if enum_id is None:
+        _enum_cache.clear()
+    else:
+        _enum_cache.pop(enum_id)
+    try:
+        with RedisConn() as redis_conn:
+            _enum_version["value"] = str(redis_conn.incr(ENUM_VERSION_KEY))
+    except Exception as e:
+        logger.warning(f"Unable to publish enum cache invalidation: {e}")
+
 def is_none(variable, default_value):
     return default_value if variable is None else variable
\ No newline at end of file
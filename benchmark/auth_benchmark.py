@@ -0,0 +1,59 @@
+"""
+Microbenchmark overhead dependency auth (_get_current_user) per request:
+decode + verifikasi JWT, cek deny list lokal, dan pembentukan CurrentUser.
+
+    ENV=test python -m benchmark.auth_benchmark --iterations 20000
+    ENV=test JWT_BACKEND=pyjwt python -m benchmark.auth_benchmark
+
+Filter deny list dianggap sudah sinkron (tanpa Redis), sehingga yang diukur hanya
+biaya CPU di dalam proses.
+"""
+import argparse, time
+from types import SimpleNamespace
+
+def run(label, fn, iterations):
+    fn()  # warm-up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {elapsed / iterations * 1e6:9.2f} us/request")
+
+def main():
+    parser = argparse.ArgumentParser(description="Auth dependency microbenchmark")
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    from baseapp.utils import jwt as jwt_utils
+
+    # Deny list lokal tanpa sinkronisasi Redis
+    jwt_utils._deny_list.sync = lambda: None
+    jwt_utils._deny_list.stale = False
+
+    token, _ = jwt_utils.create_access_token({
+        "sub": "benchmark@gai.co.id",
+        "id": "user-id",
+        "roles": ["role-a", "role-b"],
+        "authority": 1,
+        "org_id": "org-id",
+        "features": {f"feature_{i}": 255 for i in range(40)},
+        "bitws": {"view": 1, "add": 2, "edit": 4, "delete": 8, "export": 16, "import": 32, "approval": 64, "setting": 128},
+        "session_id": "session-id"
+    })
+    ctx = SimpleNamespace(
+        state=SimpleNamespace(log_id="log-id"),
+        client=SimpleNamespace(host="127.0.0.1"),
+        headers={"user-agent": "benchmark"}
+    )
+
+    print(f"JWT backend: {jwt_utils.config.jwt_backend}")
+    run("decode only (no cache)", lambda: jwt_utils._decode(token), args.iterations)
+
+    def uncached():
+        jwt_utils._token_cache.clear()
+        jwt_utils._get_current_user(ctx, token)
+    run("_get_current_user, cold cache", uncached, args.iterations)
+    run("_get_current_user, cached token", lambda: jwt_utils._get_current_user(ctx, token), args.iterations)
+
+if __name__ == "__main__":
+    main()
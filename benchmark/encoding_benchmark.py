@@ -0,0 +1,76 @@
+"""
+Perbandingan ukuran payload dan latency JSON vs CBOR vs MessagePack.
+
+In-process (encode/decode satu halaman list_file):
+
+    python -m benchmark.encoding_benchmark --items 100 --iterations 2000
+
+End-to-end terhadap API yang sedang berjalan (Accept negotiation):
+
+    python -m benchmark.encoding_benchmark --url http://localhost:1899 --path /v1/_role --token "Bearer ..."
+"""
+import argparse, gzip, statistics, time
+
+from benchmark.serialization_benchmark import list_file_page
+
+MEDIA = {"json": "application/json", "cbor": "application/cbor", "msgpack": "application/msgpack"}
+
+def timed(fn, iterations):
+    fn()  # warm-up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+def bench_codec(args):
+    from baseapp.model.common import ApiResponse
+    from baseapp.utils.response import encode, decode
+
+    page = ApiResponse(status=0, message="Data loaded", data=list_file_page(args.items))
+    print(f"list_file page: {args.items} items")
+    print(f"{'format':<10} {'bytes':>9} {'gzip':>9} {'encode us':>11} {'decode us':>11}")
+    for name, media in MEDIA.items():
+        body = encode(page, media)
+        encode_us = timed(lambda: encode(page, media), args.iterations)
+        decode_us = timed(lambda: decode(body, media), args.iterations)
+        print(f"{name:<10} {len(body):>9} {len(gzip.compress(body)):>9} {encode_us:>11.2f} {decode_us:>11.2f}")
+
+def bench_http(args):
+    import httpx
+    from baseapp.utils.response import decode
+
+    headers = {"authorization": args.token} if args.token else {}
+    with httpx.Client(base_url=args.url, timeout=30) as client:
+        print(f"{args.path}, {args.requests} requests")
+        print(f"{'format':<10} {'bytes':>9} {'mean ms':>9} {'p95 ms':>9} {'decode us':>11}")
+        for name, media in MEDIA.items():
+            request_headers = dict(headers, accept=media)
+            client.get(args.path, headers=request_headers).raise_for_status()  # warm-up
+            samples = []
+            for _ in range(args.requests):
+                start = time.perf_counter()
+                response = client.get(args.path, headers=request_headers)
+                samples.append(time.perf_counter() - start)
+            response.raise_for_status()
+            decode_us = timed(lambda: decode(response.content, media), 200)
+            samples.sort()
+            p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000
+            print(f"{name:<10} {len(response.content):>9} {statistics.mean(samples) * 1000:>9.2f} {p95:>9.2f} {decode_us:>11.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON/CBOR/MessagePack benchmark")
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--url", default=None, help="Benchmark a running API instead of in-process encoding")
+    parser.add_argument("--path", default="/v1/_role")
+    parser.add_argument("--token", default=None)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    if args.url:
+        bench_http(args)
+    else:
+        bench_codec(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Overhead logging per request (dua record: request dan response) di thread pemanggil.
+
+    ENV=test python -m benchmark.logging_benchmark --iterations 20000
+
+- sync: handler console + RotatingFileHandler langsung di logger, pesan f-string (setup lama)
+- queue: QueueHandler -> QueueListener + JsonFormatter, pesan lazy dengan extra (setup baru)
+- debug dimatikan: biaya logger.debug(f"...") vs logger.debug("...", arg) saat level INFO
+
+Console diarahkan ke os.devnull dan file log ke direktori sementara.
+"""
+import argparse, logging, logging.handlers, os, queue, tempfile, time, uuid
+
+def run(label, fn, iterations):
+    fn()  # warm-up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {elapsed / iterations * 1e6:9.2f} us/request")
+
+def handlers(tmpdir, name, formatter):
+    console = logging.StreamHandler(open(os.devnull, "w"))
+    file = logging.handlers.RotatingFileHandler(os.path.join(tmpdir, f"{name}.log"), "a", 10 * 1024 * 1024, 5, encoding="utf-8")
+    for handler in (console, file):
+        handler.setFormatter(formatter)
+    return [console, file]
+
+def main():
+    parser = argparse.ArgumentParser(description="Logging overhead benchmark")
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    from baseapp.config.log import JsonFormatter, LogIdFilter, _QueueHandler, log_id_var
+
+    log_id = str(uuid.uuid4())
+    payload = {"id": "user-id", "roles": ["role-a", "role-b"], "features": {f"feature_{i}": 255 for i in range(40)}}
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        sync_logger = logging.getLogger("benchmark.sync")
+        sync_logger.propagate = False
+        sync_logger.setLevel(logging.INFO)
+        for handler in handlers(tmpdir, "sync", logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")):
+            sync_logger.addHandler(handler)
+
+        def sync_request():
+            log_request = {"log_id": log_id, "method": "GET", "url": "/v1/test"}
+            sync_logger.info(f"request: {log_request}")
+            log_response = {"log_id": log_id, "process_time": str(0.0012), "http_status_code": 200}
+            sync_logger.info(f"response: {log_response}")
+
+        queue_logger = logging.getLogger("benchmark.queue")
+        queue_logger.propagate = False
+        queue_logger.setLevel(logging.INFO)
+        log_queue = queue.SimpleQueue()
+        listener = logging.handlers.QueueListener(log_queue, *handlers(tmpdir, "queue", JsonFormatter()), respect_handler_level=True)
+        queue_handler = _QueueHandler(log_queue)
+        queue_handler.addFilter(LogIdFilter())
+        queue_logger.addHandler(queue_handler)
+        listener.start()
+        log_id_var.set(log_id)
+
+        def queue_request():
+            queue_logger.info("request %s %s", "GET", "/v1/test", extra={"method": "GET", "url": "/v1/test"})
+            queue_logger.info("response %s %s %s %.6f", "GET", "/v1/test", 200, 0.0012, extra={"http_status_code": 200, "process_time": 0.0012})
+
+        run("sync handlers, f-string", sync_request, args.iterations)
+        run("queue listener, lazy + JSON", queue_request, args.iterations)
+        run("debug disabled, f-string", lambda: queue_logger.debug(f"User info: {payload}"), args.iterations)
+        run("debug disabled, lazy", lambda: queue_logger.debug("User info: %s", payload), args.iterations)
+
+        start = time.perf_counter()
+        listener.stop()
+        print(f"{'queue drain on shutdown':<40} {(time.perf_counter() - start) * 1000:9.2f} ms")
+
+if __name__ == "__main__":
+    main()
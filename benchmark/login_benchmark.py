@@ -0,0 +1,79 @@
+"""
+Benchmark login.
+
+End-to-end latency /v1/auth/login terhadap API yang sedang berjalan:
+
+    python -m benchmark.login_benchmark --url http://localhost:1899 --username admin@gai.co.id --password secret
+
+Resolusi user saja (langsung ke MongoDB sesuai setting), membandingkan alur lama
+(find_user, enum, _featureonrole, _organization berurutan) dengan satu aggregation:
+
+    ENV=test python -m benchmark.login_benchmark --resolve --username admin@gai.co.id
+"""
+import argparse, statistics, time
+from concurrent.futures import ThreadPoolExecutor
+
+def report(label, samples):
+    samples = sorted(samples)
+    pct = lambda p: samples[min(len(samples) - 1, int(len(samples) * p))] * 1000
+    print(f"{label:<28} n={len(samples):<6} mean={statistics.mean(samples) * 1000:8.2f} ms  p50={pct(0.50):8.2f} ms  p95={pct(0.95):8.2f} ms  p99={pct(0.99):8.2f} ms")
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+def run(fn, total, concurrency):
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            return list(executor.map(lambda i: timed(fn), range(total)))
+    return [timed(fn) for _ in range(total)]
+
+def legacy_resolve(crud, username):
+    """Alur resolusi user sebelum aggregation: empat round-trip berurutan."""
+    db = crud.mongo.get_database()
+    user_info = db[crud.user_collection].find_one({"$or": [{"username": username}, {"email": username}]})
+    user_info["bitws"] = db["_enum"].find_one({"_id": "ROLEACTION"})["value"]
+    feature = {}
+    for i in db[crud.permissions_collection].find({"r_id": {"$in": user_info["roles"]}}):
+        feature[i["f_id"]] = i["permission"] | feature.get(i["f_id"], 0)
+    user_info["feature"] = feature
+    user_info["authority"] = db[crud.org_collection].find_one({"_id": user_info["org_id"]}).get("authority")
+    return user_info
+
+def bench_http(args):
+    import httpx
+    with httpx.Client(base_url=args.url, timeout=30) as client:
+        def login():
+            response = client.post("/v1/auth/login", json={"username": args.username, "password": args.password})
+            response.raise_for_status()
+        login()  # warm-up
+        report(f"/v1/auth/login x{args.concurrency}", run(login, args.requests, args.concurrency))
+
+def bench_resolve(args):
+    from baseapp.services.auth.crud import CRUD
+    crud = CRUD()
+    with crud:
+        crud.find_user(args.username)  # warm-up (termasuk cache enum)
+        report("legacy (4 round-trips)", run(lambda: legacy_resolve(crud, args.username), args.requests, 1))
+        report("single aggregation", run(lambda: crud.find_user(args.username), args.requests, 1))
+
+def main():
+    parser = argparse.ArgumentParser(description="Login benchmark")
+    parser.add_argument("--url", default="http://localhost:1899")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", default=None)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--resolve", action="store_true", help="Benchmark user resolution against MongoDB only")
+    args = parser.parse_args()
+
+    if args.resolve:
+        bench_resolve(args)
+    else:
+        if args.password is None:
+            parser.error("--password is required for the HTTP benchmark")
+        bench_http(args)
+
+if __name__ == "__main__":
+    main()
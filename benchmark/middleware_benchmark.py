@@ -0,0 +1,87 @@
+"""
+Throughput (requests/detik) /v1/test dengan stack middleware lama (app.middleware("http") /
+BaseHTTPMiddleware) dibandingkan middleware pure ASGI di baseapp.services.middleware.
+
+    ENV=test python -m benchmark.middleware_benchmark --requests 5000 --concurrency 50
+
+Kedua aplikasi berjalan in-process lewat httpx.ASGITransport, sehingga yang diukur hanya
+overhead middleware + routing (tanpa jaringan dan tanpa worker uvicorn).
+"""
+import argparse, asyncio, logging, time
+
+def legacy_app():
+    """Salinan stack middleware sebelum diganti: dua fungsi app.middleware("http")."""
+    from fastapi import FastAPI, Request
+    from fastapi.responses import JSONResponse
+    from baseapp.model.common import ApiResponse
+    from baseapp.utils.utility import generate_uuid
+
+    app = FastAPI()
+
+    async def handle_exceptions(request: Request, call_next):
+        try:
+            return await call_next(request)
+        except ValueError as ve:
+            return JSONResponse(content=ApiResponse(status=4, message=str(ve)).model_dump(), status_code=400)
+
+    async def add_process_time_and_log(request: Request, call_next):
+        log_id = request.headers.get("log_id") or generate_uuid()
+        request.state.log_id = log_id
+        log_request = {"log_id": log_id, "method": request.method, "url": request.url.path}
+        logging.info(f"request: {log_request}")
+        start_time = time.time()
+        response = await call_next(request)
+        process_time = time.time() - start_time
+        response.headers["X-Process-Time"] = str(process_time)
+        log_response = {"log_id": log_id, "process_time": str(process_time), "http_status_code": response.status_code}
+        logging.info(f"response: {log_response}")
+        return response
+
+    app.middleware("http")(handle_exceptions)
+    app.middleware("http")(add_process_time_and_log)
+    return app
+
+def asgi_app():
+    from fastapi import FastAPI
+    from baseapp.services.middleware import setup_middleware
+
+    app = FastAPI()
+    setup_middleware(app)
+    return app
+
+def with_test_route(app):
+    @app.get("/v1/test")
+    def read_root():
+        return "ok"
+    return app
+
+async def measure(app, total, concurrency):
+    import httpx
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        (await client.get("/v1/test")).raise_for_status()  # warm-up
+        queue = iter(range(total))
+
+        async def worker():
+            for _ in queue:
+                (await client.get("/v1/test")).raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return total / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description="Middleware throughput benchmark")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    # Log request/response tetap dibentuk tetapi tidak ditulis, agar yang dibandingkan hanya middleware
+    logging.basicConfig(level=logging.WARNING)
+
+    for label, factory in (("BaseHTTPMiddleware (before)", legacy_app), ("pure ASGI (after)", asgi_app)):
+        rps = asyncio.run(measure(with_test_route(factory()), args.requests, args.concurrency))
+        print(f"{label:<30} {rps:10.1f} req/s")
+
+if __name__ == "__main__":
+    main()
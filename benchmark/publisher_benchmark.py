@@ -0,0 +1,159 @@
+"""
+Benchmark publisher RabbitMQ: pesan/detik untuk publisher lama (connect per pesan)
+dibanding publisher persisten dengan pool channel.
+
+Default-nya memakai stand-in RabbitMQ lokal (in-process) yang mensimulasikan
+latensi round-trip broker, sehingga bisa dijalankan tanpa broker:
+
+    ENV=test python -m benchmark.publisher_benchmark --messages 2000 --rtt-ms 0.5
+
+Untuk mengukur terhadap broker sungguhan (sesuai setting RABBITMQ_*):
+
+    ENV=test python -m benchmark.publisher_benchmark --live
+"""
+import argparse, json, time
+from concurrent.futures import ThreadPoolExecutor
+
+import pika
+import pika.frame
+
+class StandInChannel:
+    """Channel palsu: setiap method sinkron AMQP memakan satu round-trip."""
+    def __init__(self, rtt):
+        self.rtt = rtt
+        self.is_open = True
+        self.confirm = False
+        self.published = 0
+        # Publish batch memakai channel pika di bawahnya (_impl) dengan callback ack
+        self._impl = self
+        self.ack_nack_callback = None
+
+    @property
+    def is_closed(self):
+        return not self.is_open
+
+    def _round_trip(self):
+        time.sleep(self.rtt)
+
+    def queue_declare(self, queue, **kwargs):
+        self._round_trip()
+
+    def confirm_delivery(self, ack_nack_callback=None, callback=None):
+        self._round_trip()
+        if ack_nack_callback is None:
+            self.confirm = True
+            return
+        self.ack_nack_callback = ack_nack_callback
+        if callback:
+            callback(None)
+
+    def add_on_return_callback(self, callback):
+        pass
+
+    def _flush_output(self, *waiters):
+        # Broker meng-ack seluruh pesan yang tertunda dengan satu Basic.Ack multiple
+        self._round_trip()
+        if self.ack_nack_callback and self.published:
+            method = pika.spec.Basic.Ack(delivery_tag=self.published, multiple=True)
+            self.ack_nack_callback(pika.frame.Method(1, method))
+
+    def basic_publish(self, exchange, routing_key, body, properties=None, mandatory=False):
+        self.published += 1
+        if self.confirm:
+            self._round_trip()
+
+    def close(self):
+        self.is_open = False
+        self._round_trip()
+
+class StandInConnection:
+    """Koneksi palsu: handshake AMQP (start, tune, open) = tiga round-trip."""
+    def __init__(self, parameters=None, rtt=0.0005):
+        self.rtt = rtt
+        self.is_open = True
+        time.sleep(self.rtt * 3)
+
+    @property
+    def is_closed(self):
+        return not self.is_open
+
+    def channel(self):
+        time.sleep(self.rtt)
+        return StandInChannel(self.rtt)
+
+    def process_data_events(self, time_limit=0):
+        pass
+
+    def close(self):
+        self.is_open = False
+        time.sleep(self.rtt)
+
+def legacy_publish(queue_name, task_data):
+    """Alur publisher sebelum pooling: connect, declare, confirm, publish, close per pesan."""
+    from baseapp.config.rabbitmq import RabbitMqConn
+    with RabbitMqConn() as channel:
+        channel.queue_declare(queue=queue_name, durable=True, auto_delete=False)
+        channel.confirm_delivery()
+        channel.basic_publish(
+            exchange='',
+            routing_key=queue_name,
+            body=json.dumps(task_data),
+            properties=pika.BasicProperties(content_type='application/json', delivery_mode=pika.DeliveryMode.Persistent),
+            mandatory=True
+        )
+
+def run(label, fn, total, threads):
+    start = time.perf_counter()
+    if threads > 1:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(lambda i: fn(i), range(total)))
+    else:
+        for i in range(total):
+            fn(i)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<36} {total:>7} msg  {elapsed:8.3f} s  {total / elapsed:10.1f} msg/s")
+
+def main():
+    parser = argparse.ArgumentParser(description="RabbitMQ publisher benchmark")
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--batch", type=int, default=100)
+    parser.add_argument("--rtt-ms", type=float, default=0.5, help="Simulated broker round-trip (stand-in only)")
+    parser.add_argument("--live", action="store_true", help="Use the RabbitMQ broker from settings")
+    args = parser.parse_args()
+
+    if not args.live:
+        rtt = args.rtt_ms / 1000
+        pika.BlockingConnection = lambda parameters=None: StandInConnection(parameters, rtt=rtt)
+        print(f"RabbitMQ stand-in, simulated RTT {args.rtt_ms} ms")
+
+    from baseapp.services.publisher import RabbitMqPublisher
+
+    queue_name = "benchmark_tasks"
+    payload = {
+        "event_type": "payment.succeeded",
+        "event_data": {"payment_id": "pay_12345", "amount": 50000},
+        "org_id": "org_abcde"
+    }
+
+    legacy_total = max(1, args.messages // 10)
+    run("legacy (connect per message)", lambda i: legacy_publish(queue_name, payload), legacy_total, 1)
+
+    publisher = RabbitMqPublisher(pool_size=args.threads)
+    try:
+        run("pooled, confirm per message", lambda i: publisher.publish(queue_name, payload), args.messages, 1)
+        run(f"pooled, {args.threads} threads", lambda i: publisher.publish(queue_name, payload), args.messages, args.threads)
+
+        batches = max(1, args.messages // args.batch)
+        tasks = [payload] * args.batch
+        start = time.perf_counter()
+        for _ in range(batches):
+            publisher.publish_batch(queue_name, tasks)
+        elapsed = time.perf_counter() - start
+        total = batches * args.batch
+        print(f"{f'pooled, confirmed batch of {args.batch}':<36} {total:>7} msg  {elapsed:8.3f} s  {total / elapsed:10.1f} msg/s")
+    finally:
+        publisher.close()
+
+if __name__ == "__main__":
+    main()
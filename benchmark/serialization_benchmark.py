@@ -0,0 +1,85 @@
+"""
+Microbenchmark serialisasi ApiResponse untuk satu halaman list_file (DMS browse, 100 item).
+
+    python -m benchmark.serialization_benchmark --items 100 --iterations 2000
+
+Membandingkan jalur FastAPI bawaan (jsonable_encoder / validasi response_model + json.dumps)
+dengan jalur cepat baseapp.utils.response.dumps (serializer pydantic-core / orjson).
+"""
+import argparse, json, time, uuid
+from datetime import datetime, timezone, timedelta
+
+def run(label, fn, iterations):
+    size = len(fn())  # warm-up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<44} {elapsed / iterations * 1e6:9.2f} us/page  {size:>8} bytes")
+
+def list_file_page(items: int):
+    """Bentuk data sama dengan hasil _dms.browse CRUD.list_file."""
+    now = datetime.now(timezone.utc)
+    data = []
+    for i in range(items):
+        filename = str(uuid.uuid4())
+        data.append({
+            "id": str(uuid.uuid4()),
+            "filename": filename,
+            "filestat": {
+                "filename": f"document-{i}.pdf",
+                "content_type": "application/pdf",
+                "size": 1024 * (i + 1),
+                "upload_date": now - timedelta(minutes=i),
+            },
+            "folder_id": "folder-id",
+            "folder_path": "/Arsip/2024/Kontrak",
+            "metadata": {"nomor": f"KTR-{i:05d}", "tanggal": now.date().isoformat(), "nilai": 1500000 + i, "pihak": "PT Contoh"},
+            "doctype": "doctype-id",
+            "refkey_table": "_contract",
+            "refkey_name": f"Kontrak {i}",
+            "refkey_id": str(uuid.uuid4()),
+            "url": f"https://minio.local/baseapp/{filename}?X-Amz-Algorithm=AWS4-HMAC-SHA256&X-Amz-Expires=604800&X-Amz-Signature={uuid.uuid4().hex}",
+            "rec_date": now,
+            "mod_date": now,
+        })
+    return data
+
+def main():
+    parser = argparse.ArgumentParser(description="ApiResponse serialization microbenchmark")
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    from fastapi.encoders import jsonable_encoder
+    from pydantic import TypeAdapter
+    from baseapp.model.common import ApiResponse
+    from baseapp.utils.response import dumps
+
+    total = args.items * 10
+    page = ApiResponse(
+        status=0, message="Data loaded", data=list_file_page(args.items),
+        pagination={"current_page": 1, "items_per_page": args.items, "total_items": total, "total_pages": 10}
+    )
+    adapter = TypeAdapter(ApiResponse)
+
+    def stdlib_json(content):
+        # Sama dengan starlette JSONResponse.render
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+    def fastapi_default():
+        return stdlib_json(jsonable_encoder(page))
+
+    def fastapi_response_model():
+        # response_model=ApiResponse: model_dump -> validate -> dump_python(json) -> json.dumps
+        validated = adapter.validate_python(page.model_dump())
+        return stdlib_json(adapter.dump_python(validated, mode="json"))
+
+    print(f"list_file page: {args.items} items")
+    run("jsonable_encoder + json.dumps", fastapi_default, args.iterations)
+    run("response_model validate + json.dumps", fastapi_response_model, args.iterations)
+    run("model_dump_json (pydantic-core)", lambda: page.model_dump_json().encode("utf-8"), args.iterations)
+    run("baseapp.utils.response.dumps", lambda: dumps(page), args.iterations)
+
+if __name__ == "__main__":
+    main()
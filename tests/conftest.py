@@ -0,0 +1,169 @@
+import os, re
+from pathlib import Path
+
+import pytest
+from dotenv import load_dotenv
+
+# Settings (pydantic-settings) dibaca dari environment: nilai .env.test di root repo. .env.test adalah
+# template, jadi placeholder port/flag diganti nilai lokal (environment yang sudah di-set tetap dipakai).
+for key, value in {"MONGODB_PORT": "27017", "REDIS_PORT": "6379", "REDIS_MAX_CONNECTIONS": "10", "MINIO_PORT": "9000",
+                   "MINIO_SECURE": "false", "MINIO_VERIFY": "false", "RABBITMQ_PORT": "5672"}.items():
+    os.environ.setdefault(key, value)
+load_dotenv(Path(__file__).parent.parent / ".env.test")
+# Modul worker (consumer) memuat logging.conf saat import; file log ditulis ke folder log/ seperti app.py
+os.makedirs("log", exist_ok=True)
+
+class FakeOperationFailure(Exception):
+    """Pengganti pymongo OperationFailure untuk FakeDatabase."""
+
+def _get_path(doc, path):
+    for part in path.split("."):
+        if not isinstance(doc, dict) or part not in doc:
+            return None
+        doc = doc[part]
+    return doc
+
+class FakeCollection:
+    """
+    Collection MongoDB in-memory yang cukup untuk menguji index dan query sederhana:
+    equality, $exists, $ne, $in dan $text (butuh text index, seperti MongoDB).
+    """
+    def __init__(self, name):
+        self.name = name
+        self.docs = []
+        self.indexes = {"_id_": {"key": [("_id", 1)], "v": 2}}
+
+    # region index
+    def index_information(self):
+        return {name: dict(info) for name, info in self.indexes.items()}
+
+    def create_index(self, keys, name=None, **options):
+        if isinstance(keys, str):
+            keys = [(keys, 1)]
+        name = name or "_".join(f"{field}_{direction}" for field, direction in keys)
+        text_fields = [field for field, direction in keys if direction == "text"]
+        if text_fields:
+            info = {
+                "key": [(field, direction) for field, direction in keys if direction != "text"] + [("_fts", "text"), ("_ftsx", 1)],
+                "weights": {field: options.get("weights", {}).get(field, 1) for field in text_fields},
+                "default_language": options.get("default_language", "english"),
+            }
+            for other_name, other in self.indexes.items():
+                if other_name != name and "weights" in other:
+                    raise FakeOperationFailure(f"IndexOptionsConflict: only one text index per collection ({other_name})")
+        else:
+            info = {"key": list(keys)}
+        if name in self.indexes and self.indexes[name] != {**info, "v": 2}:
+            raise FakeOperationFailure(f"IndexOptionsConflict: index {name} already exists with different options")
+        self.indexes[name] = {**info, "v": 2}
+        return name
+
+    def drop_index(self, name):
+        if name not in self.indexes:
+            raise FakeOperationFailure(f"index not found with name [{name}]")
+        del self.indexes[name]
+
+    def _text_index(self):
+        return next((info for info in self.indexes.values() if "weights" in info), None)
+    # endregion
+
+    # region query
+    def _matches(self, doc, query):
+        for field, condition in query.items():
+            if field == "$text":
+                if not self._text_match(doc, query, condition["$search"]):
+                    return False
+                continue
+            value = _get_path(doc, field)
+            if isinstance(condition, dict):
+                for op, operand in condition.items():
+                    if op == "$exists" and (value is not None) != operand:
+                        return False
+                    if op == "$ne" and value == operand:
+                        return False
+                    if op == "$in" and value not in operand:
+                        return False
+                    if op == "$regex":
+                        flags = re.IGNORECASE if "i" in condition.get("$options", "") else 0
+                        if value is None or not re.search(operand, value, flags):
+                            return False
+            elif value != condition:
+                return False
+        return True
+
+    def _text_match(self, doc, query, search):
+        index = self._text_index()
+        if index is None:
+            raise FakeOperationFailure("text index required for $text query")
+        prefix = [field for field, _ in index["key"] if field not in ("_fts", "_ftsx")]
+        if any(field not in query for field in prefix):
+            raise FakeOperationFailure("failed to use text index to satisfy $text query")
+        words = set()
+        for field in index["weights"]:
+            words.update(str(_get_path(doc, field) or "").lower().split())
+        return any(term in words for term in search.lower().split())
+
+    @staticmethod
+    def _project(doc, projection):
+        # Hanya projection exclusion ({"field": 0}) yang didukung
+        excluded = {field for field, value in (projection or {}).items() if not value}
+        return {key: value for key, value in doc.items() if key not in excluded}
+
+    def find(self, query=None, projection=None):
+        return [self._project(doc, projection) for doc in self.docs if self._matches(doc, query or {})]
+
+    def find_one(self, query=None, projection=None):
+        found = self.find(query, projection)
+        return found[0] if found else None
+
+    def find_one_and_update(self, query, update, projection=None, return_document=False):
+        for doc in self.docs:
+            if self._matches(doc, query):
+                doc.update(update.get("$set", {}))
+                return self._project(doc, projection)
+        return None
+
+    def insert_one(self, doc):
+        self.docs.append(dict(doc))
+
+    def insert_many(self, docs, ordered=True):
+        self.docs.extend(dict(doc) for doc in docs)
+
+    def update_one(self, query, update):
+        for doc in self.docs:
+            if self._matches(doc, query):
+                doc.update(update.get("$set", {}))
+                return
+
+    def update_many(self, query, update):
+        for doc in self.docs:
+            if self._matches(doc, query):
+                doc.update(update.get("$set", {}))
+
+    def bulk_write(self, requests, ordered=True):
+        for request in requests:
+            self.update_one(request._filter, request._doc)
+    # endregion
+
+class FakeDatabase(dict):
+    def __missing__(self, name):
+        collection = self[name] = FakeCollection(name)
+        return collection
+
+class FakeMongoConn:
+    """Pengganti mongodb.MongoConn() yang memakai FakeDatabase."""
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def get_database(self):
+        return self.db
+
+@pytest.fixture
+def fake_db():
+    return FakeDatabase()
@@ -0,0 +1,31 @@
+import pika.exceptions
+import pytest
+
+from baseapp.services import consumer
+
+@pytest.mark.parametrize("error, reconnect", [
+    (pika.exceptions.StreamLostError("lost"), True),
+    (pika.exceptions.ConnectionClosedByBroker(320, "CONNECTION_FORCED"), True),
+    (pika.exceptions.ChannelClosedByBroker(320, "CONNECTION_FORCED"), True),
+    (pika.exceptions.ChannelClosedByBroker(541, "INTERNAL_ERROR"), True),
+    (pika.exceptions.ChannelClosedByBroker(406, "PRECONDITION_FAILED - inequivalent arg 'x-dead-letter-exchange'"), False),
+    (pika.exceptions.ChannelClosedByBroker(403, "ACCESS_REFUSED"), False),
+    (pika.exceptions.ChannelClosedByBroker(404, "NOT_FOUND"), False),
+    (ValueError("bug"), False),
+])
+def test_should_reconnect(error, reconnect):
+    assert consumer._should_reconnect(error) is reconnect
+
+def test_start_consuming_reconnects_transient_errors_and_stops_on_permanent(monkeypatch):
+    errors = [pika.exceptions.StreamLostError("lost"), pika.exceptions.ChannelClosedByBroker(406, "PRECONDITION_FAILED")]
+    calls = []
+
+    def consume(*args):
+        calls.append(args[0])
+        raise errors.pop(0)
+
+    monkeypatch.setattr(consumer, "_consume", consume)
+    monkeypatch.setattr(consumer.time, "sleep", lambda seconds: None)
+    with pytest.raises(pika.exceptions.ChannelClosedByBroker):
+        consumer.start_consuming("webhook_tasks", worker_instance=None, prefetch_count=1, workers=1)
+    assert calls == ["webhook_tasks", "webhook_tasks"]
@@ -0,0 +1,129 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from baseapp.services._dms.search_index import (backfill_search_text, build_search_text, migrate_dms_content, migrate_dms_search,
+                                               queue_missing_extraction, search_filter)
+from baseapp.utils.mongo_indexes import ensure_indexes
+from conftest import FakeOperationFailure
+
+with open(Path(__file__).parent.parent / "data/files/initdata.json") as json_file:
+    INITDATA = json.load(json_file)
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def set(self, key, value, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+@pytest.fixture
+def existing_db(fake_db):
+    """Database yang dibuat sebelum text index dms_text dan field search_text ada."""
+    fake_db["_dmsfile"].create_index("org_id")
+    fake_db["_dmsdoctype"].insert_many([{"_id": "dt1", "name": "Invoice"}])
+    fake_db["_dmsfile"].insert_many([
+        {"_id": "f1", "org_id": "org1", "doctype": "dt1", "metadata": {"vendor": "Acme", "number": "INV-7"},
+         "filestat": {"original-name": "scan.pdf"}, "folder_path": "Invoice >> Acme"},
+        {"_id": "f2", "org_id": "org2", "doctype": "dt1", "metadata": {"vendor": "Acme"},
+         "filestat": {"original-name": "other.pdf"}, "folder_path": "Invoice >> Acme"},
+        {"_id": "f3", "org_id": "org1", "doctype": "dt1", "metadata": {"vendor": "Globex"}, "is_deleted": 1,
+         "filestat": {"original-name": "old.pdf"}, "folder_path": "Invoice >> Globex"},
+    ])
+    return fake_db
+
+def test_build_search_text_flattens_doctype_and_metadata_values():
+    text = build_search_text("Invoice", {"vendor": "Acme", "tags": ["paid", "", None], "empty": "", "amount": 10})
+    assert text == "Invoice Acme paid 10"
+
+def test_search_fails_on_existing_database_without_text_index(existing_db):
+    with pytest.raises(FakeOperationFailure):
+        existing_db["_dmsfile"].find(search_filter("org1", "acme"))
+
+def test_search_works_on_existing_database_after_startup_migration(existing_db):
+    ensure_indexes(existing_db, INITDATA)
+    assert "dms_text" in existing_db["_dmsfile"].index_information()
+
+    # Sebelum backfill, metadata file lama belum terindeks
+    assert existing_db["_dmsfile"].find(search_filter("org1", "INV-7")) == []
+
+    assert migrate_dms_search(FakeRedis(), existing_db) == 3
+
+    found = existing_db["_dmsfile"].find(search_filter("org1", "inv-7"))
+    assert [doc["_id"] for doc in found] == ["f1"]
+
+    # Scope per organisasi dan file di trash tidak ikut
+    found = existing_db["_dmsfile"].find(search_filter("org1", "acme globex"))
+    assert [doc["_id"] for doc in found] == ["f1"]
+
+def test_ensure_indexes_is_idempotent(existing_db):
+    assert ensure_indexes(existing_db, INITDATA) > 0
+    assert ensure_indexes(existing_db, INITDATA) == 0
+
+def test_backfill_only_touches_files_without_search_text(existing_db):
+    existing_db["_dmsfile"].update_one({"_id": "f1"}, {"$set": {"search_text": "kept"}})
+    assert backfill_search_text(existing_db, batch_size=1) == 2
+    assert existing_db["_dmsfile"].find_one({"_id": "f1"})["search_text"] == "kept"
+
+def test_migration_runs_once_and_retries_after_failure(existing_db):
+    redis_conn = FakeRedis()
+    assert migrate_dms_search(redis_conn, existing_db) == 3
+    assert migrate_dms_search(redis_conn, existing_db) == 0
+
+    class BrokenDatabase(dict):
+        def __getitem__(self, name):
+            raise RuntimeError("mongo down")
+
+    redis_conn = FakeRedis()
+    with pytest.raises(RuntimeError):
+        migrate_dms_search(redis_conn, BrokenDatabase())
+    assert redis_conn.data == {}
+
+def test_ensure_indexes_rebuilds_text_index_when_definition_changes(existing_db):
+    # dms_text seperti yang dibuat sebelum field `content` ditambahkan
+    existing_db["_dmsfile"].create_index(
+        [("org_id", 1), ("filestat.original-name", "text"), ("search_text", "text"), ("folder_path", "text")],
+        name="dms_text", weights={"filestat.original-name": 10, "search_text": 5, "folder_path": 2}, default_language="none"
+    )
+    existing_db["_dmsfile"].update_one({"_id": "f1"}, {"$set": {"content": "quarterly tax report"}})
+    assert existing_db["_dmsfile"].find(search_filter("org1", "quarterly")) == []
+
+    ensure_indexes(existing_db, INITDATA)
+    assert existing_db["_dmsfile"].index_information()["dms_text"]["weights"]["content"] == 1
+    assert [doc["_id"] for doc in existing_db["_dmsfile"].find(search_filter("org1", "quarterly"))] == ["f1"]
+    assert ensure_indexes(existing_db, INITDATA) == 0
+
+def test_ensure_indexes_drops_text_index_with_another_name(existing_db):
+    existing_db["_dmsfile"].create_index([("folder_path", "text")], name="legacy_text")
+    ensure_indexes(existing_db, INITDATA)
+    indexes = existing_db["_dmsfile"].index_information()
+    assert "legacy_text" not in indexes and "dms_text" in indexes
+
+def test_queue_missing_extraction_for_old_files(existing_db):
+    existing_db["_dmsfile"].insert_many([
+        {"_id": "f4", "org_id": "org1", "filename": "f4.PDF"},
+        {"_id": "f5", "org_id": "org1", "filename": "f5.txt", "content_status": "indexed"},
+        {"_id": "f6", "org_id": "org1", "filename": "f6.png"},
+    ])
+    sent = []
+    publish_batch = lambda tasks: sent.extend(tasks) or len(tasks)
+
+    assert queue_missing_extraction(existing_db, publish_batch, (".pdf", ".txt")) == 1
+    assert sent == [{"file_id": "f4"}]
+    assert existing_db["_dmsfile"].find_one({"_id": "f4"})["content_status"] == "pending"
+    assert existing_db["_dmsfile"].find_one({"_id": "f6"}).get("content_status") is None
+
+def test_queue_missing_extraction_keeps_files_unmarked_when_publish_fails(existing_db):
+    existing_db["_dmsfile"].insert_many([{"_id": "f4", "org_id": "org1", "filename": "f4.pdf"}])
+    redis_conn = FakeRedis()
+    with pytest.raises(RuntimeError):
+        migrate_dms_content(redis_conn, existing_db, lambda tasks: 0, (".pdf",))
+    assert existing_db["_dmsfile"].find_one({"_id": "f4"}).get("content_status") is None
+    assert redis_conn.data == {}
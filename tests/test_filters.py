@@ -0,0 +1,79 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from baseapp.utils.filters import MAX_IN_VALUES, Exact, FilterCompiler, FilterError, In, Prefix, Range
+from baseapp.utils.mongo_indexes import ensure_indexes
+
+with open(Path(__file__).parent.parent / "data/files/initdata.json") as json_file:
+    INITDATA = json.load(json_file)
+
+@pytest.fixture
+def user_filters():
+    # Sama dengan _user CRUD: indexed_fields / residual_fields
+    return FilterCompiler(indexed=("rec_date", "username", "email", "org_id", "roles"), residual=("status",))
+
+def test_compiles_exact_prefix_in_and_range(user_filters):
+    query = user_filters.compile({
+        "org_id": "org1",
+        "username": Prefix("jo.hn*"),
+        "roles": In(["admin", "staff"]),
+        "rec_date": Range(gte="2024-01-01", lt="2025-01-01"),
+        "status": Exact("ACTIVE"),
+        "email": None,
+    })
+    assert query == {
+        "org_id": "org1",
+        "username": {"$regex": "^jo\\.hn\\*"},
+        "roles": {"$in": ["admin", "staff"]},
+        "rec_date": {"$gte": "2024-01-01", "$lt": "2025-01-01"},
+        "status": "ACTIVE",
+    }
+
+def test_empty_filters_compile_to_empty_query(user_filters):
+    assert user_filters.compile(None) == {}
+    assert user_filters.compile({"org_id": None}) == {}
+
+def test_id_is_always_indexed(user_filters):
+    assert user_filters.compile({"_id": "u1", "status": "ACTIVE"}) == {"_id": "u1", "status": "ACTIVE"}
+    assert user_filters.sort_field("_id") == "_id"
+
+@pytest.mark.parametrize("filters", [
+    {"password": "x"},                                # field tidak terdaftar
+    {"status": "ACTIVE"},                             # residual tanpa field ber-index
+    {"org_id": {"$where": "sleep(1000)"}},            # dict mentah
+    {"org_id": ["a", "b"]},                           # list mentah
+    {"username": Prefix("")},                         # prefix kosong
+    {"roles": In([])},                                # $in kosong
+    {"roles": In(range(MAX_IN_VALUES + 1))},          # $in terlalu besar
+    {"roles": In([{"$gt": ""}])},                     # operator di dalam $in
+    {"rec_date": Range()},                            # range tanpa batas
+])
+def test_rejects_unsafe_or_unindexed_filters(user_filters, filters):
+    with pytest.raises(FilterError):
+        user_filters.compile(filters)
+
+def test_filter_error_is_value_error():
+    # middleware menjawab ValueError dengan 400
+    assert issubclass(FilterError, ValueError)
+
+def test_rejects_sort_on_unindexed_field(user_filters):
+    assert user_filters.sort_field("rec_date") == "rec_date"
+    with pytest.raises(FilterError):
+        user_filters.sort_field("status")
+    with pytest.raises(FilterError):
+        user_filters.sort_field("fullname")
+
+def test_suffix_match_is_not_expressible():
+    # name_ends_with (role) dijawab FilterError oleh router; Prefix selalu ter-anchor di awal dan pola client di-escape
+    role_filters = FilterCompiler(indexed=("rec_date", "name", "org_id"), residual=("status",))
+    assert role_filters.compile({"name": Prefix(".*admin$")}) == {"name": {"$regex": "^\\.\\*admin\\$"}}
+
+def test_filter_indexes_are_created_on_existing_database(fake_db):
+    # Database lama tanpa index org_name (_organization) dan roles (_user)
+    fake_db["_organization"].create_index("rec_date")
+    fake_db["_user"].create_index("rec_date")
+    ensure_indexes(fake_db, INITDATA)
+    assert "org_name_1" in fake_db["_organization"].index_information()
+    assert "roles_1" in fake_db["_user"].index_information()
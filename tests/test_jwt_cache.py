@@ -0,0 +1,11 @@
+from baseapp.utils import jwt as jwt_utils
+
+def test_only_access_tokens_are_cached():
+    jwt_utils._token_cache.clear()
+    access_token, _ = jwt_utils.create_access_token({"id": "u1", "sub": "user"})
+    refresh_token, _ = jwt_utils.create_refresh_token({"id": "u1", "sub": "user", "session_id": "s1"})
+
+    assert jwt_utils._decode_cached(access_token) is jwt_utils._decode_cached(access_token)
+    assert jwt_utils.decode_jwt_token(refresh_token)["session_id"] == "s1"
+    assert jwt_utils._token_cache.get(refresh_token) is None
+    assert jwt_utils._token_cache.get(access_token) is not None
@@ -0,0 +1,49 @@
+from contextlib import nullcontext
+
+import pytest
+
+from baseapp.services._menu import crud as menu_crud
+from baseapp.utils.request_context import request_context
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def incr(self, key):
+        self.data[key] = str(int(self.data.get(key) or 0) + 1)
+        return int(self.data[key])
+
+@pytest.fixture
+def menu(monkeypatch):
+    """Menu CRUD dengan Redis in-memory; katalog dan permission dihitung, bukan dibaca dari MongoDB."""
+    redis_conn = FakeRedis()
+    loads = []
+    monkeypatch.setattr(menu_crud, "RedisConn", lambda: nullcontext(redis_conn))
+    monkeypatch.setattr(menu_crud.mongodb, "MongoConn", lambda: nullcontext())
+    monkeypatch.setattr(menu_crud, "invalidate_response_cache", lambda *tags: None)
+    monkeypatch.setattr(menu_crud.CRUD, "_load_catalog", lambda self, mongo: loads.append("catalog") or {"menu": [], "bitRA": {}})
+    monkeypatch.setattr(menu_crud.CRUD, "_load_permission", lambda self, mongo: loads.append("permission") or {})
+    menu_crud._catalog_cache.clear()
+    menu_crud._permission_cache.clear()
+    menu_crud._generation["value"] = None
+    yield menu_crud.CRUD(), redis_conn, loads
+    menu_crud._catalog_cache.clear()
+    menu_crud._permission_cache.clear()
+
+def test_invalidation_from_other_worker_is_picked_up(menu):
+    crud, redis_conn, loads = menu
+    with request_context(user_id="u1", org_id="org1", authority=1, roles=["r1"]):
+        crud.get_all()
+        crud.get_all()
+        assert loads == ["catalog", "permission"]
+
+        redis_conn.incr(menu_crud.MENU_GENERATION_KEY)  # invalidate_menu_cache() di worker lain
+        crud.get_all()
+        assert loads == ["catalog", "permission", "catalog", "permission"]
+
+        menu_crud.invalidate_menu_cache()
+        crud.get_all()
+        assert len(loads) == 6
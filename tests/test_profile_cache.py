@@ -0,0 +1,69 @@
+from contextlib import nullcontext
+
+import pytest
+
+from baseapp.services import registry
+from baseapp.services.profile import crud as profile_crud
+from baseapp.services._role.crud import CRUD as RoleCRUD
+from baseapp.services._user.crud import CRUD as UserCRUD
+
+class FakeService:
+    def __init__(self, collection_name):
+        self.collection_name = collection_name
+        self.loaded = []
+
+    def get_by_id(self, doc_id):
+        self.loaded.append(doc_id)
+        return {"id": doc_id, "version": len(self.loaded)}
+
+@pytest.fixture
+def profile(monkeypatch):
+    """Profile CRUD dengan service _user/_organization palsu; audit trail dicatat, bukan ke MongoDB."""
+    services = {"_user": FakeService("_user"), "_organization": FakeService("_organization")}
+    audits = []
+    for name, service in services.items():
+        monkeypatch.setitem(registry._instances, name, service)
+    monkeypatch.setattr(profile_crud.mongodb, "MongoConn", lambda: nullcontext())
+    monkeypatch.setattr(profile_crud.CRUD.audit_trail, "log_audittrail", lambda mongo, **kwargs: audits.append(kwargs))
+    profile_crud._user_cache.clear()
+    profile_crud._org_cache.clear()
+    yield profile_crud.CRUD(), services, audits
+    profile_crud._user_cache.clear()
+    profile_crud._org_cache.clear()
+
+def test_cache_hit_still_writes_retrieve_audit(profile):
+    crud, services, audits = profile
+    assert crud.get_user_profile("u1") == {"id": "u1", "version": 1}
+    assert audits == []  # miss: audit ditulis get_by_id service
+    assert crud.get_user_profile("u1") == {"id": "u1", "version": 1}
+    crud.get_org_profile("o1")
+    crud.get_org_profile("o1")
+    assert services["_user"].loaded == ["u1"] and services["_organization"].loaded == ["o1"]
+    assert [(audit["action"], audit["target"], audit["target_id"]) for audit in audits] == [
+        ("retrieve", "_user", "u1"),
+        ("retrieve", "_organization", "o1"),
+    ]
+
+def test_user_update_invalidates_profile(profile):
+    crud, services, _ = profile
+    crud.get_user_profile("u1")
+    crud.get_user_profile("u2")
+    UserCRUD()._invalidate("u1")
+    assert crud.get_user_profile("u1")["version"] == 3
+    assert crud.get_user_profile("u2")["version"] == 2
+
+def test_role_update_invalidates_user_profiles(profile):
+    crud, services, _ = profile
+    crud.get_user_profile("u1")
+    RoleCRUD()._invalidate("r1")
+    crud.get_user_profile("u1")
+    assert services["_user"].loaded == ["u1", "u1"]
+
+def test_org_update_invalidates_org_and_user_profiles(profile):
+    crud, services, _ = profile
+    crud.get_user_profile("u1")
+    crud.get_org_profile("o1")
+    profile_crud.invalidate_org("o1")
+    crud.get_user_profile("u1")
+    crud.get_org_profile("o1")
+    assert services["_user"].loaded == ["u1", "u1"] and services["_organization"].loaded == ["o1", "o1"]
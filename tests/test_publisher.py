@@ -0,0 +1,71 @@
+import inspect
+from types import SimpleNamespace
+
+import pika
+import pika.exceptions
+import pytest
+from pika.adapters.blocking_connection import BlockingChannel
+
+from baseapp.services.publisher import _BatchConfirmChannel
+
+def test_pika_internals_used_by_batch_channel():
+    # _BatchConfirmChannel memakai API internal pika (requirements.txt: pika dipin); cek ulang saat upgrade
+    assert {"ack_nack_callback", "callback"} <= set(inspect.signature(pika.channel.Channel.confirm_delivery).parameters)
+    assert "mandatory" in inspect.signature(pika.channel.Channel.basic_publish).parameters
+    assert callable(pika.channel.Channel.add_on_return_callback)
+    assert list(inspect.signature(BlockingChannel._flush_output).parameters) == ["self", "waiters"]
+    assert "self._impl" in inspect.getsource(BlockingChannel.__init__)
+
+class StubChannel:
+    """BlockingChannel sekaligus channel _impl-nya; broker menjawab saat _flush_output."""
+    def __init__(self, outcome):
+        self._impl = self
+        self.is_open = True
+        self.outcome = outcome
+        self.published = []
+        self.delivered = 0
+
+    def confirm_delivery(self, ack_nack_callback, callback=None):
+        self.on_confirm = ack_nack_callback
+        callback(SimpleNamespace(method=pika.spec.Confirm.SelectOk()))
+
+    def add_on_return_callback(self, callback):
+        self.on_return = callback
+
+    def basic_publish(self, exchange, routing_key, body, properties=None, mandatory=False):
+        assert mandatory
+        self.published.append(body)
+
+    def _flush_output(self, *waiters):
+        if self.outcome != "timeout" and self.delivered < len(self.published):
+            last = len(self.published)
+            if self.outcome == "return":
+                self.on_return(self, pika.spec.Basic.Return(312, "NO_ROUTE", "", "missing"), pika.BasicProperties(), self.published[-1])
+            if self.outcome == "nack":
+                self.on_confirm(SimpleNamespace(method=pika.spec.Basic.Ack(delivery_tag=last - 1, multiple=True)))
+                self.on_confirm(SimpleNamespace(method=pika.spec.Basic.Nack(delivery_tag=last)))
+            else:
+                self.on_confirm(SimpleNamespace(method=pika.spec.Basic.Ack(delivery_tag=last, multiple=True)))
+            self.delivered = last
+        while not any(waiter() for waiter in waiters):
+            pass
+
+def _batch_channel(outcome):
+    channel = StubChannel(outcome)
+    return _BatchConfirmChannel(SimpleNamespace(channel=lambda: channel)), channel
+
+def test_batch_is_confirmed_with_one_wait():
+    batch, channel = _batch_channel("ack")
+    batch.publish("webhook_tasks", ["a", "b", "c"], pika.BasicProperties(), timeout=1)
+    batch.publish("webhook_tasks", ["d"], pika.BasicProperties(), timeout=1)
+    assert channel.published == ["a", "b", "c", "d"] and not batch._unconfirmed
+
+@pytest.mark.parametrize("outcome, error", [
+    ("nack", pika.exceptions.NackError),
+    ("return", pika.exceptions.UnroutableError),
+    ("timeout", ConnectionError),
+])
+def test_batch_failures(outcome, error):
+    batch, _ = _batch_channel(outcome)
+    with pytest.raises(error):
+        batch.publish("webhook_tasks", ["a", "b"], pika.BasicProperties(), timeout=0)
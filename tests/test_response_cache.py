@@ -0,0 +1,219 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import Request
+from redis.exceptions import WatchError
+
+from baseapp.model.common import ApiResponse
+from baseapp.services import response_cache
+from baseapp.services.response_cache import PERMISSION_TAG, cache_response, invalidate_response_cache
+
+class FakePipeline:
+    """Pipeline redis-py: perintah langsung dijalankan setelah watch(), dibuffer setelah multi()."""
+    def __init__(self, redis_conn):
+        self.redis_conn = redis_conn
+        self.commands = []
+        self.watched = None
+        self.buffered = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def watch(self, *keys):
+        self.watched = {key: self.redis_conn.get(key) for key in keys}
+        self.buffered = False
+
+    def multi(self):
+        self.buffered = True
+
+    def __getattr__(self, name):
+        if not self.buffered:
+            return getattr(self.redis_conn, name)
+        return lambda *args, **kwargs: self.commands.append((name, args, kwargs))
+
+    def execute(self):
+        if self.watched and any(self.redis_conn.get(key) != value for key, value in self.watched.items()):
+            raise WatchError("Watched variable changed.")
+        for name, args, kwargs in self.commands:
+            getattr(self.redis_conn, name)(*args, **kwargs)
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def mget(self, keys):
+        return [self.get(key) for key in keys]
+
+    def incr(self, key):
+        self.data[key] = str(int(self.data.get(key) or 0) + 1)
+
+    def hmget(self, key, *fields):
+        return [self.data.get(key, {}).get(field) for field in fields]
+
+    def hset(self, key, mapping):
+        self.data.setdefault(key, {}).update(mapping)
+
+    def sadd(self, key, member):
+        self.data.setdefault(key, set()).add(member)
+
+    def smembers(self, key):
+        return set(self.data.get(key, set()))
+
+    def expire(self, key, seconds):
+        pass
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+@pytest.fixture
+def cache(monkeypatch):
+    """Response cache aktif dengan Redis in-memory; permission dan audit trail dicatat, bukan ke MongoDB."""
+    redis_conn = FakeRedis()
+    calls = {"permission": [], "audit": []}
+    allowed = {"roles": {"admin"}}
+
+    def has_permission(roles, feature, required):
+        calls["permission"].append((feature, required))
+        return bool(allowed["roles"] & set(roles))
+
+    monkeypatch.setattr(response_cache.config, "response_cache_enabled", True)
+    monkeypatch.setattr(response_cache, "_conn", lambda: redis_conn)
+    monkeypatch.setattr(response_cache._permission_checker, "has_permission", has_permission)
+    monkeypatch.setattr(response_cache, "_audit_hit", lambda cu, request, target, etag: calls["audit"].append(target))
+    return SimpleNamespace(redis=redis_conn, calls=calls, allowed=allowed)
+
+def _user(token="token-a", roles=("admin",), org_id="org1"):
+    return SimpleNamespace(id="u1", org_id=org_id, authority=3, roles=list(roles), token=token, ip_address=None, user_agent=None)
+
+def _request(path="/v1/_role", query=b"page=1", if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode("latin-1"))] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": path, "query_string": query, "headers": headers})
+
+def _call(handler, cu, request):
+    return asyncio.run(handler(cu=cu, _cache_request=request))
+
+@pytest.fixture
+def role_handler():
+    executed = []
+
+    @cache_response("_role", permission=("_role", 1), audit_target="_role")
+    async def get_all_data(cu=None) -> ApiResponse:
+        executed.append(cu.token)
+        return ApiResponse(status=0, message="Data loaded", data=[{"id": "r1", "name": f"Role {len(executed)}"}])
+
+    get_all_data.executed = executed
+    return get_all_data
+
+def test_hit_returns_same_etag_and_304_on_if_none_match(cache, role_handler):
+    first = _call(role_handler, _user(), _request())
+    etag = first.headers["etag"]
+    assert first.status_code == 200 and b"Role 1" in first.body
+
+    second = _call(role_handler, _user(), _request())
+    assert second.headers["etag"] == etag and b"Role 1" in second.body
+    assert role_handler.executed == ["token-a"]
+
+    not_modified = _call(role_handler, _user(), _request(if_none_match=etag))
+    assert not_modified.status_code == 304 and not_modified.body == b""
+
+    changed = _call(role_handler, _user(), _request(if_none_match='"stale"'))
+    assert changed.status_code == 200
+
+def test_permission_is_checked_before_cache_lookup(cache, role_handler):
+    _call(role_handler, _user(), _request())
+    cache.allowed["roles"] = set()  # permission role dicabut, entri cache masih ada
+    with pytest.raises(PermissionError):
+        _call(role_handler, _user(), _request())
+    assert cache.calls["permission"] == [("_role", 1), ("_role", 1)]
+    assert role_handler.executed == ["token-a"]
+
+def test_cache_hit_writes_audit_trail(cache, role_handler):
+    etag = _call(role_handler, _user(), _request()).headers["etag"]
+    assert cache.calls["audit"] == []  # miss: audit ditulis handler (CRUD)
+    _call(role_handler, _user(), _request())
+    _call(role_handler, _user(), _request(if_none_match=etag))
+    assert cache.calls["audit"] == ["_role", "_role"]
+
+def test_cache_is_scoped_by_org_roles_and_query(cache, role_handler):
+    _call(role_handler, _user(), _request())
+    _call(role_handler, _user(token="token-b"), _request())  # token lain, org + roles sama: hit
+    _call(role_handler, _user(org_id="org2"), _request())
+    _call(role_handler, _user(roles=("admin", "staff")), _request())
+    _call(role_handler, _user(), _request(query=b"page=2"))
+    assert role_handler.executed == ["token-a", "token-a", "token-a", "token-a"]
+
+def test_per_token_cache_is_not_shared_between_tokens(cache):
+    executed = []
+
+    @cache_response(per_token=True)
+    async def auth_status(cu=None) -> ApiResponse:
+        executed.append(cu.token)
+        return ApiResponse(status=0, data={"token": cu.token})
+
+    first = _call(auth_status, _user(token="token-a"), _request(path="/v1/auth/status", query=b""))
+    other = _call(auth_status, _user(token="token-b"), _request(path="/v1/auth/status", query=b""))
+    again = _call(auth_status, _user(token="token-a"), _request(path="/v1/auth/status", query=b""))
+    assert executed == ["token-a", "token-b"]
+    assert b"token-b" in other.body and b"token-a" in again.body
+    assert first.headers["etag"] == again.headers["etag"] != other.headers["etag"]
+
+def test_invalidation_by_tag_and_permission_change(cache, role_handler):
+    _call(role_handler, _user(), _request())
+    invalidate_response_cache("_role")
+    _call(role_handler, _user(), _request())
+    assert len(role_handler.executed) == 2
+
+    invalidate_response_cache("_menu")  # tag lain: tetap hit
+    _call(role_handler, _user(), _request())
+    assert len(role_handler.executed) == 2
+
+    invalidate_response_cache(PERMISSION_TAG)  # perubahan _featureonrole membatalkan semua entri
+    fresh = _call(role_handler, _user(), _request())
+    assert len(role_handler.executed) == 3 and b"Role 3" in fresh.body
+
+def test_invalidation_during_handler_is_not_cached(cache):
+    executed = []
+
+    @cache_response("_role")
+    async def get_all_data(cu=None) -> ApiResponse:
+        executed.append(cu.token)
+        if len(executed) == 1:
+            invalidate_response_cache("_role")  # data berubah setelah handler membaca database
+        return ApiResponse(status=0, data=[{"id": "r1", "name": f"Role {len(executed)}"}])
+
+    stale = _call(get_all_data, _user(), _request())
+    assert b"Role 1" in stale.body
+    fresh = _call(get_all_data, _user(), _request())
+    assert b"Role 2" in fresh.body and fresh.headers["etag"] != stale.headers["etag"]
+    assert len(executed) == 2
+
+def test_disabled_cache_always_runs_handler(cache, role_handler, monkeypatch):
+    monkeypatch.setattr(response_cache.config, "response_cache_enabled", False)
+    result = _call(role_handler, _user(), _request())
+    _call(role_handler, _user(), _request())
+    assert isinstance(result, ApiResponse)
+    assert len(role_handler.executed) == 2 and cache.redis.data == {}
+
+def test_always_etag_without_response_cache(cache, monkeypatch):
+    monkeypatch.setattr(response_cache.config, "response_cache_enabled", False)
+
+    @cache_response("_menu", always_etag=True)
+    async def sidemenu(cu=None) -> ApiResponse:
+        return ApiResponse(status=0, data=[{"id": "m1"}])
+
+    first = _call(sidemenu, _user(), _request(path="/v1/_menu/sidemenu", query=b""))
+    etag = first.headers["etag"]
+    assert first.status_code == 200 and b"m1" in first.body
+    not_modified = _call(sidemenu, _user(), _request(path="/v1/_menu/sidemenu", query=b"", if_none_match=etag))
+    assert not_modified.status_code == 304 and cache.redis.data == {}
@@ -0,0 +1,44 @@
+import pytest
+
+from baseapp.model.common import Status
+from baseapp.services._webhook import crud as webhook_crud
+from baseapp.services._webhook.model import Webhook
+from baseapp.utils.request_context import request_context
+from conftest import FakeMongoConn
+
+@pytest.fixture
+def crud(monkeypatch, fake_db):
+    """Webhook CRUD dengan MongoDB in-memory; audit trail dicatat, bukan ke MongoDB."""
+    audits = []
+    monkeypatch.setattr(webhook_crud.mongodb, "MongoConn", lambda: FakeMongoConn(fake_db))
+    monkeypatch.setattr(webhook_crud.CRUD.audit_trail, "log_audittrail", lambda mongo, **kwargs: audits.append(kwargs))
+    crud = webhook_crud.CRUD()
+    with request_context(user_id="u1", org_id="org1"):
+        created = crud.create(Webhook(url="https://example.com/hook", events=["*"], status=Status.ACTIVE))
+    return crud, created, audits
+
+def test_secret_is_returned_once_and_stored_encrypted(crud, fake_db):
+    crud, created, _ = crud
+    stored = fake_db["_webhook"].docs[0]
+    assert created["secret"].startswith("whsec_") and stored["secret"] != created["secret"]
+    with request_context(user_id="u1", org_id="org1"):
+        assert "secret" not in crud.get_by_id(created["_id"])
+
+def test_other_org_cannot_read_update_or_rotate(crud, fake_db):
+    crud, created, audits = crud
+    webhook_id = created["_id"]
+    stored_secret = fake_db["_webhook"].docs[0]["secret"]
+    with request_context(user_id="u2", org_id="org2"):
+        with pytest.raises(ValueError, match="Webhook not found"):
+            crud.get_by_id(webhook_id)
+        with pytest.raises(ValueError, match="Webhook not found"):
+            crud.update_by_id(webhook_id, Webhook(url="https://evil.example/hook", events=["*"], status=Status.ACTIVE))
+        with pytest.raises(ValueError, match="Webhook not found"):
+            crud.rotate_secret(webhook_id)
+    stored = fake_db["_webhook"].docs[0]
+    assert stored["url"] == "https://example.com/hook" and stored["secret"] == stored_secret
+    assert [audit["status"] for audit in audits] == ["failure", "failure", "failure"]
+
+    with request_context(user_id="u1", org_id="org1"):
+        rotated = crud.rotate_secret(webhook_id)
+    assert rotated["secret"].startswith("whsec_") and fake_db["_webhook"].docs[0]["secret"] != stored_secret
@@ -0,0 +1,168 @@
+import hashlib, hmac, json
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from baseapp.config.rabbitmq import LAST_ERROR_HEADER, ORIGINAL_QUEUE_HEADER, RETRY_COUNT_HEADER
+from baseapp.model.common import Status
+from baseapp.services._rabbitmq_worker import _webhook_worker
+from baseapp.services._rabbitmq_worker._webhook_worker import CircuitBreaker, WebhookDeliveryError, WebhookRetryError, WebhookWorker
+from baseapp.services._rabbitmq_worker.base_worker import PermanentTaskError, TaskDeferred
+from baseapp.services.consumer import _failure_route
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(_webhook_worker.time, "monotonic", clock)
+    return clock
+
+# region CircuitBreaker
+def test_breaker_opens_after_threshold_and_allows_one_trial(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=30)
+    breaker.record_failure("w1")
+    assert breaker.allow("w1")
+    breaker.record_failure("w1")
+    assert not breaker.allow("w1") and breaker.allow("w2")
+
+    clock.now += 30
+    assert breaker.allow("w1")  # HALF-OPEN: satu percobaan
+    assert not breaker.allow("w1")
+    breaker.record_failure("w1")  # percobaan gagal: OPEN lagi
+    assert not breaker.allow("w1")
+
+    clock.now += 30
+    assert breaker.allow("w1")
+    breaker.record_success("w1")
+    assert breaker.allow("w1") and breaker.allow("w1")
+
+def test_breaker_release_trial_allows_next_trial(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=10)
+    breaker.record_failure("w1")
+    clock.now += 10
+    assert breaker.allow("w1")
+    breaker.release_trial("w1")
+    assert breaker.allow("w1")
+# endregion
+
+def test_sign_is_hmac_sha256_over_timestamp_and_body():
+    body = b'{"id":"e1"}'
+    expected = hmac.new(b"whsec_x", b"1700000000." + body, hashlib.sha256).hexdigest()
+    assert WebhookWorker.sign("whsec_x", 1700000000, body) == expected
+    assert WebhookWorker.sign("whsec_x", 1700000001, body) != expected
+
+# region deliver
+@pytest.fixture
+def worker(monkeypatch):
+    """WebhookWorker dengan endpoint palsu dan transport httpx in-memory."""
+    state = SimpleNamespace(requests=[], respond=lambda request: httpx.Response(200), endpoint={
+        "url": "https://example.com/hook", "secret": "whsec_x", "status": Status.ACTIVE.value
+    })
+
+    def handler(request):
+        state.requests.append(request)
+        return state.respond(request)
+
+    monkeypatch.setattr(_webhook_worker.config, "webhook_timeout", 0.01)
+    worker = WebhookWorker()
+    worker.client.close()
+    worker.client = httpx.Client(transport=httpx.MockTransport(handler))
+    worker.breaker = CircuitBreaker(failure_threshold=1, reset_seconds=60)
+    monkeypatch.setattr(worker, "_load_endpoint", lambda webhook_id: state.endpoint)
+    state.worker = worker
+    yield state
+    worker.close()
+
+def _task(webhook_id="w1"):
+    return {"webhook_id": webhook_id, "event_id": "e1", "event_type": "payment.succeeded", "event_data": {"amount": 1}, "org_id": "org1"}
+
+def test_deliver_signs_request(worker):
+    worker.worker.deliver(_task())
+    request = worker.requests[0]
+    timestamp = int(request.headers["X-Webhook-Timestamp"])
+    assert request.headers["X-Webhook-Id"] == "e1"
+    assert request.headers["X-Webhook-Signature"] == f"sha256={WebhookWorker.sign('whsec_x', timestamp, request.content)}"
+    assert json.loads(request.content)["data"] == {"amount": 1}
+
+@pytest.mark.parametrize("status_code, error", [(500, WebhookRetryError), (503, WebhookRetryError), (429, WebhookRetryError), (400, WebhookDeliveryError), (410, WebhookDeliveryError)])
+def test_deliver_classifies_http_status(worker, status_code, error):
+    worker.respond = lambda request: httpx.Response(status_code)
+    with pytest.raises(error):
+        worker.worker.deliver(_task())
+    # Hanya 429/5xx yang dihitung sebagai kegagalan endpoint (threshold 1: circuit terbuka)
+    assert worker.worker.breaker.allow("w1") == (error is WebhookDeliveryError)
+
+def test_deliver_retries_transport_errors_and_defers_open_circuit(worker):
+    def refuse(request):
+        raise httpx.ConnectError("connection refused", request=request)
+
+    worker.respond = refuse
+    with pytest.raises(WebhookRetryError):
+        worker.worker.deliver(_task())
+    with pytest.raises(TaskDeferred) as deferred:
+        worker.worker.deliver(_task())
+    assert deferred.value.delay_seconds == 60 and len(worker.requests) == 1
+
+def test_invalid_url_is_permanent_and_releases_trial(worker, clock):
+    worker.worker.breaker.record_failure("w1")
+    clock.now += 60  # HALF-OPEN
+    worker.endpoint["url"] = "https://exa mple.com:bad/hook"
+    with pytest.raises(WebhookDeliveryError) as error:
+        worker.worker.deliver(_task())
+    assert isinstance(error.value, PermanentTaskError)
+    assert worker.worker.breaker.allow("w1")  # percobaan HALF-OPEN tidak tertahan
+
+def test_concurrency_limit_defers_without_starting_trial(worker, clock):
+    worker.worker.breaker.record_failure("w1")
+    clock.now += 60  # HALF-OPEN
+    semaphore = worker.worker._semaphore("w1")
+    while semaphore.acquire(blocking=False):
+        pass
+    with pytest.raises(TaskDeferred, match="concurrency limit"):
+        worker.worker.deliver(_task())
+    assert worker.worker.breaker.allow("w1") and worker.requests == []
+
+def test_inactive_endpoint_is_dropped(worker):
+    worker.endpoint["status"] = Status.INACTIVE.value
+    worker.worker.deliver(_task())
+    assert worker.requests == []
+# endregion
+
+# region _failure_route
+def _properties(retries=None, **headers):
+    if retries is not None:
+        headers[RETRY_COUNT_HEADER] = retries
+    return SimpleNamespace(headers=headers)
+
+DELAY_QUEUES = ["webhook_tasks.delay.10", "webhook_tasks.delay.60", "webhook_tasks.delay.300"]
+RETRY_DELAYS = [10, 60, 300]
+
+def test_failure_route_moves_through_delay_tiers():
+    for retries, expected in enumerate(DELAY_QUEUES):
+        routing_key, headers, _ = _failure_route("webhook_tasks", DELAY_QUEUES, RETRY_DELAYS, _properties(retries), WebhookRetryError("HTTP 503"))
+        assert routing_key == expected and headers[RETRY_COUNT_HEADER] == retries + 1
+        assert headers[LAST_ERROR_HEADER] == "HTTP 503"
+
+    routing_key, headers, _ = _failure_route("webhook_tasks", DELAY_QUEUES, RETRY_DELAYS, _properties(3), WebhookRetryError("HTTP 503"))
+    assert routing_key == "webhook_tasks.dead" and headers[ORIGINAL_QUEUE_HEADER] == "webhook_tasks"
+
+def test_failure_route_sends_permanent_errors_to_dead_letter():
+    routing_key, headers, _ = _failure_route("webhook_tasks", DELAY_QUEUES, RETRY_DELAYS, _properties(), WebhookDeliveryError("HTTP 400"))
+    assert routing_key == "webhook_tasks.dead" and RETRY_COUNT_HEADER not in headers
+
+def test_failure_route_defers_without_counting_retry():
+    properties = _properties(2)
+    routing_key, headers, _ = _failure_route("webhook_tasks", DELAY_QUEUES, RETRY_DELAYS, properties, TaskDeferred("circuit open", delay_seconds=30))
+    assert routing_key == "webhook_tasks.delay.60" and headers[RETRY_COUNT_HEADER] == 2
+    routing_key, _, _ = _failure_route("webhook_tasks", DELAY_QUEUES, RETRY_DELAYS, properties, TaskDeferred("busy"))
+    assert routing_key == "webhook_tasks.delay.10"
+    routing_key, _, _ = _failure_route("webhook_tasks", DELAY_QUEUES, RETRY_DELAYS, properties, TaskDeferred("circuit open", delay_seconds=3600))
+    assert routing_key == "webhook_tasks.delay.300"
+# endregion